@@ -1,19 +1,14 @@
+from __future__ import annotations  # pandas annotations below are not evaluated at def time
+
 import os, json, html
 from datetime import datetime
-import pandas as pd
-import numpy as np
 import streamlit as st
-import joblib
 
-from src.pdf_onepager import export_onepager_pdf, _pick_highlights
 from src.config import CFG
-from src.telemetry import compute_saving_kpis, compute_ops_kpis
-from src.simulate_production_outputs import run as simulate_run
-from src.explainability import summarize_rule_reasons, compare_profiles, linear_model_contributions
+from src.policy_registry import load_current
 
 OUT="out"
 CI_PATH="assets/ci.json"
-POLICY_REGISTRY="models/policy_registry.json"
 
 def exists(p): return os.path.exists(p)
 def path_out(*p): return os.path.join(OUT,*p)
@@ -21,7 +16,12 @@ def mtime(p): return datetime.fromtimestamp(os.path.getmtime(p)).strftime("%Y-%m
 def read_text(p): return open(p,"r",encoding="utf-8").read() if exists(p) else ""
 def read_csv(p):
     if not exists(p): return pd.DataFrame()
-    try: return pd.read_csv(p)
+    try: return ARTIFACTS.load(p)
+    except: return pd.DataFrame()
+def read_ledger(p):
+    if not exists(p): return pd.DataFrame()
+    store = open_store(path_out(os.path.basename(STORE_PATH)), p)  # mapped, shared across sessions
+    try: return store.frame() if store is not None else ARTIFACTS.load(p, read_compact_ledger)
     except: return pd.DataFrame()
 def read_json(p):
     if not exists(p): return {}
@@ -63,22 +63,12 @@ def _to_datetime(s: pd.Series) -> pd.Series:
     return pd.to_datetime(s, errors="coerce")
 
 
-def available_months(ts: pd.DataFrame, ledger: pd.DataFrame) -> list[str]:
+def available_months(rollup: pd.DataFrame) -> list[str]:
     """Return available months as 'YY.M월' strings (e.g., '25.1월')."""
-    months = set()
-    if ts is not None and (not ts.empty) and "date" in ts.columns:
-        d = _to_datetime(ts["date"]).dropna()
-        for x in d.dt.to_period("M").astype(str).tolist():
-            months.add(x)
-    if ledger is not None and (not ledger.empty):
-        col = "claim_date" if "claim_date" in ledger.columns else ("date" if "date" in ledger.columns else None)
-        if col:
-            d = _to_datetime(ledger[col]).dropna()
-            for x in d.dt.to_period("M").astype(str).tolist():
-                months.add(x)
-
-    # sort
-    out = sorted(list(months))
+    if rollup is None or rollup.empty:
+        return []
+    active = rollup[(rollup["ts_rows"] > 0) | (rollup["ledger_rows"] > 0)]
+    out = sorted(active["date"].dt.to_period("M").astype(str).unique().tolist())
 
     def fmt(ym: str) -> str:
         # ym: 'YYYY-MM'
@@ -91,6 +81,12 @@ def available_months(ts: pd.DataFrame, ledger: pd.DataFrame) -> list[str]:
     return [fmt(x) for x in out]
 
 
+def month_bounds(month_ym: str) -> tuple[pd.Timestamp, pd.Timestamp]:
+    """First and last day (inclusive) of month_ym='YYYY-MM'."""
+    start = pd.Timestamp(f"{month_ym}-01")
+    return start, start + pd.offsets.MonthBegin(1) - pd.Timedelta(days=1)
+
+
 def _parse_month_label(label: str) -> str:
     """Convert '25.1월' -> '2025-01' (best-effort)."""
     try:
@@ -130,11 +126,9 @@ def compute_period_ops_summary(ledger: pd.DataFrame) -> dict:
         df["score"] = np.nan
 
     n = len(df)
-    dec = df["decision"].astype(str).str.upper()
-    review_rate = float((dec == "REVIEW").mean()) if n else None
-    grp = df["exp_group"].astype(str).str.upper()
-    treat_rate = float((grp == "TREATMENT").mean()) if n else None
-    control_rate = float((grp == "CONTROL").mean()) if n else None
+    review_rate = float(eq_upper(df["decision"], "REVIEW").mean()) if n else None
+    treat_rate = float(eq_upper(df["exp_group"], "TREATMENT").mean()) if n else None
+    control_rate = float(eq_upper(df["exp_group"], "CONTROL").mean()) if n else None
     s = pd.to_numeric(df["score"], errors="coerce")
     avg_score = float(s.mean()) if s.notna().any() else None
 
@@ -257,6 +251,7 @@ DISPLAY_COLS = {
     "decision": "처리",
     "score": "리스크 점수",
     "risk_reasons": "의심 사유(요약)",
+    "top_features": "모델 기여 상위 변수",
     "paid_amount": "지급액",
     "claim_id": "청구 ID",
 }
@@ -448,15 +443,6 @@ def generate_actions(hte_df: pd.DataFrame, driver_cat: pd.DataFrame) -> list[str
     actions.append("운영 KPI(검토율·SLA·절감액)를 주간 단위로 트래킹하고, 효과가 낮은 구간은 정책을 재조정")
     return actions[:3]
 
-def fill_from_claim_cols(df: pd.DataFrame, cols: list[str]) -> pd.DataFrame:
-    """Merge 이후 segment 컬럼이 None/NaN이면 claims 원본 컬럼(<col>_claim)로 보정."""
-    d = df.copy()
-    for c in cols:
-        c2 = f"{c}_claim"
-        if c in d.columns and c2 in d.columns:
-            d[c] = d[c].where(d[c].notna(), d[c2])
-    return d
-
 def hte_table_for_display(hte: pd.DataFrame) -> pd.DataFrame:
     if hte is None or hte.empty:
         return pd.DataFrame()
@@ -650,8 +636,7 @@ def guardrail():
     return (d,"neutral",r)
 
 def policy_stage():
-    p=read_json(POLICY_REGISTRY)
-    cur=(p or {}).get("current",{})
+    cur=load_current(create=False)
     if not cur: return ("NOT CONFIGURED","NOT CONFIGURED","NA")
     return (str(cur.get("policy_version","NA")), str(cur.get("mode","NA")), str(cur.get("control_rate","NA")))
 
@@ -683,126 +668,6 @@ def methods_summary(panel):
         out.append({"method":str(r.get("method","NA")),"effect_per_claim":krw(r.get("effect_per_claim")),"p_value":pvalue(pv) if pv else "—"})
     return out
 
-def compute_savings_from_ledger(effect_per_claim, ledger: pd.DataFrame):
-    """
-    운영형 방식:
-    - effect_per_claim(원/건) * (TREATMENT 건수)
-    - Today / MTD / QTD 를 decision_ledger.csv의 claim_date 기준으로 계산
-    """
-    try:
-        eff = float(effect_per_claim)
-        if np.isnan(eff):
-            return (None, None, None, None)
-    except:
-        return (None, None, None, None)
-
-    if ledger is None or ledger.empty:
-        return (None, None, None, None)
-
-    # 필수 컬럼 체크
-    if "claim_date" not in ledger.columns or "exp_group" not in ledger.columns:
-        return (None, None, None, None)
-
-    df = ledger.copy()
-
-    # claim_date 파싱
-    df["claim_date"] = pd.to_datetime(df["claim_date"], errors="coerce")
-    df = df.dropna(subset=["claim_date"])
-
-    if df.empty:
-        return (None, None, None, None)
-
-    # "오늘"은 운영 데이터에서 가장 최신 날짜로 잡는게 현실적
-    today = df["claim_date"].max().normalize()
-
-    # 그룹 필터
-    t = df[df["exp_group"].astype(str).str.upper().eq("TREATMENT")]
-
-    if t.empty:
-        return (today, 0.0, 0.0, 0.0)
-
-    # TODAY
-    n_today = (t["claim_date"].dt.normalize() == today).sum()
-    saving_today = eff * n_today
-
-    # MTD
-    m_start = today.replace(day=1)
-    n_mtd = ((t["claim_date"] >= m_start) & (t["claim_date"] < (today + pd.Timedelta(days=1)))).sum()
-    saving_mtd = eff * n_mtd
-
-    # QTD
-    q = (today.month - 1)//3 + 1
-    q_start_month = 1 + 3*(q-1)
-    q_start = today.replace(month=q_start_month, day=1)
-    n_qtd = ((t["claim_date"] >= q_start) & (t["claim_date"] < (today + pd.Timedelta(days=1)))).sum()
-    saving_qtd = eff * n_qtd
-
-    return (today, saving_today, saving_mtd, saving_qtd)
-
-def compute_savings_from_timeseries(ts: pd.DataFrame):
-    """
-    out/impact_monthly_timeseries.csv 기반:
-    - date, saving_est_krw를 사용해 Today/MTD/QTD 계산
-    """
-    if ts is None or ts.empty:
-        return (None, None, None, None)
-
-    if "date" not in ts.columns or "saving_est_krw" not in ts.columns:
-        return (None, None, None, None)
-
-    df = ts.copy()
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df["saving_est_krw"] = pd.to_numeric(df["saving_est_krw"], errors="coerce")
-    df = df.dropna(subset=["date", "saving_est_krw"])
-    if df.empty:
-        return (None, None, None, None)
-
-    asof = df["date"].max().normalize()
-
-    # TODAY
-    saving_today = float(df.loc[df["date"].dt.normalize() == asof, "saving_est_krw"].sum())
-
-    # MTD
-    m_start = asof.replace(day=1)
-    saving_mtd = float(df.loc[(df["date"] >= m_start) & (df["date"] < asof + pd.Timedelta(days=1)), "saving_est_krw"].sum())
-
-    # QTD
-    q = (asof.month - 1)//3 + 1
-    q_start_month = 1 + 3*(q-1)
-    q_start = asof.replace(month=q_start_month, day=1)
-    saving_qtd = float(df.loc[(df["date"] >= q_start) & (df["date"] < asof + pd.Timedelta(days=1)), "saving_est_krw"].sum())
-
-    return (asof, saving_today, saving_mtd, saving_qtd)
-
-def compute_savings_kpi_bundle(ts: pd.DataFrame, target_mtd_krw: float = 200_000_000):
-    """
-    returns:
-      asof, today, mtd, qtd, dod_pct, ma7, target_mtd, target_progress
-    """
-    asof, today, mtd, qtd = compute_savings_from_timeseries(ts)
-    if asof is None:
-        return (None, None, None, None, None, None, target_mtd_krw, None)
-
-    df = ts.copy()
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df["saving_est_krw"] = pd.to_numeric(df["saving_est_krw"], errors="coerce")
-    df = df.dropna(subset=["date","saving_est_krw"]).sort_values("date")
-
-    # 전일 대비
-    prev_day = asof - pd.Timedelta(days=1)
-    prev_val = float(df.loc[df["date"].dt.normalize()==prev_day, "saving_est_krw"].sum())
-    dod_pct = None if prev_val <= 0 else (today - prev_val) / prev_val
-
-    # 7일 이동평균(최근 7일)
-    last7 = df[df["date"] >= (asof - pd.Timedelta(days=6))]
-    ma7 = float(last7["saving_est_krw"].mean()) if len(last7) else None
-
-    # 목표 대비
-    target_progress = None if target_mtd_krw <= 0 else (mtd / target_mtd_krw)
-
-    return (asof, today, mtd, qtd, dod_pct, ma7, target_mtd_krw, target_progress) 
-
-
 def compute_experiment_daily(ledger: pd.DataFrame) -> pd.DataFrame:
     """Build daily CONTROL vs TREATMENT telemetry from decision ledger.
 
@@ -923,7 +788,7 @@ def compute_hte(ledger: pd.DataFrame, seg_cols: list[str], min_n: int = 200) ->
     for col in seg_cols:
         if col not in df.columns:
             continue
-        g = df.groupby([col, "exp_group"], dropna=False)
+        g = df.groupby([col, "exp_group"], dropna=False, observed=True)
         agg = g.agg(
             n=("paid_amount", "size"),
             avg_paid=("paid_amount", "mean"),
@@ -958,24 +823,119 @@ def compute_hte(ledger: pd.DataFrame, seg_cols: list[str], min_n: int = 200) ->
     return res
 
 
+def load_segment_cube() -> pd.DataFrame:
+    """Pipeline-built segment cube; empty when missing or older than the ledger/claims."""
+    p = path_out("segment_cube.csv")
+    if not is_fresh(p, path_out("decision_ledger.csv"), CFG.data_claims):
+        return pd.DataFrame()
+    try:
+        return ARTIFACTS.load(p, read_segment_cube)
+    except Exception:
+        return pd.DataFrame()
+
+
+def load_daily_rollup(ts: pd.DataFrame, ledger: pd.DataFrame) -> pd.DataFrame:
+    """Pipeline-built savings rollup; rebuilt in memory when missing or stale."""
+    p = path_out(os.path.basename(ROLLUP_PATH))
+    if is_fresh(p, path_out("impact_monthly_timeseries.csv"), path_out("decision_ledger.csv")):
+        try:
+            return ARTIFACTS.load(p, read_daily_rollup)
+        except Exception:
+            pass
+    sources = [path_out("impact_monthly_timeseries.csv"), path_out("decision_ledger.csv")]
+    return ARTIFACTS.derived("daily_rollup", sources, lambda: build_daily_rollup(ts=ts, ledger=ledger))
+
+
+def stage_duration_trend(max_runs: int = 20):
+    """Top-level stage spans -> (wall seconds per run x stage, latest run table)."""
+    try:
+        sp = ARTIFACTS.load(path_out("stage_spans.jsonl"), read_spans)
+    except Exception:
+        return pd.DataFrame(), pd.DataFrame()
+    if sp.empty or "kind" not in sp.columns:
+        return pd.DataFrame(), pd.DataFrame()
+    sp = sp[(sp["kind"] == "stage") & sp["parent_id"].isna()]
+    if sp.empty:
+        return pd.DataFrame(), pd.DataFrame()
+    runs = sp.groupby("run_id")["started_at"].min().sort_values().index[-max_runs:]
+    trend = sp[sp["run_id"].isin(runs)].pivot_table(index="run_id", columns="name", values="wall_s", aggfunc="sum").reindex(runs)
+    last = sp[sp["run_id"] == runs[-1]].sort_values("wall_s", ascending=False)
+    latest = pd.DataFrame({
+        "단계": last["name"],
+        "소요(초)": last["wall_s"].round(2),
+        "CPU(초)": last["cpu_s"].round(2),
+        "최대 메모리(MB)": last["peak_rss_mb"],
+        "입력 행": last["rows_in"],
+        "출력 행": last["rows_out"],
+        "읽기(MB)": (last["bytes_read"] / 1e6).round(1),
+        "쓰기(MB)": (last["bytes_written"] / 1e6).round(1),
+        "상태": last["status"],
+    })
+    return trend, latest
+
+
+def enriched_ledger() -> pd.DataFrame:
+    """Report-period ledger joined with claim attributes.
+
+    Reads the pipeline-built Parquet when fresh; otherwise joins once per
+    ledger/claims version.
+    """
+    sources = [path_out("decision_ledger.csv"), CFG.data_claims]
+    p = path_out(os.path.basename(ENRICHED_PATH))
+    if is_fresh(p, *sources):
+        try:
+            led = ARTIFACTS.load(p, read_enriched_ledger)
+            if cube_month:
+                dcol = "claim_date" if "claim_date" in led.columns else "date"
+                led = filter_to_month(led, dcol, cube_month).reset_index(drop=True)
+            return led
+        except Exception:
+            pass
+    return ARTIFACTS.derived(f"enriched_ledger:{cube_month or 'all'}", sources,
+                             lambda: build_enriched_ledger(ledger, read_csv(CFG.data_claims)))
+
+
+def segment_hte(seg_cols: list[str], min_n: int = 200) -> pd.DataFrame:
+    """HTE from the segment cube when it covers seg_cols, else from the enriched ledger."""
+    if set(seg_cols).issubset(cube_dims(seg_cube)):
+        return hte_from_cube(seg_cube, seg_cols, min_n=min_n, month=cube_month)
+    return compute_hte(enriched_ledger(), seg_cols=seg_cols, min_n=min_n)
+
+
 def attach_rule_reasons(df: pd.DataFrame) -> pd.DataFrame:
-    """Attach rule-based reasons to a dataframe of claims."""
+    """Attach rule-based reasons to a dataframe of claims.
+
+    Rows scored with stored reasons (risk_reasons/risk_reason_details written
+    by score_batch_prod) are reused; only the remaining rows run the rule engine.
+    """
     if df is None or df.empty:
         return pd.DataFrame()
     d = df.copy()
-    shorts = []
-    tops = []
-    for _, r in d.iterrows():
-        s, top = summarize_rule_reasons(r.to_dict(), topk=3)
-        shorts.append(s)
-        tops.append(top)
-    d["risk_reasons"] = shorts
-    d["risk_reason_details"] = tops
+    stored = np.zeros(len(d), dtype=bool)
+    if "risk_reasons" in d.columns and "risk_reason_details" in d.columns:
+        stored = (d["risk_reasons"].notna() & d["risk_reason_details"].notna()).to_numpy()
+    reasons = np.empty(len(d), dtype=object)
+    details = np.empty(len(d), dtype=object)
+    if stored.any():
+        idx = np.flatnonzero(stored)
+        reasons[idx] = d["risk_reasons"].to_numpy()[idx].astype(str)
+        for i, v in zip(idx, d["risk_reason_details"].to_numpy()[idx]):
+            details[i] = _maybe_parse_listlike(v)
+    if not stored.all():
+        idx = np.flatnonzero(~stored)
+        rr = rule_reasons_frame(d.iloc[idx], topk=3)
+        reasons[idx] = rr["risk_reasons"].to_numpy()
+        for i, v in zip(idx, rr["risk_reason_details"]):
+            details[i] = v
+    d["risk_reasons"] = reasons
+    d["risk_reason_details"] = details
     return d
 
 
 def try_load_model():
     """Best-effort load champion model for explanations/accuracy."""
+    import joblib  # sklearn loads with the model; keep it off the cold start
+
     for p in ["models/champion.joblib", "models/fraud_lr.joblib", "models/challenger.joblib"]:
         if exists(p):
             try:
@@ -989,9 +949,55 @@ ci=load_ci()
 st.set_page_config(page_title=ci["report_title"], layout="wide")
 css(ci)
 
+# First paint: the header needs only small JSON files, so it is sent before
+# pandas, the src helpers and the artifacts load (Streamlit streams elements
+# as the script emits them).
+pv, pm, cr = policy_stage()
+h1,h2=st.columns([1.2,1.0])
+with h1:
+    lp=ci.get("logo_path","")
+    if lp and exists(lp): st.image(lp, width=160)
+    st.markdown(f"""
+<div style="margin-top:6px; font-size:12px; color:#6b7280; letter-spacing:0.12em; text-transform:uppercase;">
+{ci["company_name"]} · 임원 보고 표준
+</div>
+<div style="font-size:30px; font-weight:900; color:#111827; letter-spacing:-0.02em;">
+{ci["report_title"]}
+</div>
+<div class="accent-line"></div>
+<div style="margin-top:8px; color:#6b7280; font-size:13px;">
+정책: <span class="mono">{pv}</span> · 모드: <span class="mono">{pm}</span> · 통제 비중: <span class="mono">{cr}</span>
+</div>
+""", unsafe_allow_html=True)
+with h2:
+    st.markdown(f"""
+<div style="text-align:right;">
+  <div style="font-size:12px; color:#6b7280;">Last updated</div>
+  <div class="mono">{mtime(path_out("executive_summary.md"))}</div>
+</div>
+""", unsafe_allow_html=True)
+
+st.markdown("<hr/>", unsafe_allow_html=True)
+
+# ---- first paint done: heavy imports and artifacts below ----
+import pandas as pd
+import numpy as np
+
+from src.pdf_onepager import export_onepager_pdf, _pick_highlights
+from src.telemetry import compute_saving_kpis, compute_ops_kpis, build_daily_rollup, read_daily_rollup, ROLLUP_PATH
+from src.explainability import rule_reasons_frame, compare_profiles, linear_model_contributions
+from src.io_utils import is_fresh
+from src.instrument import read_spans
+from src.artifact_cache import ARTIFACTS
+from src.segment_cube import read_segment_cube, hte_from_cube, cube_dims
+from src.enriched_ledger import build_enriched_ledger, read_enriched_ledger, ENRICHED_PATH
+from src.schemas import eq_upper, read_compact_ledger
+from src.ledger_store import STORE_PATH, open_store
+
 # Load telemetry early (used by report-period selector)
 ts_raw = read_csv(path_out("impact_monthly_timeseries.csv"))
-ledger_raw = read_csv(path_out("decision_ledger.csv"))
+ledger_raw = read_ledger(path_out("decision_ledger.csv"))
+rollup = load_daily_rollup(ts_raw, ledger_raw)
 
 with st.sidebar:
     st.markdown("### Executive Controls")
@@ -1004,7 +1010,7 @@ with st.sidebar:
     month_label = None
     month_ym = None
     if period_mode == "월간":
-        ms = available_months(ts_raw, ledger_raw)
+        ms = available_months(rollup)
         if len(ms) == 0:
             st.caption("월간 선택을 위한 데이터가 없습니다.")
         else:
@@ -1017,6 +1023,7 @@ with st.sidebar:
     demo_days = st.slider("History window (days)", 30, 180, 60, step=10)
     demo_seed = st.number_input("Seed", min_value=1, max_value=10_000, value=42, step=1)
     if st.button("Generate / Refresh Demo Data", use_container_width=True):
+        from src.simulate_production_outputs import run as simulate_run
         simulate_run(scenario=demo_scn, days=int(demo_days), seed=int(demo_seed), control_rate=CFG.default_control_rate)
         # regenerate charts to keep one-pager consistent
         try:
@@ -1026,7 +1033,6 @@ with st.sidebar:
             pass
         st.rerun()
 
-pv, pm, cr = policy_stage()
 g_label, g_tone, g_reasons = guardrail()
 effect, effect_src, panel = best_effect()
 sig=read_csv(path_out("impact_significance_scipy.csv"))
@@ -1037,6 +1043,9 @@ red_flag = (seg_n>0) or (g_label=="ROLLBACK")
 
 ts = ts_raw
 ledger = ledger_raw
+seg_cube = load_segment_cube()
+cube_month = None
+kpi_start, kpi_end = None, None
 
 # Apply report period filter
 period_caption = ""
@@ -1047,6 +1056,8 @@ if 'period_mode' in globals() and period_mode == "월간" and month_ym:
         dcol = "claim_date" if "claim_date" in ledger.columns else ("date" if "date" in ledger.columns else None)
         if dcol:
             ledger = filter_to_month(ledger, dcol, month_ym)
+            cube_month = month_ym
+    kpi_start, kpi_end = month_bounds(month_ym)
     period_caption = f"(월간 기준: {month_label})"
 else:
     period_caption = "(최신 일간 기준)"
@@ -1056,6 +1067,9 @@ kpi = compute_saving_kpis(
     ledger=ledger if not ledger.empty else None,
     target_mtd=float(CFG.target_mtd_saving_krw),
     target_qtd=float(CFG.target_qtd_saving_krw),
+    rollup=rollup,
+    start=kpi_start,
+    end=kpi_end,
 )
 
 ops = compute_ops_kpis(ledger if not ledger.empty else None)
@@ -1070,31 +1084,6 @@ target_mtd = kpi.target_mtd
 prog = kpi.mtd_progress
 qprog = kpi.qtd_progress
 
-h1,h2=st.columns([1.2,1.0])
-with h1:
-    lp=ci.get("logo_path","")
-    if lp and exists(lp): st.image(lp, width=160)
-    st.markdown(f"""
-<div style="margin-top:6px; font-size:12px; color:#6b7280; letter-spacing:0.12em; text-transform:uppercase;">
-{ci["company_name"]} · 임원 보고 표준
-</div>
-<div style="font-size:30px; font-weight:900; color:#111827; letter-spacing:-0.02em;">
-{ci["report_title"]}
-</div>
-<div class="accent-line"></div>
-<div style="margin-top:8px; color:#6b7280; font-size:13px;">
-정책: <span class="mono">{pv}</span> · 모드: <span class="mono">{pm}</span> · 통제 비중: <span class="mono">{cr}</span>
-</div>
-""", unsafe_allow_html=True)
-with h2:
-    st.markdown(f"""
-<div style="text-align:right;">
-  <div style="font-size:12px; color:#6b7280;">Last updated</div>
-  <div class="mono">{mtime(path_out("executive_summary.md"))}</div>
-</div>
-""", unsafe_allow_html=True)
-
-st.markdown("<hr/>", unsafe_allow_html=True)
 
 # ---- KPI (Deck: 한 장 요약) ----
 st.markdown('<div class="section-h">핵심 지표</div>', unsafe_allow_html=True)
@@ -1231,13 +1220,7 @@ with tabs[0]:
     if ledger is None or ledger.empty:
         st.info("원장(out/decision_ledger.csv)이 없습니다. 파이프라인 실행 또는 데모 생성이 필요합니다.")
     else:
-        claims = read_csv("data/claims.csv")
-        led = ledger.copy()
-        if not claims.empty and "claim_id" in claims.columns and "claim_id" in led.columns:
-            cols = [c for c in claims.columns if c not in ["paid_amount"]]
-            led = led.merge(claims[cols], on="claim_id", how="left", suffixes=("", "_claim"))
-        led = fill_from_claim_cols(led, ["channel","product_line","product","region","hospital_grade","hospital_id"])
-        hte = compute_hte(led, seg_cols=["channel","product_line","region"], min_n=150)
+        hte = segment_hte(["channel","product_line","region"], min_n=150)
         if hte is not None and not hte.empty:
             top5 = hte.sort_values("delta_paid_c_minus_t", ascending=False).head(5)
             st.dataframe(hte_top_table_for_display(top5, top_n=5), use_container_width=True, hide_index=True, height=240)
@@ -1329,12 +1312,7 @@ with tabs[1]:
     if ledger is None or ledger.empty:
         st.info("영향 측정을 위한 원장(out/decision_ledger.csv)이 없습니다.")
     else:
-        claims = read_csv("data/claims.csv")
-        led = ledger.copy()
-        if not claims.empty and "claim_id" in claims.columns and "claim_id" in led.columns:
-            cols = [c for c in claims.columns if c not in ["paid_amount"]]
-            led = led.merge(claims[cols], on="claim_id", how="left", suffixes=("", "_claim"))
-        led = fill_from_claim_cols(led, ["channel","product_line","product","region","hospital_grade","hospital_id"])
+        led = enriched_ledger()
 
         summ = compute_experiment_summary(led)
         daily = compute_experiment_daily(led)
@@ -1383,7 +1361,7 @@ with tabs[1]:
             # ---- Strategy 2x2 (Effect vs Review Lift) ----
             # Minimal, message-first summary; details in expander.
             if led is not None and not led.empty:
-                hte2 = compute_hte(led, seg_cols=["channel", "product_line", "region"], min_n=150)
+                hte2 = segment_hte(["channel", "product_line", "region"], min_n=150)
             else:
                 hte2 = pd.DataFrame()
 
@@ -1454,12 +1432,7 @@ with tabs[2]:
     if ledger is None or ledger.empty:
         st.info("Missing out/decision_ledger.csv — run pipeline or generate demo telemetry.")
     else:
-        claims = read_csv("data/claims.csv")
-        led = ledger.copy()
-        if not claims.empty and "claim_id" in claims.columns and "claim_id" in led.columns:
-            cols = [c for c in claims.columns if c not in ["paid_amount"]]
-            led = led.merge(claims[cols], on="claim_id", how="left", suffixes=("", "_claim"))
-        led = fill_from_claim_cols(led, ["channel","product_line","product","region","hospital_grade","hospital_id"])
+        led = enriched_ledger()
 
         # -----------------------------
         # Build artifacts
@@ -1467,7 +1440,7 @@ with tabs[2]:
         dims = ["channel","product_line","product","region","hospital_grade"]
         hte_all = []
         for d0 in dims:
-            tmp = compute_hte(led, seg_cols=[d0], min_n=150)
+            tmp = segment_hte([d0], min_n=150)
             if tmp is not None and not tmp.empty:
                 hte_all.append(tmp)
         hte_all = pd.concat(hte_all, ignore_index=True) if hte_all else pd.DataFrame()
@@ -1518,7 +1491,7 @@ with tabs[2]:
 
             with st.expander("세그먼트 차원별 상세(HTE)", expanded=False):
                 dim = st.selectbox("세그먼트 차원", dims, index=0)
-                hte_dim = compute_hte(led, seg_cols=[dim], min_n=150)
+                hte_dim = segment_hte([dim], min_n=150)
                 if hte_dim is None or hte_dim.empty:
                     st.caption("선택한 차원에서 HTE를 계산할 수 없습니다.")
                 else:
@@ -1561,7 +1534,7 @@ with tabs[2]:
         with st.expander("검토 대상 Top 고위험 청구 (Evidence)", expanded=False):
             keep = [c for c in [
                 "claim_date", "claim_id", "score", "decision", "paid_amount",
-                "channel", "product_line", "product", "region", "hospital_grade", "risk_reasons"
+                "channel", "product_line", "product", "region", "hospital_grade", "risk_reasons", "top_features"
             ] if c in top.columns]
             top_show = top[keep].head(25).copy()
             top_show = apply_business_labels(top_show)
@@ -1651,6 +1624,15 @@ with tabs[4]:
         rows.append({"자료":label, "파일":f, "상태":"존재" if exists(path_out(f)) else "없음", "수정시각": mtime(path_out(f)) if exists(path_out(f)) else "—"})
     st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True, height=240)
 
+    st.markdown("### 파이프라인 단계 실행 시간")
+    stage_trend, stage_latest = stage_duration_trend()
+    if stage_latest.empty:
+        st.caption("단계 실행 기록(out/stage_spans.jsonl)이 없습니다.")
+    else:
+        st.caption(f"최근 {len(stage_trend)}회 실행 · 단계별 소요(초) 추이")
+        st.line_chart(stage_trend, height=220)
+        st.dataframe(stage_latest, use_container_width=True, hide_index=True)
+
     st.markdown("### 실행 권고")
     st.markdown("""- 월간 리포트에 ‘가드레일 사유’와 ‘세그먼트 경보’를 고정 포함합니\n- 모델/정책 변경 시 본 탭 산출물로 재현 가능성(재계산)을 확인합니다.\n- 고위험 케이스는 정기 샘플링 감사로 선제 관리합니다.""")
 
@@ -24,6 +24,9 @@ cd "${ROOT_DIR}"
 
 PYTHON_BIN="${PYTHON_BIN:-python}"
 
+# One run id for all stage spans (out/stage_spans.jsonl)
+export FDS_RUN_ID="${FDS_RUN_ID:-$(date +%Y%m%dT%H%M%S)}"
+
 echo "[1/6] Create venv if missing"
 if [ ! -d ".venv" ]; then
   ${PYTHON_BIN} -m venv .venv
@@ -43,24 +46,8 @@ if [ "${MODE}" = "demo" ]; then
   python -m src.simulate_production_outputs --scenario GO --days 120 --seed 42
 else
   echo "[3/6] Run full pipeline (train->score->impact->stats->guardrails->report)"
-  python -m src.train
-  python -m src.validate
-  python -m src.calibrate
-
-  python -m src.score_batch_prod
-  # Optional: champion/challenger comparison
-  python -m src.score_cc || true
-
-  python -m src.experiment
-  python -m src.impact_causal || true
-  python -m src.impact_panel
-  python -m src.stats_impact_scipy
-  python -m src.segment_alerts
-  python -m src.guardrails
-
-  python -m src.executive_report
-  python -m src.executive_charts
-  python -m src.pdf_onepager
+  # all stages in one process (stage list/order: python -m src.pipeline full --list)
+  python -m src.pipeline full
 fi
 
 echo "[4/6] Quick check outputs"
@@ -0,0 +1,121 @@
+"""Process-wide cache of parsed out/ artifacts for the dashboard.
+
+Entries are keyed by (path, loader) and validated against the file's
+(mtime, size) stamp on every lookup, so a pipeline rewrite invalidates them
+automatically. The cache lives at module level: Streamlit re-executes the
+app script on each rerun but keeps imported modules, so parsed frames are
+shared across reruns, tabs and sessions. Memory is bounded by a byte cap with
+least-recently-used eviction. Callers always receive a private copy.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable
+
+import pandas as pd
+
+from src.config import CFG
+from src.io_utils import file_stamp
+
+
+def _nbytes(obj) -> int:
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True))
+    return 0
+
+
+def _copy(obj):
+    return obj.copy() if isinstance(obj, (pd.DataFrame, pd.Series)) else obj
+
+
+class ArtifactCache:
+    """LRU cache of loaded artifacts, bounded by `max_bytes`."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = int(max_bytes)
+        self._items: OrderedDict = OrderedDict()  # key -> (stamp, value, nbytes)
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _lookup(self, key, stamp):
+        with self._lock:
+            hit = self._items.get(key)
+            if hit is not None and hit[0] == stamp:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return True, hit[1]
+            self.misses += 1
+            return False, None
+
+    def _store(self, key, stamp, value):
+        n = _nbytes(value)
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            if n > self.max_bytes:
+                return
+            self._items[key] = (stamp, value, n)
+            self._bytes += n
+            while self._bytes > self.max_bytes and len(self._items) > 1:
+                _, (_, _, nb) = self._items.popitem(last=False)
+                self._bytes -= nb
+                self.evictions += 1
+
+    def load(self, path: str, loader: Callable[[str], object] = pd.read_csv):
+        """Parsed artifact at `path`; reparsed only when its (mtime, size) changes."""
+        stamp = file_stamp(path)
+        if stamp is None:
+            return pd.DataFrame()
+        key = (os.path.abspath(path), getattr(loader, "__qualname__", repr(loader)))
+        ok, value = self._lookup(key, stamp)
+        if not ok:
+            value = loader(path)
+            self._store(key, stamp, value)
+        return _copy(value)
+
+    def put(self, path: str, value, loader: Callable[[str], object] = pd.read_csv):
+        """Register `value` as what `loader(path)` would return for the file just written."""
+        stamp = file_stamp(path)
+        if stamp is None:
+            return
+        key = (os.path.abspath(path), getattr(loader, "__qualname__", repr(loader)))
+        self._store(key, stamp, _copy(value))
+
+    def derived(self, name: str, sources: Iterable[str], build: Callable[[], object]):
+        """Value computed from `sources`, rebuilt when any source file changes."""
+        sources = list(sources)
+        stamp = tuple(file_stamp(p) for p in sources)
+        key = ("derived", name, tuple(os.path.abspath(p) for p in sources))
+        ok, value = self._lookup(key, stamp)
+        if not ok:
+            value = build()
+            self._store(key, stamp, value)
+        return _copy(value)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._items),
+                "mb": round(self._bytes / 1e6, 1),
+                "cap_mb": round(self.max_bytes / 1e6, 1),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+ARTIFACTS = ArtifactCache(CFG.artifact_cache_mb * 1024 * 1024)
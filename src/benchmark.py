@@ -0,0 +1,211 @@
+"""End-to-end pipeline benchmark on synthetic claims of increasing size.
+
+For every size the `make full` stages (src.pipeline.FULL) run as separate processes in an
+isolated work directory (.bench/run-<size>/) on a synthetic data/claims.csv
+from src.synth_claims. Per-stage wall/CPU time, peak RSS and row counts come
+from the stage spans (src.instrument); throughput is claims per second.
+
+Results are appended to out/benchmark_results.csv, one row per (size, stage),
+and compared with a stored baseline (benchmarks/baseline.csv): a stage is
+flagged when its wall time or peak memory exceeds the baseline by more than
+--tolerance (and by more than MIN_ABS_WALL_S / MIN_ABS_RSS_MB in absolute
+terms, so millisecond stages don't flap).
+
+  python -m src.benchmark --sizes 10k,1m,10m
+  python -m src.benchmark --sizes 10k --save-baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.config import CFG
+from src.instrument import read_spans
+from src.pipeline import FULL
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(ROOT, ".bench")
+RESULTS_PATH = os.path.join(ROOT, CFG.out_dir, "benchmark_results.csv")
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baseline.csv")
+
+DEFAULT_SIZES = "10k,1m,10m"
+DEFAULT_TOLERANCE = 0.2
+MIN_ABS_WALL_S = 0.5
+MIN_ABS_RSS_MB = 50.0
+
+RESULT_COLS = [
+    "bench_run", "git_rev", "started_at", "size", "stage", "status",
+    "wall_s", "cpu_s", "peak_rss_mb", "rows_in", "rows_out", "claims_per_s",
+    "baseline_wall_s", "baseline_peak_rss_mb", "wall_ratio", "regression",
+]
+
+
+def parse_size(s: str) -> int:
+    """'10k' / '1m' / '2.5M' / '5000' -> int rows."""
+    s = s.strip().lower().replace("_", "")
+    mult = {"k": 1_000, "m": 1_000_000, "b": 1_000_000_000}.get(s[-1:], 1)
+    return int(float(s[:-1] if mult > 1 else s) * mult)
+
+
+def size_label(n: int) -> str:
+    for unit, div in (("m", 1_000_000), ("k", 1_000)):
+        if n >= div and n % div == 0:
+            return f"{n // div}{unit}"
+    return str(n)
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return ""
+
+
+def prepare_workdir(rows: int, seed: int) -> str:
+    """Fresh work dir with assets/models from the repo and a cached synthetic dataset."""
+    from src.synth_claims import generate
+
+    label = size_label(rows)
+    data = os.path.join(BENCH_DIR, "data", f"claims_{label}_s{seed}.csv")
+    if not os.path.exists(data):
+        print(f"… generating {rows:,} synthetic claims -> {data}")
+        generate(data, rows=rows, seed=seed, workers=os.cpu_count() or 1)
+
+    work = os.path.join(BENCH_DIR, f"run-{label}")
+    shutil.rmtree(work, ignore_errors=True)
+    os.makedirs(os.path.join(work, "data"))
+    os.makedirs(os.path.join(work, CFG.out_dir))
+    shutil.copytree(os.path.join(ROOT, "assets"), os.path.join(work, "assets"))
+    if os.path.isdir(os.path.join(ROOT, CFG.model_dir)):
+        shutil.copytree(os.path.join(ROOT, CFG.model_dir), os.path.join(work, CFG.model_dir))
+    try:
+        os.link(data, os.path.join(work, CFG.data_claims))
+    except OSError:
+        shutil.copy(data, os.path.join(work, CFG.data_claims))
+    return work
+
+
+def run_size(rows: int, seed: int, bench_run: str, stages=FULL) -> pd.DataFrame:
+    """Run the stages for one size; one result row per stage.
+
+    Each stage runs in its own process (through the pipeline runner) so the
+    peak RSS of the stage span is that stage's own high-water mark.
+    """
+    work = prepare_workdir(rows, seed)
+    run_id = f"{bench_run}-{size_label(rows)}"
+    env = dict(os.environ, FDS_RUN_ID=run_id, FDS_SPANS="1",
+               PYTHONPATH=os.pathsep.join([ROOT, os.environ.get("PYTHONPATH", "")]).rstrip(os.pathsep))
+
+    recs = []
+    for s in stages:
+        t0 = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-m", "src.pipeline", "full", "--only", s.name, "--strict", "--no-cache"],
+                              cwd=work, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        wall = time.perf_counter() - t0
+        status = "ok" if proc.returncode == 0 else "error"
+        recs.append({"stage": s.name, "status": status, "proc_wall_s": wall})
+        print(f"  {size_label(rows):>5} {s.name:<28} {wall:8.2f}s {status}")
+        if status == "error":
+            lines = [l for l in proc.stdout.splitlines() if s.name in l and "failed" in l]
+            print("🟨 benchmark:", (lines or [f"{s.name} failed"])[-1])
+            if not s.optional:
+                break
+
+    res = pd.DataFrame(recs)
+    spans = read_spans(os.path.join(work, CFG.out_dir, "stage_spans.jsonl"))
+    if not spans.empty:
+        st = spans[(spans["run_id"] == run_id) & (spans["kind"] == "stage")]
+        st = st.groupby("name", as_index=False).agg(
+            wall_s=("wall_s", "sum"), cpu_s=("cpu_s", "sum"), peak_rss_mb=("peak_rss_mb", "max"),
+            rows_in=("rows_in", "sum"), rows_out=("rows_out", "sum"),
+        )
+        res = res.merge(st, left_on="stage", right_on="name", how="left").drop(columns=["name"])
+    for c in ["wall_s", "cpu_s", "peak_rss_mb", "rows_in", "rows_out"]:
+        if c not in res.columns:
+            res[c] = np.nan
+    # stages without a stage span fall back to the process wall time
+    res["wall_s"] = res["wall_s"].fillna(res["proc_wall_s"])
+    res["size"] = rows
+    res["claims_per_s"] = (rows / res["wall_s"].where(res["wall_s"] > 0)).round(1)
+    return res.drop(columns=["proc_wall_s"])
+
+
+def read_baseline(path: str = BASELINE_PATH) -> pd.DataFrame:
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    return pd.read_csv(path)
+
+
+def flag_regressions(res: pd.DataFrame, baseline: pd.DataFrame, tolerance: float = DEFAULT_TOLERANCE) -> pd.DataFrame:
+    """Attach baseline numbers per (size, stage) and a regression flag."""
+    out = res.copy()
+    if baseline.empty:
+        out["baseline_wall_s"] = np.nan
+        out["baseline_peak_rss_mb"] = np.nan
+    else:
+        b = baseline[["size", "stage", "wall_s", "peak_rss_mb"]].rename(
+            columns={"wall_s": "baseline_wall_s", "peak_rss_mb": "baseline_peak_rss_mb"})
+        out = out.merge(b, on=["size", "stage"], how="left")
+    out["wall_ratio"] = (out["wall_s"] / out["baseline_wall_s"]).round(3)
+    slow = (out["wall_s"] > out["baseline_wall_s"] * (1 + tolerance)) & \
+           (out["wall_s"] - out["baseline_wall_s"] > MIN_ABS_WALL_S)
+    fat = (out["peak_rss_mb"] > out["baseline_peak_rss_mb"] * (1 + tolerance)) & \
+          (out["peak_rss_mb"] - out["baseline_peak_rss_mb"] > MIN_ABS_RSS_MB)
+    out["regression"] = np.where(slow & fat, "time+memory", np.where(slow, "time", np.where(fat, "memory", "")))
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the full pipeline on synthetic claims.")
+    ap.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated claim counts, e.g. 10k,1m,10m")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed slowdown vs baseline (0.2 = +20%%)")
+    ap.add_argument("--baseline", default=BASELINE_PATH)
+    ap.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    ap.add_argument("--fail-on-regression", action="store_true", help="Exit 1 when any stage regresses")
+    args = ap.parse_args()
+
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+    bench_run = f"bench-{datetime.now().strftime('%Y%m%dT%H%M%S')}"
+    started = datetime.now().isoformat(timespec="seconds")
+    rev = _git_rev()
+
+    frames = []
+    for n in sizes:
+        print(f"▶ {size_label(n)} claims")
+        frames.append(run_size(n, args.seed, bench_run))
+    res = pd.concat(frames, ignore_index=True)
+    res["bench_run"], res["git_rev"], res["started_at"] = bench_run, rev, started
+
+    res = flag_regressions(res, read_baseline(args.baseline), args.tolerance)[RESULT_COLS]
+    os.makedirs(os.path.dirname(RESULTS_PATH), exist_ok=True)
+    res.to_csv(RESULTS_PATH, mode="a", index=False, header=not os.path.exists(RESULTS_PATH))
+    print("✅ appended", RESULTS_PATH, f"({len(res)} rows, run {bench_run})")
+
+    reg = res[res["regression"] != ""]
+    for _, r in reg.iterrows():
+        print(f"🟨 regression [{r['regression']}] {size_label(int(r['size']))} {r['stage']}: "
+              f"{r['wall_s']:.2f}s vs {r['baseline_wall_s']:.2f}s, {r['peak_rss_mb']} MB vs {r['baseline_peak_rss_mb']} MB")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        res[res["status"] == "ok"][["size", "stage", "wall_s", "cpu_s", "peak_rss_mb", "claims_per_s", "git_rev"]] \
+            .to_csv(args.baseline, index=False)
+        print("✅ wrote baseline", args.baseline)
+
+    if args.fail_on_regression and not reg.empty:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
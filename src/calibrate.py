@@ -1,4 +1,5 @@
 import json
+import os
 import numpy as np
 import pandas as pd
 from joblib import dump, load
@@ -7,9 +8,12 @@ from sklearn.model_selection import train_test_split
 
 from src.config import CFG
 from src.io_utils import read_csv
+from src.label_store import with_labels
+from src.instrument import span, stage
 
+@stage("calibrate")
 def calibrate(model_path: str, out_calibrator_path: str, meta_in: str, meta_out: str, method: str = "isotonic"):
-    df = read_csv(CFG.data_claims)
+    df = with_labels(read_csv(CFG.data_claims))
     if df.empty:
         raise SystemExit("Missing data for calibration")
 
@@ -29,7 +33,8 @@ def calibrate(model_path: str, out_calibrator_path: str, meta_in: str, meta_out:
         if X.shape[1] == 0:
             X = df[[CFG.paid_col]].rename(columns={CFG.paid_col: "paid_fallback"})
 
-    s = model.predict_proba(X)[:,1]
+    with span("predict_proba", rows=len(X)):
+        s = model.predict_proba(X)[:,1]
     s_train, s_test, y_train, y_test = train_test_split(s, y, test_size=0.2, random_state=42, stratify=y if y.sum()>10 else None)
 
     if method == "isotonic":
@@ -42,6 +47,8 @@ def calibrate(model_path: str, out_calibrator_path: str, meta_in: str, meta_out:
     else:
         raise SystemExit("Unsupported calibration method")
 
-if __name__ == "__main__":
-    import os
+def main():
     calibrate("models/fraud_lr.joblib", "models/calibrator.joblib", "models/meta.json", "models/meta.json", "isotonic")
+
+if __name__ == "__main__":
+    main()
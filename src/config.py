@@ -21,9 +21,25 @@ class CFG:
     target_mtd_saving_krw: int = 200_000_000
     target_qtd_saving_krw: int = 600_000_000
 
+    # Segment dimensions materialized into out/segment_cube.csv (dashboard HTE views)
+    segment_dims: tuple = ("channel", "product_line", "product", "region", "hospital_grade")
+
+    # Dashboard artifact cache (parsed out/ files shared across reruns/sessions)
+    artifact_cache_mb: int = 512
+
+    # In-process pipeline runner: frames handed between stages in memory (src/pipeline.py)
+    pipeline_memo_mb: int = 2048
+    # Worker processes for independent stages (1 = sequential in-process; 0 = CPU count).
+    # Each worker loads its own frames, so peak memory grows with it: parallel runs are opt-in (--workers)
+    pipeline_workers: int = 1
+    # Stage output cache keyed by code + input file hashes (src/stage_cache.py)
+    stage_cache_dir: str = ".cache/stages"
+    stage_cache_mb: int = 4096
+
     # Paths
     data_claims: str = "data/claims.csv"
     data_labels_feedback: str = "data/labels_feedback.csv"
+    data_labels_delta: str = "data/labels_delta.csv"  # label upserts not yet folded into data_claims
 
     out_dir: str = "out"
     model_dir: str = "models"
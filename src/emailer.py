@@ -1,8 +1,20 @@
-import os
+import csv
 import mimetypes
+import os
+import queue
 import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
 from email.message import EmailMessage
 from email.utils import formatdate
+from typing import Optional
+
+LOG_PATH = os.path.join("out", "email_send_log.csv")
+LOG_COLUMNS = ["ts", "status", "message", "recipients", "subject", "attempt", "elapsed_ms"]
 
 def _getenv(name: str, default: str = "") -> str:
     return os.getenv(name, default).strip()
@@ -12,6 +24,40 @@ def _parse_recipients(s: str) -> list[str]:
         return []
     return [x.strip() for x in s.split(",") if x.strip()]
 
+def _attachment_part(path: str) -> EmailMessage:
+    """Attachment MIME part (file read and base64-encoded here)."""
+    ctype, _ = mimetypes.guess_type(path)
+    if ctype is None:
+        ctype = "application/octet-stream"
+    maintype, subtype = ctype.split("/", 1)
+    with open(path, "rb") as f:
+        data = f.read()
+    part = EmailMessage()
+    part.set_content(data, maintype=maintype, subtype=subtype, filename=os.path.basename(path))
+    return part
+
+def build_message(mail_from: str, to: list[str], cc: list[str], subject: str, html_body: str,
+                  attachments: list[str], parts: Optional["AttachmentCache"] = None) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = mail_from
+    msg["To"] = ", ".join(to)
+    if cc:
+        msg["Cc"] = ", ".join(cc)
+    msg["Subject"] = subject
+    msg["Date"] = formatdate(localtime=True)
+
+    msg.set_content("This email contains an HTML report. Please view in an HTML-capable client.")
+    msg.add_alternative(html_body, subtype="html")
+
+    for path in attachments:
+        if not path or not os.path.exists(path):
+            continue
+        part = parts.part(path) if parts is not None else _attachment_part(path)
+        if msg.get_content_subtype() != "mixed":
+            msg.make_mixed()
+        msg.attach(part)
+    return msg
+
 def send_email(subject: str, html_body: str, attachments: list[str]) -> None:
     enabled = _getenv("MAIL_ENABLED", "0")
     if enabled != "1":
@@ -33,28 +79,7 @@ def send_email(subject: str, html_body: str, attachments: list[str]) -> None:
     if not to:
         raise RuntimeError("MAIL_TO is empty")
 
-    msg = EmailMessage()
-    msg["From"] = mail_from
-    msg["To"] = ", ".join(to)
-    if cc:
-        msg["Cc"] = ", ".join(cc)
-    msg["Subject"] = subject
-    msg["Date"] = formatdate(localtime=True)
-
-    msg.set_content("This email contains an HTML report. Please view in an HTML-capable client.")
-    msg.add_alternative(html_body, subtype="html")
-
-    for path in attachments:
-        if not path or not os.path.exists(path):
-            continue
-        ctype, _ = mimetypes.guess_type(path)
-        if ctype is None:
-            ctype = "application/octet-stream"
-        maintype, subtype = ctype.split("/", 1)
-        with open(path, "rb") as f:
-            data = f.read()
-        msg.add_attachment(data, maintype=maintype, subtype=subtype, filename=os.path.basename(path))
-
+    msg = build_message(mail_from, to, cc, subject, html_body, attachments)
     recipients = to + cc + bcc
 
     with smtplib.SMTP(host, port, timeout=30) as s:
@@ -64,3 +89,188 @@ def send_email(subject: str, html_body: str, attachments: list[str]) -> None:
         s.send_message(msg, from_addr=mail_from, to_addrs=recipients)
 
     print("email sent to:", recipients)
+
+
+# ---------------------------------------------------------------------------
+# Bulk distribution: pooled authenticated connections, concurrent sends.
+#
+# SMTP_STARTTLS=0 and an empty SMTP_USER connect in plain text without login,
+# which is what a local stand-in server expects, e.g.
+#   python -m aiosmtpd -n -l localhost:8025   (pip install aiosmtpd; smtpd left the stdlib in 3.12)
+# with SMTP_HOST=localhost SMTP_PORT=8025.
+
+@dataclass(frozen=True)
+class SMTPSettings:
+    host: str
+    port: int = 587
+    user: str = ""
+    pwd: str = ""
+    starttls: bool = True
+    timeout: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> "SMTPSettings":
+        host = _getenv("SMTP_HOST")
+        if not host:
+            raise RuntimeError("Missing SMTP_HOST env var")
+        return cls(host=host, port=int(_getenv("SMTP_PORT", "587")), user=_getenv("SMTP_USER"),
+                   pwd=_getenv("SMTP_PASS"), starttls=_getenv("SMTP_STARTTLS", "1") != "0",
+                   timeout=float(_getenv("SMTP_TIMEOUT", "30")))
+
+def connect(settings: SMTPSettings) -> smtplib.SMTP:
+    """Connected, TLS-upgraded and logged-in SMTP session."""
+    s = smtplib.SMTP(settings.host, settings.port, timeout=settings.timeout)
+    try:
+        s.ehlo()
+        if settings.starttls:
+            s.starttls()
+            s.ehlo()
+        if settings.user and settings.pwd:
+            s.login(settings.user, settings.pwd)
+    except Exception:
+        s.close()
+        raise
+    return s
+
+def _quit(s: smtplib.SMTP):
+    try:
+        s.quit()
+    except (smtplib.SMTPException, OSError):
+        s.close()
+
+class SMTPPool:
+    """At most `size` sessions in use at once; a session is reused until it fails."""
+
+    def __init__(self, settings: SMTPSettings, size: int = 4):
+        self.settings = settings
+        self._slots = threading.BoundedSemaphore(max(1, size))
+        self._idle: "queue.LifoQueue[smtplib.SMTP]" = queue.LifoQueue()
+        self.opened = 0
+
+    @contextmanager
+    def session(self):
+        with self._slots:
+            try:
+                s = self._idle.get_nowait()
+            except queue.Empty:
+                s = connect(self.settings)
+                self.opened += 1
+            try:
+                yield s
+            except BaseException:
+                _quit(s)  # state unknown after a failed transaction
+                raise
+            self._idle.put(s)
+
+    def close(self):
+        while True:
+            try:
+                _quit(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+class AttachmentCache:
+    """MIME parts per file, read and encoded once and attached to every message."""
+
+    def __init__(self):
+        self._parts: dict = {}
+        self._lock = threading.Lock()
+
+    def part(self, path: str) -> EmailMessage:
+        st = os.stat(path)
+        key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+        with self._lock:
+            if key not in self._parts:
+                self._parts[key] = _attachment_part(path)
+            # shared by every message: serializing only reads the part
+            return self._parts[key]
+
+class SendLog:
+    """Thread-safe appender of out/email_send_log.csv rows (one per attempt)."""
+
+    def __init__(self, path: str = LOG_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._checked = False
+
+    def _upgrade(self):
+        # logs written before the per-attempt columns: keep their rows under the new header
+        with open(self.path, newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        if rows and rows[0] == LOG_COLUMNS:
+            return
+        with open(self.path, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(LOG_COLUMNS)
+            w.writerows(r + [""] * (len(LOG_COLUMNS) - len(r)) for r in rows[1:])
+
+    def write(self, status: str, message: str, recipients=(), subject: str = "", attempt="", elapsed_ms=""):
+        row = [datetime.utcnow().isoformat() + "Z", status, message, ";".join(recipients), subject, attempt, elapsed_ms]
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            exists = os.path.exists(self.path)
+            if exists and not self._checked:
+                self._upgrade()
+            self._checked = True
+            with open(self.path, "a", newline="", encoding="utf-8") as f:
+                w = csv.writer(f)
+                if not exists:
+                    w.writerow(LOG_COLUMNS)
+                w.writerow(row)
+
+@dataclass
+class MailJob:
+    to: list
+    subject: str
+    html_body: str
+    attachments: list = field(default_factory=list)
+    cc: list = field(default_factory=list)
+    bcc: list = field(default_factory=list)
+
+def _retryable(e: Exception) -> bool:
+    """Connection drops and 4xx (temporary) replies are retried; 5xx and refusals are not."""
+    if isinstance(e, smtplib.SMTPRecipientsRefused):
+        return False
+    if isinstance(e, smtplib.SMTPResponseException):
+        return 400 <= e.smtp_code < 500
+    return isinstance(e, (smtplib.SMTPServerDisconnected, OSError))
+
+def send_bulk(jobs: list, settings: Optional[SMTPSettings] = None, mail_from: str = "", max_connections: int = 4,
+              retries: int = 2, backoff_s: float = 1.0, log: Optional[SendLog] = None) -> list[dict]:
+    """Send every MailJob over a pool of `max_connections` sessions; one log row per attempt.
+
+    Returns one {"recipients", "subject", "status", "attempts", "error"} per job, in order.
+    """
+    settings = settings or SMTPSettings.from_env()
+    mail_from = mail_from or _getenv("MAIL_FROM", settings.user)
+    log = log or SendLog()
+    parts = AttachmentCache()
+    pool = SMTPPool(settings, max_connections)
+
+    def send_one(job: MailJob) -> dict:
+        rcpts = list(job.to) + list(job.cc) + list(job.bcc)
+        msg = build_message(mail_from, list(job.to), list(job.cc), job.subject, job.html_body, job.attachments, parts)
+        attempt = 0
+        while True:
+            attempt += 1
+            t0 = time.perf_counter()
+            try:
+                with pool.session() as s:
+                    s.send_message(msg, from_addr=mail_from, to_addrs=rcpts)
+            except Exception as e:
+                ms = int((time.perf_counter() - t0) * 1000)
+                final = attempt > retries or not _retryable(e)
+                log.write("FAIL" if final else "RETRY", repr(e), rcpts, job.subject, attempt, ms)
+                if final:
+                    return {"recipients": rcpts, "subject": job.subject, "status": "FAIL", "attempts": attempt,
+                            "error": repr(e)}
+                time.sleep(backoff_s * attempt)
+                continue
+            log.write("OK", "sent", rcpts, job.subject, attempt, int((time.perf_counter() - t0) * 1000))
+            return {"recipients": rcpts, "subject": job.subject, "status": "OK", "attempts": attempt, "error": ""}
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, max_connections)) as ex:
+            return list(ex.map(send_one, jobs))
+    finally:
+        pool.close()
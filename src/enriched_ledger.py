@@ -0,0 +1,116 @@
+"""Decision ledger joined with claim attributes, materialized once per run.
+
+The dashboard tabs, the segment cube and explainability profiles all need the
+ledger with segment/feature columns from data/claims.csv. This stage performs
+that join once and stores the result as Parquet with categorical dtypes for
+low-cardinality string columns, so readers load a compact columnar frame
+instead of re-joining the claims file.
+
+Outputs:
+- out/decision_ledger_enriched.parquet
+"""
+
+from __future__ import annotations
+
+import os
+
+import pandas as pd
+
+from src.config import CFG
+from src.instrument import add_io, span, stage
+from src.io_utils import is_fresh, read_csv
+from src.schemas import DATE_FORMAT
+
+LEDGER_PATH = os.path.join(CFG.out_dir, "decision_ledger.csv")
+ENRICHED_PATH = os.path.join(CFG.out_dir, "decision_ledger_enriched.parquet")
+
+CLAIM_FILL_COLS = ["channel", "product_line", "product", "region", "hospital_grade", "hospital_id"]
+# Compared/grouped as plain strings across the app; never stored as categoricals.
+OBJECT_COLS = [CFG.id_col, "claim_date", "date", "exp_group", "group", "decision"]
+MAX_CATEGORY_RATIO = 0.5
+
+
+def enrich_with_claims(ledger: pd.DataFrame, claims: pd.DataFrame) -> pd.DataFrame:
+    """Join claim attributes onto the ledger (ledger columns win, claims fill gaps)."""
+    led = ledger.copy()
+    if not claims.empty and CFG.id_col in claims.columns and CFG.id_col in led.columns:
+        cols = [c for c in claims.columns if c not in [CFG.paid_col]]
+        led = led.merge(claims[cols], on=CFG.id_col, how="left", suffixes=("", "_claim"))
+    for c in CLAIM_FILL_COLS:
+        c2 = f"{c}_claim"
+        if c in led.columns and c2 in led.columns:
+            led[c] = led[c].where(led[c].notna(), led[c2])
+    return led
+
+
+def to_categoricals(df: pd.DataFrame) -> pd.DataFrame:
+    """Low-cardinality string columns -> category dtype."""
+    out = df.copy()
+    n = max(len(out), 1)
+    for c in out.columns:
+        if isinstance(out[c].dtype, (pd.CategoricalDtype, pd.StringDtype)):
+            out[c] = out[c].astype(object)  # typed CSV reads; re-decided below
+        if c in OBJECT_COLS or out[c].dtype != object:
+            continue
+        if out[c].nunique(dropna=True) / n <= MAX_CATEGORY_RATIO:
+            out[c] = out[c].astype("category")
+    return out
+
+
+def read_ledger(path: str = LEDGER_PATH) -> pd.DataFrame:
+    """Ledger CSV with claim_date back as its YYYY-MM-DD text (an OBJECT_COLS string here)."""
+    led = read_csv(path)
+    if "claim_date" in led.columns and led["claim_date"].dtype.kind == "M":
+        led["claim_date"] = led["claim_date"].dt.strftime(DATE_FORMAT)
+    return led
+
+
+def build_enriched_ledger(ledger: pd.DataFrame, claims: pd.DataFrame) -> pd.DataFrame:
+    """Enriched ledger without the redundant *_claim copies, categoricals applied."""
+    if ledger is None or ledger.empty:
+        return pd.DataFrame()
+    led = enrich_with_claims(ledger, claims)
+    led = led.drop(columns=[c for c in led.columns if c.endswith("_claim")])
+    return to_categoricals(led)
+
+
+def read_enriched_ledger(path: str = ENRICHED_PATH) -> pd.DataFrame:
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    return pd.read_parquet(path)
+
+
+def load_enriched_ledger(ledger_path: str = LEDGER_PATH, claims_path: str = CFG.data_claims,
+                         path: str = ENRICHED_PATH) -> pd.DataFrame:
+    """Materialized enriched ledger when fresh, else joined from the CSVs."""
+    if is_fresh(path, ledger_path, claims_path):
+        try:
+            with span("read_parquet", path=path):
+                led = read_enriched_ledger(path)
+                add_io(rows_in=len(led), bytes_read=os.path.getsize(path))
+            return led
+        except Exception:
+            pass
+    return build_enriched_ledger(read_ledger(ledger_path), read_csv(claims_path))
+
+
+@stage("enriched_ledger")
+def main():
+    led = read_ledger()
+    if led.empty:
+        print("🟨 enriched_ledger: missing ledger")
+        return
+
+    enriched = build_enriched_ledger(led, read_csv(CFG.data_claims))
+    try:
+        with span("write_parquet", path=ENRICHED_PATH):
+            enriched.to_parquet(ENRICHED_PATH, index=False)
+            add_io(rows_out=len(enriched), bytes_written=os.path.getsize(ENRICHED_PATH))
+    except ImportError as e:
+        print("🟨 enriched_ledger: parquet engine unavailable:", e)
+        return
+    print("✅ wrote", ENRICHED_PATH, enriched.shape)
+
+
+if __name__ == "__main__":
+    main()
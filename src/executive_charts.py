@@ -6,18 +6,46 @@ Outputs:
 - out/chart_impact_delta.png  (trend chart used by dashboard + PDF)
 
 This intentionally removes decorative 'monthly/cumulative saving' charts.
+
+Runs are incremental: out/impact_daily_delta.state.json records a digest of
+the ledger rows of every claim day. Only days whose digest changed (usually
+just the one still filling up, plus new ones) are read and re-aggregated; the
+other CSV rows are kept. Digests come from the column store's codes and
+dictionaries, so unchanged days are never decoded. The PNG is re-rendered
+only when the plotted points change.
 """
 
+import hashlib
+import json
 import os
+from typing import Dict, Optional
+
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.ticker import FuncFormatter
+
+from src.instrument import add_io, span, stage
+from src.io_utils import read_text, write_text
+from src.ledger_store import LEDGER_PATH, LedgerStore, load_ledger, open_store
+from src.schemas import eq_upper
 
 OUT_DIR = "out"
-LEDGER_PATH = os.path.join(OUT_DIR, "decision_ledger.csv")
+LEDGER_COLUMNS = ["claim_date", "date", "paid_amount", "paid", "exp_group", "group", "decision"]
 
 DAILY_DELTA_CSV = os.path.join(OUT_DIR, "impact_daily_delta.csv")
 DELTA_PNG = os.path.join(OUT_DIR, "chart_impact_delta.png")
+STATE_JSON = os.path.join(OUT_DIR, "impact_daily_delta.state.json")
+PLOT_DAYS = 60
+ISO_DAY = r"\d{4}-\d{2}-\d{2}"
+PRIME = 1_000_003  # folds the per-column hashes of a row into one
+
+
+def _upper(s: pd.Series) -> pd.Series:
+    """s.astype(str).str.upper(), once per category for categoricals."""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        # code -1 (missing) picks the trailing "NAN", as str(nan).upper() would
+        labels = np.append(s.cat.categories.astype(str).str.upper().to_numpy(dtype=object), "NAN")
+        return pd.Series(labels[s.cat.codes.to_numpy()], index=s.index)
+    return s.astype(str).str.upper()
 
 
 def _daily_group_metrics(ledger: pd.DataFrame) -> pd.DataFrame:
@@ -37,11 +65,12 @@ def _daily_group_metrics(ledger: pd.DataFrame) -> pd.DataFrame:
     # exp group
     if "exp_group" not in df.columns and "group" in df.columns:
         df["exp_group"] = df["group"]
-    df["exp_group"] = df.get("exp_group").astype(str).str.upper()
+    df["exp_group"] = _upper(df.get("exp_group"))
 
     # decision
     if "decision" not in df.columns:
         df["decision"] = "PAY"
+    df["is_review"] = eq_upper(df["decision"], "REVIEW")
 
     df = df.dropna(subset=["claim_date", "paid_amount"])
     if df.empty:
@@ -49,14 +78,10 @@ def _daily_group_metrics(ledger: pd.DataFrame) -> pd.DataFrame:
 
     df["date"] = df["claim_date"].dt.normalize()
 
-    def _review_rate(s: pd.Series) -> float:
-        ss = s.astype(str).str.upper()
-        return float((ss == "REVIEW").mean()) if len(ss) else 0.0
-
     g = df.groupby(["date", "exp_group"], as_index=False).agg(
         n=("paid_amount", "size"),
         avg_paid=("paid_amount", "mean"),
-        review_rate=("decision", _review_rate),
+        review_rate=("is_review", "mean"),
     )
     return g
 
@@ -81,17 +106,19 @@ def _build_daily_delta(g: pd.DataFrame) -> pd.DataFrame:
     return m.sort_values("date")
 
 
-def _plot_delta(m: pd.DataFrame):
+def _plot_delta(m: pd.DataFrame, path: str = DELTA_PNG, title: str = "Daily Δ Paid (Control − Treatment)"):
     if m is None or m.empty:
         return
+    import matplotlib.pyplot as plt
+    from matplotlib.ticker import FuncFormatter
 
-    df = m.tail(60)
+    df = m.tail(PLOT_DAYS)
 
     fig, ax = plt.subplots(figsize=(10.24, 4.0), dpi=140)
     ax.plot(df["date"], df["delta_paid_c_minus_t"], linewidth=2)
     ax.axhline(0, linestyle="--", linewidth=1)
 
-    ax.set_title("Daily Δ Paid (Control − Treatment)", loc="left", fontsize=12, fontweight="bold")
+    ax.set_title(title, loc="left", fontsize=12, fontweight="bold")
     ax.grid(True, axis="y", linewidth=0.4, alpha=0.25)
     ax.spines["top"].set_visible(False)
     ax.spines["right"].set_visible(False)
@@ -99,11 +126,80 @@ def _plot_delta(m: pd.DataFrame):
     ax.yaxis.set_major_formatter(FuncFormatter(lambda x, pos: f"{int(x):,}"))
     fig.tight_layout()
 
-    os.makedirs(OUT_DIR, exist_ok=True)
-    fig.savefig(DELTA_PNG)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fig.savefig(path)
     plt.close(fig)
 
 
+def _day_digests(codes: np.ndarray, labels: np.ndarray, hashes: np.ndarray) -> Dict[str, str]:
+    """{day: "rows:hash sum"} over the rows of each day (order-independent)."""
+    ok = codes >= 0
+    n = np.bincount(codes[ok], minlength=len(labels))
+    sums = np.zeros(len(labels), dtype=np.uint64)
+    np.add.at(sums, codes[ok], hashes[ok])
+    return {str(labels[i]): f"{n[i]}:{int(sums[i])}" for i in np.flatnonzero(n)}
+
+
+def _day_index(store: Optional[LedgerStore], ledger: Optional[pd.DataFrame]):
+    """(day code per row, day labels, row hashes) when claim_date is YYYY-MM-DD text, else None.
+
+    From the column store this only touches the mapped codes/values: string
+    columns hash their dictionaries, nothing is decoded per row.
+    """
+    if store is not None:
+        if "claim_date" not in store.columns:
+            return None
+        try:
+            values = np.asarray(store.dictionary("claim_date").to_numpy(zero_copy_only=False), dtype=object)
+        except KeyError:  # a number column
+            return None
+        codes = store.array("claim_date")
+        hashes = np.zeros(store.rows, dtype=np.uint64)
+        for c in LEDGER_COLUMNS:
+            if c in store.columns:
+                hashes = hashes * np.uint64(PRIME) + store.hashes(c)
+    else:
+        s = ledger.get("claim_date")
+        if s is None or isinstance(s.dtype, pd.CategoricalDtype) or not pd.api.types.is_string_dtype(s.dtype):
+            return None
+        codes, values = pd.factorize(s)
+        values = np.asarray(values, dtype=object)
+        hashes = pd.util.hash_pandas_object(ledger, index=False).to_numpy()
+    if not pd.Series(values, dtype=object).str.match(ISO_DAY).all():
+        return None
+    # "2024-01-02 10:00" and "2024-01-02" are the same day of the chart
+    day_codes, labels = pd.factorize(pd.Series(values, dtype=object).str.slice(0, 10))
+    codes = np.where(codes >= 0, day_codes[np.maximum(codes, 0)], -1)
+    return codes, np.asarray(labels, dtype=object), hashes
+
+
+def _file_sha(path: str) -> Optional[str]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _read_state() -> dict:
+    try:
+        return json.loads(read_text(STATE_JSON) or "{}")
+    except ValueError:
+        return {}
+
+
+def _previous(state: dict) -> Optional[pd.DataFrame]:
+    """The daily delta CSV of the last run, when it is the one the state describes."""
+    if not state.get("days") or state.get("csv_sha") != _file_sha(DAILY_DELTA_CSV):
+        return None
+    # round_trip: the plotted floats (and so the PNG key) must match a full recompute
+    prev = pd.read_csv(DAILY_DELTA_CSV, float_precision="round_trip")
+    if "date" not in prev.columns:
+        return None
+    prev["date"] = pd.to_datetime(prev["date"])
+    return prev
+
+
+@stage("executive_charts")
 def main():
     os.makedirs(OUT_DIR, exist_ok=True)
 
@@ -111,20 +207,59 @@ def main():
         print("Missing ledger:", LEDGER_PATH)
         return
 
-    ledger = pd.read_csv(LEDGER_PATH)
-    if ledger.empty:
+    store = open_store(source=LEDGER_PATH)
+    ledger = None if store is not None else load_ledger(columns=LEDGER_COLUMNS)
+    if (store.rows if store is not None else len(ledger)) == 0:
         print("Empty ledger")
         return
 
-    g = _daily_group_metrics(ledger)
-    m = _build_daily_delta(g)
+    state = _read_state()
+    index = _day_index(store, ledger)
+    digests = _day_digests(*index) if index is not None else None
+    prev = _previous(state) if digests is not None else None
+
+    m = None
+    if prev is not None:
+        old = state["days"]
+        rebuild = sorted({d for d, v in digests.items() if old.get(d) != v} | (set(old) - set(digests)))
+        keep = prev[~prev["date"].dt.strftime("%Y-%m-%d").isin(rebuild)]
+        codes, labels, _ = index
+        rows = np.isin(codes, np.flatnonzero(np.isin(labels, rebuild)))
+        with span("read_changed_days", days=len(rebuild), rows=int(rows.sum())):
+            fresh = store.frame(LEDGER_COLUMNS, rows=rows) if store is not None else ledger[rows]
+            m_new = _build_daily_delta(_daily_group_metrics(fresh)) if len(fresh) else pd.DataFrame()
+        if m_new.empty or list(m_new.columns) == list(prev.columns):
+            m = pd.concat([keep, m_new], ignore_index=True) if not m_new.empty else keep.reset_index(drop=True)
+            m = m.sort_values("date", kind="stable")
+            if rebuild:
+                m.to_csv(DAILY_DELTA_CSV, index=False, encoding="utf-8")
+                add_io(rows_out=len(m))
+            print(f"Rebuilt {len(rebuild)} changed day(s) ({len(fresh)} ledger rows), kept {len(keep)}")
 
-    if m.empty:
-        print("Not enough CONTROL/TREATMENT overlap to compute daily delta")
-        return
-
-    m.to_csv(DAILY_DELTA_CSV, index=False, encoding="utf-8")
-    _plot_delta(m)
+    if m is None or m.empty:
+        if ledger is None:
+            ledger = load_ledger(columns=LEDGER_COLUMNS)
+        m = _build_daily_delta(_daily_group_metrics(ledger))
+        if m.empty:
+            print("Not enough CONTROL/TREATMENT overlap to compute daily delta")
+            if os.path.exists(STATE_JSON):
+                os.remove(STATE_JSON)
+            return
+        m.to_csv(DAILY_DELTA_CSV, index=False, encoding="utf-8")
+        add_io(rows_out=len(m))
+
+    plotted = m.tail(PLOT_DAYS)[["date", "delta_paid_c_minus_t"]].to_csv(index=False)
+    png_key = hashlib.sha256(plotted.encode("utf-8")).hexdigest()
+    if state.get("png_key") == png_key and state.get("png_sha") == _file_sha(DELTA_PNG):
+        print("🟨 executive_charts: chart data unchanged, kept", DELTA_PNG)
+    else:
+        with span("plot_delta"):
+            _plot_delta(m)
+
+    new_state = {"png_key": png_key, "png_sha": _file_sha(DELTA_PNG), "csv_sha": _file_sha(DAILY_DELTA_CSV)}
+    if digests is not None:
+        new_state["days"] = digests
+    write_text(json.dumps(new_state, indent=2), STATE_JSON)
 
     print("Wrote:", DAILY_DELTA_CSV)
     print("Wrote:", DELTA_PNG)
@@ -1,23 +1,24 @@
 import os
-import pandas as pd
 from datetime import datetime
-from src.io_utils import read_csv, write_text
+from src.io_utils import read_rows, to_bool, to_float, write_text
+from src.instrument import stage
 
+@stage("executive_report")
 def main():
     os.makedirs("out", exist_ok=True)
-    panel = read_csv("out/impact_panel.csv")
-    guard = read_csv("out/guardrails_decision.csv")
-    seg = read_csv("out/segment_alerts.csv")
-    sig = read_csv("out/impact_significance_scipy.csv")
+    panel = read_rows("out/impact_panel.csv")
+    guard = read_rows("out/guardrails_decision.csv")
+    seg = read_rows("out/segment_alerts.csv")
+    sig = read_rows("out/impact_significance_scipy.csv")
 
     ts = datetime.now().strftime("%Y-%m-%d %H:%M")
     effect = "NA"
-    if not panel.empty and "effect_per_claim" in panel.columns:
-        effect = f"{int(round(float(panel['effect_per_claim'].iloc[0]))):,}원"
+    if panel and "effect_per_claim" in panel[0]:
+        effect = f"{int(round(to_float(panel[0]['effect_per_claim']))):,}원"
 
-    decision = guard["decision"].iloc[0] if (not guard.empty and "decision" in guard.columns) else "NA"
-    n_alert = int(seg["is_alert"].fillna(False).astype(bool).sum()) if (not seg.empty and "is_alert" in seg.columns) else 0
-    pval = f"{float(sig['welch_p_value'].iloc[0]):.4g}" if (not sig.empty and "welch_p_value" in sig.columns) else "NA"
+    decision = guard[0]["decision"] if (guard and "decision" in guard[0]) else "NA"
+    n_alert = sum(to_bool(r["is_alert"]) for r in seg) if (seg and "is_alert" in seg[0]) else 0
+    pval = f"{to_float(sig[0]['welch_p_value']):.4g}" if (sig and "welch_p_value" in sig[0]) else "NA"
 
     md = f"""# Fraud Program Executive Summary
 
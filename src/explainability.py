@@ -118,6 +118,134 @@ def summarize_rule_reasons(row: Dict[str, Any], topk: int = 3) -> Tuple[str, Lis
     return short, top
 
 
+# ----------------------------
+# Columnar rule engine (same results as summarize_rule_reasons, whole frames)
+# ----------------------------
+
+
+def _num_col(df: pd.DataFrame, col: str, default: float) -> np.ndarray:
+    """Column-wise `_num(row.get(col), default)`."""
+    if col not in df.columns:
+        return np.full(len(df), default, dtype=float)
+    s = df[col]
+    if isinstance(s.dtype, np.dtype) and s.dtype.kind in "biuf":
+        return s.to_numpy(dtype=float)
+    # object/categorical/nullable: None, pd.NA and junk fall back to the default
+    return np.fromiter((_num(x, default) for x in s.astype(object)), dtype=float, count=len(s))
+
+
+def _fmt(fmt: str, v: np.ndarray) -> np.ndarray:
+    return np.array([fmt.format(x) for x in v], dtype=object)
+
+
+def risk_rule_matrix(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, List[Any]]:
+    """Evaluate all RULES over a frame.
+
+    Returns (triggered[n, R], magnitude[n, R], evidence) in RULES order, where
+    evidence[r] is a function of row positions -> evidence strings (formatted
+    lazily, only for the reasons that are actually reported).
+    """
+    n = len(df)
+    elapsed = _num_col(df, "elapsed_months", np.nan)
+    if "claim_amount" in df.columns:
+        claim_amt = _num_col(df, "claim_amount", 0.0)
+    else:
+        claim_amt = _num_col(df, "paid_amount", 0.0)
+    prem = _num_col(df, "premium_monthly", 1.0)
+    prem = np.where(np.isnan(prem) | (prem >= 1.0), prem, 1.0)  # max(x, 1.0) keeps NaN
+    prior_n = _num_col(df, "prior_claim_cnt_12m", 0.0)
+    acct = _num_col(df, "bank_account_changed_recently", 0.0)
+    dist = _num_col(df, "provider_distance_km", 0.0)
+    docs = _num_col(df, "doc_uploaded_cnt", 0.0)
+    ratio = claim_amt / prem
+
+    with np.errstate(invalid="ignore"):
+        cols = {
+            "short_tenure": (~np.isnan(elapsed) & (elapsed < 6), np.where(np.isnan(elapsed), 0.0, 6 - elapsed),
+                             lambda i: np.where(np.isnan(elapsed[i]), "elapsed_months=NA", _fmt("elapsed_months={:.0f}", elapsed[i]))),
+            "high_ratio": (ratio >= 50, np.minimum(5.0, ratio / 50.0),
+                           lambda i: _fmt("claim/premium={:.1f}", ratio[i])),
+            "many_prior": (prior_n >= 2, prior_n,
+                           lambda i: _fmt("prior_claim_cnt_12m={:.0f}", prior_n[i])),
+            "acct_change": (acct >= 1, acct,
+                            lambda i: _fmt("bank_account_changed_recently={:.0f}", acct[i])),
+            "far_provider": (dist >= 30, dist,
+                             lambda i: _fmt("provider_distance_km={:.1f}", dist[i])),
+            "low_docs": (docs <= 1, np.maximum(0.0, 2 - docs),
+                         lambda i: _fmt("doc_uploaded_cnt={:.0f}", docs[i])),
+        }
+
+    trig = np.zeros((n, len(RULES)), dtype=bool)
+    mag = np.zeros((n, len(RULES)), dtype=float)
+    evidence = []
+    for j, rr in enumerate(RULES):
+        t, m, ev = cols[rr.key]
+        trig[:, j] = t
+        mag[:, j] = m
+        evidence.append(ev)
+    return trig, mag, evidence
+
+
+def rule_reasons_frame(df: pd.DataFrame, topk: int = 3, details: bool = True) -> pd.DataFrame:
+    """Vectorized `summarize_rule_reasons` for every row of `df`.
+
+    Columns (index aligned with df):
+    - risk_reasons: short text, identical to summarize_rule_reasons()[0]
+    - reason_codes: ';'-joined rule keys of the reported reasons
+    - risk_reason_details: list of dicts as in summarize_rule_reasons()[1] (when details=True)
+    """
+    cols = ["risk_reasons", "reason_codes"] + (["risk_reason_details"] if details else [])
+    if df is None or len(df) == 0:
+        return pd.DataFrame(columns=cols, index=getattr(df, "index", None))
+
+    n = len(df)
+    trig, mag, evidence = risk_rule_matrix(df)
+    weights = np.array([rr.weight for rr in RULES], dtype=float)
+    score = weights * (1.0 + mag)
+    # descending score; ties keep RULES order (stable, like list.sort(reverse=True))
+    key = np.where(trig, -score, np.inf)
+    order = np.argsort(key, axis=1, kind="stable")[:, :topk]
+    ntop = np.minimum(trig.sum(axis=1), topk)
+
+    # evidence strings only for reported (row, rule) pairs
+    ev = np.empty((n, len(RULES)), dtype=object)
+    rows = np.arange(n)
+    for k in range(order.shape[1]):
+        live = k < ntop
+        for j in range(len(RULES)):
+            sel = rows[live & (order[:, k] == j)]
+            if len(sel):
+                ev[sel, j] = evidence[j](sel)
+
+    titles = [rr.title for rr in RULES]
+    keys = [rr.key for rr in RULES]
+    short, codes, det = [], [], []
+    for i in range(n):
+        top = order[i, : ntop[i]]
+        if len(top) == 0:
+            short.append("—")
+            codes.append("")
+            if details:
+                det.append([])
+            continue
+        short.append("; ".join([f"{titles[j]} ({ev[i, j]})" for j in top]))
+        codes.append(";".join([keys[j] for j in top]))
+        if details:
+            det.append([{
+                "reason": titles[j],
+                "rule": keys[j],
+                "weight": RULES[j].weight,
+                "magnitude": float(mag[i, j]),
+                "evidence": ev[i, j],
+                "score": float(score[i, j]),
+            } for j in top])
+
+    out = {"risk_reasons": short, "reason_codes": codes}
+    if details:
+        out["risk_reason_details"] = det
+    return pd.DataFrame(out, index=df.index)
+
+
 # ----------------------------
 # Profile comparison utilities
 # ----------------------------
@@ -189,6 +317,71 @@ def compare_profiles(df: pd.DataFrame, score_col: str = "score") -> Dict[str, pd
 # ----------------------------
 
 
+def split_linear_pipeline(pipeline: Any) -> Optional[Tuple[Any, Any]]:
+    """(preprocessor, linear classifier) of a sklearn Pipeline, or None."""
+    if not hasattr(pipeline, "named_steps"):
+        return None
+    steps = pipeline.named_steps
+    # heuristics
+    pre = None
+    clf = None
+    for k, v in steps.items():
+        if "pre" in k or "prep" in k or "transform" in k or "ct" in k:
+            pre = v
+        if "log" in k or "clf" in k or "model" in k:
+            clf = v
+    if pre is None:
+        # fallback: first step
+        pre = list(steps.values())[0]
+    if clf is None:
+        clf = list(steps.values())[-1]
+    if getattr(clf, "coef_", None) is None:
+        return None
+    return pre, clf
+
+
+def contribution_matrix(Xt: Any, coef: Any) -> Any:
+    """CSR matrix of x_ij * w_j keeping only positive contributions.
+
+    Works on the sparse transform directly (no per-row densify); dense input
+    is converted once.
+    """
+    from scipy import sparse
+
+    w = np.asarray(coef, dtype=float).reshape(-1)
+    X = Xt.tocsr() if sparse.issparse(Xt) else sparse.csr_matrix(np.asarray(Xt, dtype=float))
+    C = sparse.csr_matrix(X.multiply(w.reshape(1, -1)))
+    C.data[~(C.data > 0)] = 0.0
+    C.eliminate_zeros()
+    return C
+
+
+def top_contributions(C: Any, names: Any, topk: int = 5) -> List[List[Dict[str, Any]]]:
+    """Top-k positive contributors per row of a contribution CSR matrix.
+
+    Entries are ranked by contribution (descending); ties (e.g. one-hot
+    columns with equal coefficients) go to the lower column index.
+    """
+    n = C.shape[0]
+    out: List[List[Dict[str, Any]]] = [[] for _ in range(n)]
+    if C.nnz == 0 or topk <= 0:
+        return out
+    names = [str(x) for x in names]
+    row = np.repeat(np.arange(n), np.diff(C.indptr))
+    order = np.lexsort((C.indices, -C.data, row))
+    r = row[order]
+    rank = np.arange(len(order)) - C.indptr[r]
+    keep = order[rank < topk]
+    for i, j, v in zip(row[keep].tolist(), C.indices[keep].tolist(), C.data[keep].tolist()):
+        out[i].append({"feature": names[j], "contrib": v})
+    return out
+
+
+def format_contributions(items: List[Dict[str, Any]]) -> str:
+    """Compact 'feature:contrib;...' text for storing contributions in CSVs."""
+    return ";".join([f"{t['feature']}:{t['contrib']:.4g}" for t in items])
+
+
 def linear_model_contributions(pipeline: Any, X: pd.DataFrame, topk: int = 5) -> List[List[Dict[str, Any]]]:
     """Best-effort contributions for linear models inside a sklearn Pipeline.
 
@@ -199,24 +392,10 @@ def linear_model_contributions(pipeline: Any, X: pd.DataFrame, topk: int = 5) ->
     If introspection fails, returns empty lists.
     """
     try:
-        # Locate steps
-        if hasattr(pipeline, "named_steps"):
-            steps = pipeline.named_steps
-            # heuristics
-            pre = None
-            clf = None
-            for k, v in steps.items():
-                if "pre" in k or "prep" in k or "transform" in k or "ct" in k:
-                    pre = v
-                if "log" in k or "clf" in k or "model" in k:
-                    clf = v
-            if pre is None:
-                # fallback: first step
-                pre = list(steps.values())[0]
-            if clf is None:
-                clf = list(steps.values())[-1]
-        else:
+        parts = split_linear_pipeline(pipeline)
+        if parts is None:
             return [[] for _ in range(len(X))]
+        pre, clf = parts
 
         Xt = pre.transform(X)
         if hasattr(pre, "get_feature_names_out"):
@@ -224,29 +403,6 @@ def linear_model_contributions(pipeline: Any, X: pd.DataFrame, topk: int = 5) ->
         else:
             names = np.array([f"f{i}" for i in range(Xt.shape[1])])
 
-        coef = getattr(clf, "coef_", None)
-        if coef is None:
-            return [[] for _ in range(len(X))]
-        w = np.asarray(coef).reshape(-1)
-
-        # contributions = x_i * w
-        out: List[List[Dict[str, Any]]] = []
-        for i in range(Xt.shape[0]):
-            row = Xt[i]
-            if hasattr(row, "toarray"):
-                row = row.toarray().reshape(-1)
-            else:
-                row = np.asarray(row).reshape(-1)
-            contrib = row * w
-            idx = np.argsort(contrib)[::-1]
-            top = []
-            for j in idx[: topk * 3]:
-                if contrib[j] <= 0:
-                    continue
-                top.append({"feature": str(names[j]), "contrib": float(contrib[j])})
-                if len(top) >= topk:
-                    break
-            out.append(top)
-        return out
+        return top_contributions(contribution_matrix(Xt, clf.coef_), names, topk=topk)
     except Exception:
         return [[] for _ in range(len(X))]
@@ -1,24 +1,25 @@
-import os
-import pandas as pd
-from src.io_utils import read_csv, write_csv
+from src.io_utils import read_rows, to_bool, to_float, write_rows
+from src.instrument import stage
 
+@stage("guardrails")
 def main():
-    panel = read_csv("out/impact_panel.csv")
-    sig = read_csv("out/impact_significance_scipy.csv")
-    seg = read_csv("out/segment_alerts.csv")
+    # a few rows each: stdlib csv keeps this cron-driven stage free of pandas
+    panel = read_rows("out/impact_panel.csv")
+    sig = read_rows("out/impact_significance_scipy.csv")
+    seg = read_rows("out/segment_alerts.csv")
 
     decision = "HOLD"
     reasons = []
 
     effect = None
-    if not panel.empty and "effect_per_claim" in panel.columns:
+    if panel and "effect_per_claim" in panel[0]:
         # prefer Welch if present
-        hit = panel[panel["method"]=="Welch t-test (SciPy)"]
-        if len(hit):
-            effect = float(hit["effect_per_claim"].iloc[0])
+        hit = [r for r in panel if r.get("method")=="Welch t-test (SciPy)"]
+        if hit:
+            effect = to_float(hit[0]["effect_per_claim"])
             reasons.append("effect_source=Welch")
         else:
-            effect = float(panel["effect_per_claim"].iloc[0])
+            effect = to_float(panel[0]["effect_per_claim"])
             reasons.append("effect_source=panel_first")
     if effect is None:
         reasons.append("missing_effect")
@@ -28,19 +29,19 @@ def main():
         reasons.append(f"effect_non_positive={effect:.2f}")
         return _emit("ROLLBACK", reasons)
 
-    if sig.empty or "welch_p_value" not in sig.columns:
+    if not sig or "welch_p_value" not in sig[0]:
         reasons.append("missing_significance")
         return _emit("HOLD", reasons)
 
-    p = float(sig["welch_p_value"].iloc[0])
-    ci_lo = float(sig["ci95_t_low"].iloc[0]) if "ci95_t_low" in sig.columns else None
+    p = to_float(sig[0]["welch_p_value"])
+    ci_lo = to_float(sig[0]["ci95_t_low"]) if "ci95_t_low" in sig[0] else None
     if not (p < 0.05 or (ci_lo is not None and ci_lo > 0)):
         reasons.append(f"not_significant(p={p:.4g}, ci_lo={ci_lo})")
         return _emit("HOLD", reasons)
     reasons.append(f"significant(p={p:.4g})")
 
-    if not seg.empty and "is_alert" in seg.columns:
-        n_alert = int(seg["is_alert"].fillna(False).astype(bool).sum())
+    if seg and "is_alert" in seg[0]:
+        n_alert = sum(to_bool(r["is_alert"]) for r in seg)
         if n_alert > 0:
             reasons.append(f"segment_alerts={n_alert}")
             return _emit("ROLLBACK", reasons)
@@ -49,8 +50,8 @@ def main():
     return _emit("GO", reasons)
 
 def _emit(decision, reasons):
-    out = pd.DataFrame([{"decision": decision, "reasons": " | ".join(reasons)}])
-    write_csv(out, "out/guardrails_decision.csv")
+    write_rows([{"decision": decision, "reasons": " | ".join(reasons)}], "out/guardrails_decision.csv",
+               ["decision", "reasons"])
     print("✅ wrote out/guardrails_decision.csv:", decision)
     return decision
 
@@ -2,9 +2,11 @@ import pandas as pd
 import numpy as np
 from src.config import CFG
 from src.io_utils import read_csv, write_csv
+from src.instrument import stage
 
+@stage("impact_causal")
 def main():
-    led = read_csv("out/decision_ledger.csv")
+    led = read_csv("out/decision_ledger.csv", columns=["exp_group", CFG.paid_col])
     if led.empty or "exp_group" not in led.columns:
         print("🟨 impact_causal: missing ledger/exp_group")
         return
@@ -1,6 +1,8 @@
 import pandas as pd
 from src.io_utils import read_csv, write_csv
+from src.instrument import stage
 
+@stage("impact_panel")
 def main():
     rows = []
     for f in ["out/impact_causal.csv"]:
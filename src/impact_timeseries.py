@@ -0,0 +1,173 @@
+"""Daily impact timeseries from the production decision ledger.
+
+saving_est_krw = effect_per_claim * (TREATMENT claims of the day), with the
+effect taken from out/impact_panel.csv (Welch first, like the dashboard).
+
+The stored file is updated incrementally: per-day counts are compared with
+the previous run, rows before the first changed day are kept as-is (with the
+effect they were booked at), and only the tail is recomputed. New dates are
+appended and saving_cum_krw continues from the last kept total, so late data
+for an old day re-books that day and everything after it.
+
+With a fresh column store the per-day counts come from the claim_date and
+exp_group codes (nothing is decoded per row), so every stored day is checked
+by its (n_claims, n_treatment), including a correction that moves rows between
+CONTROL and TREATMENT. Days are booked at the effect of the run that (re)built
+them: a run where only the effect estimate moved keeps the stored rows and
+reports them as up to date.
+
+Outputs:
+- out/impact_monthly_timeseries.csv
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.config import CFG
+from src.io_utils import read_csv, write_csv
+from src.instrument import stage
+from src.ledger_store import LEDGER_PATH, open_store
+
+PANEL_PATH = os.path.join(CFG.out_dir, "impact_panel.csv")
+SIG_PATH = os.path.join(CFG.out_dir, "impact_significance_scipy.csv")
+TS_PATH = os.path.join(CFG.out_dir, "impact_monthly_timeseries.csv")
+
+TS_COLS = ["date", "saving_est_krw", "saving_cum_krw", "n_claims", "n_treatment", "effect_per_claim"]
+COUNT_COLS = ["n_claims", "n_treatment"]
+EFFECT_METHODS = ["Welch t-test (SciPy)", "Unadjusted (Diff-in-Means)"]
+
+
+def pick_effect(panel: pd.DataFrame, sig: Optional[pd.DataFrame] = None) -> Optional[float]:
+    """Effect per claim (KRW): preferred panel method, else the significance file."""
+    if panel is not None and not panel.empty and {"method", "effect_per_claim"} <= set(panel.columns):
+        for m in EFFECT_METHODS:
+            hit = pd.to_numeric(panel.loc[panel["method"] == m, "effect_per_claim"], errors="coerce").dropna()
+            if len(hit):
+                return float(hit.iloc[0])
+        hit = pd.to_numeric(panel["effect_per_claim"], errors="coerce").dropna()
+        if len(hit):
+            return float(hit.iloc[0])
+    if sig is not None and not sig.empty and "effect_per_claim" in sig.columns:
+        hit = pd.to_numeric(sig["effect_per_claim"], errors="coerce").dropna()
+        if len(hit):
+            return float(hit.iloc[0])
+    return None
+
+
+def read_ledger_days(path: str = LEDGER_PATH, claims_path: str = CFG.data_claims) -> pd.DataFrame:
+    """Ledger projected to claim_id/claim_date/exp_group (claim_date filled from claims if absent)."""
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    led = read_csv(path, columns=[CFG.id_col, "claim_date", "exp_group"])
+    if "claim_date" not in led.columns and CFG.id_col in led.columns and os.path.exists(claims_path):
+        claims = read_csv(claims_path, columns=[CFG.id_col, "claim_date"])
+        if "claim_date" in claims.columns:
+            led = led.merge(claims.drop_duplicates(CFG.id_col), on=CFG.id_col, how="left")
+    return led
+
+
+def store_daily_counts(path: str = LEDGER_PATH) -> Optional[pd.DataFrame]:
+    """daily_counts from the column store's codes (None when the store is stale or lacks the columns)."""
+    store = open_store(source=path) if path == LEDGER_PATH else None
+    if store is None or not {"claim_date", "exp_group"} <= set(store.columns):
+        return None
+    try:
+        dates, groups = (store.dictionary(c).to_numpy(zero_copy_only=False) for c in ("claim_date", "exp_group"))
+    except KeyError:  # a number column
+        return None
+    # day and treatment flag per dictionary value, then per row through the codes
+    day_codes, labels = pd.factorize(pd.to_datetime(pd.Series(dates, dtype=object), errors="coerce")
+                                     .dt.strftime("%Y-%m-%d"))
+    treat = pd.Series(groups, dtype=object).astype(str).str.upper().eq("TREATMENT").to_numpy()
+    d, g = store.array("claim_date"), store.array("exp_group")
+    day = np.where(d >= 0, np.append(day_codes, -1)[d], -1)
+    ok = day >= 0
+    is_treat = np.append(treat, False)[g[ok]]
+    counts = pd.DataFrame({
+        "date": np.asarray(labels, dtype=object),
+        "n_claims": np.bincount(day[ok], minlength=len(labels)),
+        "n_treatment": np.bincount(day[ok], weights=is_treat, minlength=len(labels)).astype("int64"),
+    })
+    return counts[counts["n_claims"] > 0].sort_values("date", ignore_index=True)
+
+
+def daily_counts(ledger: pd.DataFrame) -> pd.DataFrame:
+    """Per-day ledger partitions: n_claims and n_treatment by claim_date."""
+    if ledger is None or ledger.empty or "claim_date" not in ledger.columns or "exp_group" not in ledger.columns:
+        return pd.DataFrame(columns=["date"] + COUNT_COLS)
+    d = pd.to_datetime(ledger["claim_date"], errors="coerce").dt.strftime("%Y-%m-%d")
+    g = pd.DataFrame({
+        "date": d,
+        "n_claims": 1,
+        "n_treatment": ledger["exp_group"].astype(str).str.upper().eq("TREATMENT").astype(int),
+    }).dropna(subset=["date"])
+    return g.groupby("date", as_index=False)[COUNT_COLS].sum().sort_values("date", ignore_index=True)
+
+
+def first_changed_date(prev: pd.DataFrame, counts: pd.DataFrame) -> Optional[str]:
+    """Earliest date whose counts differ from the stored rows (None when nothing changed)."""
+    if prev is None or prev.empty or not set(COUNT_COLS) <= set(prev.columns):
+        return counts["date"].min() if not counts.empty else None
+    m = prev[["date"] + COUNT_COLS].merge(counts, on="date", how="outer", suffixes=("_prev", ""))
+    diff = np.zeros(len(m), dtype=bool)
+    for c in COUNT_COLS:
+        diff |= m[f"{c}_prev"].fillna(-1).to_numpy() != m[c].fillna(-1).to_numpy()
+    return m.loc[diff, "date"].min() if diff.any() else None
+
+
+def update_timeseries(prev: pd.DataFrame, counts: pd.DataFrame,
+                      effect_per_claim: float) -> Tuple[pd.DataFrame, Optional[str]]:
+    """Keep stored rows before the first changed day; rebuild the tail with the current effect.
+
+    Returns the series and the first rebuilt day (None when nothing changed).
+    """
+    if prev is None or prev.empty or not set(COUNT_COLS) <= set(prev.columns):
+        prev = pd.DataFrame(columns=TS_COLS)
+    prev = prev[TS_COLS].copy()
+    prev["date"] = prev["date"].astype(str)
+
+    start = first_changed_date(prev, counts)
+    if start is None:
+        return prev, None
+
+    keep = prev[prev["date"] < start]
+    tail = counts[counts["date"] >= start].copy()
+    tail["effect_per_claim"] = float(effect_per_claim)
+    tail["saving_est_krw"] = np.round(tail["n_treatment"] * float(effect_per_claim)).astype("int64")
+    base = float(keep["saving_cum_krw"].iloc[-1]) if not keep.empty else 0.0
+    tail["saving_cum_krw"] = (base + tail["saving_est_krw"].cumsum()).astype("int64")
+    if keep.empty:
+        return tail[TS_COLS].reset_index(drop=True), start
+    return pd.concat([keep, tail[TS_COLS]], ignore_index=True), start
+
+
+@stage("impact_timeseries")
+def main():
+    effect = pick_effect(read_csv(PANEL_PATH), read_csv(SIG_PATH))
+    if effect is None:
+        print("🟨 impact_timeseries: no effect_per_claim in impact panel")
+        return
+
+    prev = read_csv(TS_PATH)
+    counts = store_daily_counts()
+    if counts is None:
+        counts = daily_counts(read_ledger_days())
+    if counts.empty:
+        print("🟨 impact_timeseries: ledger has no claim_date/exp_group")
+        return
+
+    ts, start = update_timeseries(prev, counts, effect)
+    if start is None:
+        print("✅ impact_timeseries: up to date", TS_PATH)
+        return
+    write_csv(ts, TS_PATH)
+    print("✅ wrote", TS_PATH, f"(rebuilt from {start}, {len(ts)} days)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Lightweight per-stage timing/memory instrumentation.
+
+Every pipeline entry point is wrapped in a stage span; hot sections (model
+predict/fit, CSV I/O through io_utils) open nested spans. Each closed span is
+appended as one JSON line to out/stage_spans.jsonl:
+
+  run_id, span_id, parent_id, name, kind, started_at,
+  wall_s, cpu_s, peak_rss_mb, rss_delta_mb, rows_in, rows_out, bytes_read,
+  bytes_written, status, attrs
+
+peak_rss_mb is the highest RSS reached since the enclosing stage started: on
+Linux the kernel's high-water mark (VmHWM) is reset when a stage opens, so a
+stage run after a heavier one in the same process reports its own peak. Where
+that reset is unavailable it is the process high-water mark (ru_maxrss).
+rss_delta_mb is the change of the current RSS over the span (memory it kept).
+
+Row/byte counters roll up from nested spans into their parents, so a stage
+record carries the totals of everything it read and wrote. Spans are only
+recorded inside a stage (dashboard reads stay silent). All stages of one
+orchestrated run share FDS_RUN_ID; set FDS_SPANS=0 to disable.
+"""
+
+from __future__ import annotations
+
+import functools
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from src.config import CFG
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SPANS_PATH = os.path.join(CFG.out_dir, "stage_spans.jsonl")
+COUNTERS = ("rows_in", "rows_out", "bytes_read", "bytes_written")
+
+_RUN_ID = os.environ.get("FDS_RUN_ID") or f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+_IDS = itertools.count(1)
+_LOCAL = threading.local()
+_WRITE_LOCK = threading.Lock()
+
+
+def _enabled() -> bool:
+    return os.environ.get("FDS_SPANS", "1") != "0"
+
+
+def _stack() -> list:
+    if not hasattr(_LOCAL, "stack"):
+        _LOCAL.stack = []
+    return _LOCAL.stack
+
+
+def _proc_kb(field: str):
+    """`field` of /proc/self/status in KB (None off Linux)."""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak() -> bool:
+    """Reset the kernel's RSS high-water mark of this process (Linux >= 4.0)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _rss_mb():
+    """Current RSS in MB (None where /proc is unavailable)."""
+    kb = _proc_kb("VmRSS")
+    return None if kb is None else round(kb / 1024, 1)
+
+
+def _peak_rss_mb(since_reset: bool = False):
+    """Peak RSS in MB: since the last _reset_peak() when it succeeded, else of the whole process."""
+    if since_reset:
+        kb = _proc_kb("VmHWM")
+        if kb is not None:
+            return round(kb / 1024, 1)
+    if resource is None:
+        return None
+    r = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return round(r / (1024 * 1024) if sys.platform == "darwin" else r / 1024, 1)
+
+
+def active() -> bool:
+    return _enabled() and bool(_stack())
+
+
+def add_io(rows_in: int = 0, rows_out: int = 0, bytes_read: int = 0, bytes_written: int = 0):
+    """Add row/byte counts to the innermost open span (no-op outside a stage)."""
+    st = _stack()
+    if not st:
+        return
+    c = st[-1]["counters"]
+    c["rows_in"] += int(rows_in)
+    c["rows_out"] += int(rows_out)
+    c["bytes_read"] += int(bytes_read)
+    c["bytes_written"] += int(bytes_written)
+
+
+def _emit(rec: dict):
+    os.makedirs(os.path.dirname(SPANS_PATH) or ".", exist_ok=True)
+    line = json.dumps(rec, ensure_ascii=False, default=str)
+    with _WRITE_LOCK:
+        with open(SPANS_PATH, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+@contextmanager
+def span(name: str, kind: str = "section", **attrs):
+    """Time a block. Sections are recorded only when nested inside a stage."""
+    st = _stack()
+    if not _enabled() or (kind != "stage" and not st):
+        yield
+        return
+
+    s = {
+        "span_id": next(_IDS),
+        "parent_id": st[-1]["span_id"] if st else None,
+        "counters": dict.fromkeys(COUNTERS, 0),
+        # the outermost stage resets the high-water mark; nested spans share it
+        "peak_reset": st[-1]["peak_reset"] if st else _reset_peak(),
+    }
+    rss0 = _rss_mb()
+    st.append(s)
+    started = datetime.now().isoformat(timespec="seconds")
+    w0, c0 = time.perf_counter(), time.process_time()
+    status = "ok"
+    try:
+        yield
+    except BaseException as e:
+        status = "ok" if isinstance(e, SystemExit) and not e.code else "error"
+        raise
+    finally:
+        st.pop()
+        if st:
+            for k, v in s["counters"].items():
+                st[-1]["counters"][k] += v
+        rss1 = _rss_mb()
+        _emit({
+            "run_id": _RUN_ID,
+            "span_id": s["span_id"],
+            "parent_id": s["parent_id"],
+            "name": name,
+            "kind": kind,
+            "started_at": started,
+            "wall_s": round(time.perf_counter() - w0, 4),
+            "cpu_s": round(time.process_time() - c0, 4),
+            "peak_rss_mb": _peak_rss_mb(s["peak_reset"]),
+            "rss_delta_mb": round(rss1 - rss0, 1) if None not in (rss0, rss1) else None,
+            **s["counters"],
+            "status": status,
+            "attrs": attrs,
+        })
+
+
+def stage(name: str):
+    """Decorator for a pipeline entry point: `@stage("score_batch_prod")`."""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name, kind="stage"):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def read_spans(path: str = SPANS_PATH):
+    """All recorded spans as a DataFrame (empty when missing)."""
+    import pandas as pd
+
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return pd.DataFrame()
+    return pd.read_json(path, lines=True, dtype={"run_id": str})
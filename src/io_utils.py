@@ -1,18 +1,272 @@
+"""File helpers shared by the stages.
+
+pandas is imported on first use, not at module load: small decision stages
+(guardrails, rollout, report) use read_rows/write_rows and start without it.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
 import os
-import pandas as pd
+import stat
+import tempfile
+from contextlib import contextmanager, nullcontext
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+
+from src.instrument import active, add_io, span
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# In-process frame memo (set by the pipeline runner): written/parsed CSVs are
+# served from memory to later stages while the files stay the durable artifacts.
+_MEMO = None
+_CSV_SPECIAL = {"", "True", "False", "TRUE", "FALSE", "true", "false",
+                "NA", "N/A", "NaN", "nan", "NULL", "null", "None", "n/a", "<NA>", "-NaN", "-nan", "#N/A"}
+
+
+@contextmanager
+def frame_memo(max_mb: int):
+    """Serve read_csv from frames written/read earlier in this process (LRU, `max_mb`)."""
+    from src.artifact_cache import ArtifactCache
+
+    global _MEMO
+    prev, _MEMO = _MEMO, ArtifactCache(max_mb * 1024 * 1024)
+    try:
+        yield _MEMO
+    finally:
+        _MEMO = prev
+
+
+def _csv_stable(df: pd.DataFrame, schema=None) -> bool:
+    """True when reading df.to_csv(index=False) back gives the same columns/dtypes.
+
+    Category / Arrow string columns count as their string values (read_csv
+    re-applies the schema dtypes); datetime columns only when the schema
+    parses them and they are whole dates (written as YYYY-MM-DD).
+    """
+    import pandas as pd
+    from pandas.api.types import infer_dtype
+
+    if not all(isinstance(c, str) for c in df.columns) or df.columns.duplicated().any():
+        return False
+    dates = set(schema.dates) if schema is not None else set()
+    for c in df.columns:
+        s = df[c]
+        if s.dtype.kind in "iufb":
+            continue
+        if s.dtype.kind == "M":
+            if c not in dates or getattr(s.dt, "tz", None) is not None or (s.dropna() != s.dropna().dt.normalize()).any():
+                return False
+            continue
+        if isinstance(s.dtype, pd.CategoricalDtype) or isinstance(s.dtype, pd.StringDtype):
+            s = s.astype(object)
+        elif s.dtype != object:
+            return False
+        v = s.dropna()
+        if v.empty or infer_dtype(v, skipna=True) != "string":
+            return False
+        if v.isin(_CSV_SPECIAL).any() or pd.to_numeric(v, errors="coerce").notna().any():
+            return False
+    return True
+
+
+def _header(path: str) -> List[str]:
+    with open(path, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), [])
+
+
+def apply_schema(df: pd.DataFrame, schema) -> pd.DataFrame:
+    """Cast an untyped frame (e.g. one about to be written) to the schema's dtypes."""
+    import pandas as pd
+    from src.schemas import DATE_FORMAT
+
+    out = df.copy()
+    for c, t in schema.dtypes(out.columns).items():
+        if out[c].dtype != t:
+            out[c] = out[c].astype(t)
+        if t == "category" and not out[c].cat.categories.is_monotonic_increasing:
+            out[c] = out[c].cat.reorder_categories(out[c].cat.categories.sort_values())  # as read_csv(dtype="category")
+    for c in schema.parse_dates(out.columns):
+        if out[c].dtype.kind != "M":
+            try:
+                out[c] = pd.to_datetime(out[c], format=DATE_FORMAT)
+            except (TypeError, ValueError):
+                pass  # like read_csv: unparseable dates stay strings
+    return out
+
+
+def _read_arrow(path: str, schema, cols: Sequence[str] = None):
+    """pyarrow.csv read with the schema's column types, as pandas' C parser would see it."""
+    import pandas as pd
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+    from src.schemas import CSV_NA_VALUES
+
+    present = set(cols if cols is not None else _header(path))
+    types = {c: pa.string() for c in schema.strings(present)}
+    # ids as large_string so that to_pandas maps them (and only them) to string[pyarrow]
+    types.update({c: pa.large_string() for c in schema.ids if c in present})
+    types.update({c: pa.dictionary(pa.int32(), pa.string()) for c in schema.categories if c in present})
+    opts = dict(include_columns=cols, null_values=list(CSV_NA_VALUES), strings_can_be_null=True)
+    tbl = pacsv.read_csv(path, convert_options=pacsv.ConvertOptions(column_types=types, **opts))
+    # Arrow infers dates/timestamps the C parser leaves as text; keep those verbatim too
+    inferred = {f.name: pa.string() for f in tbl.schema if pa.types.is_temporal(f.type)}
+    if inferred:
+        types.update(inferred)
+        tbl = pacsv.read_csv(path, convert_options=pacsv.ConvertOptions(column_types=types, **opts))
+    return tbl.to_pandas(types_mapper={pa.large_string(): pd.StringDtype("pyarrow")}.get)
+
+
+def _read_typed(path: str, columns: Sequence[str] = None):
+    """CSV typed by the registered schema (pyarrow reader), with an optional projection."""
+    import pandas as pd
+    from src.schemas import schema_for
+
+    schema = schema_for(path)
+    cols = None
+    if columns is not None:
+        want = set(columns)
+        cols = [c for c in _header(path) if c in want]
+    if schema is None:
+        return pd.read_csv(path, usecols=cols)
+    return apply_schema(_read_arrow(path, schema, cols), schema)
+
+
+def _read(path: str, columns: Sequence[str] = None):
+    """(frame, memo_hit)"""
+    if _MEMO is None:
+        return _read_typed(path, columns), False
+    hits = _MEMO.hits
+    df = _MEMO.load(path, _read_typed)  # whole file, so other projections hit too
+    if columns is not None:
+        want = set(columns)
+        df = df[[c for c in df.columns if c in want]]
+    return df, _MEMO.hits > hits
 
 def ensure_dirs(*dirs: str):
     for d in dirs:
         os.makedirs(d, exist_ok=True)
 
-def read_csv(path: str) -> pd.DataFrame:
+def read_csv(path: str, columns: Sequence[str] = None) -> pd.DataFrame:
+    """CSV as a DataFrame, typed by src.schemas when the path has a schema.
+
+    columns= reads only those columns (ones missing from the file are skipped,
+    so callers keep their `.get()` fallbacks); missing files give an empty frame.
+    """
     if not os.path.exists(path):
+        import pandas as pd
+
         return pd.DataFrame()
-    return pd.read_csv(path)
+    if not active():
+        return _read(path, columns)[0]
+    with span("read_csv", path=path, columns=len(columns) if columns is not None else None):
+        df, hit = _read(path, columns)
+        add_io(rows_in=len(df), bytes_read=0 if hit else os.path.getsize(path))
+    return df
 
 def write_csv(df: pd.DataFrame, path: str):
     os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
-    df.to_csv(path, index=False)
+    if not active():
+        df.to_csv(path, index=False)
+    else:
+        with span("write_csv", path=path):
+            df.to_csv(path, index=False)
+            add_io(rows_out=len(df), bytes_written=os.path.getsize(path))
+    if _MEMO is not None:
+        from src.schemas import schema_for
+
+        schema = schema_for(path)
+        if _csv_stable(df, schema):
+            df = df.reset_index(drop=True)
+            _MEMO.put(path, apply_schema(df, schema) if schema is not None else df, _read_typed)
+
+def csv_bytes(table, header: bool = True) -> bytes:
+    """pyarrow Table as the bytes DataFrame.to_csv(index=False) would write.
+
+    pyarrow writes the rows (several times faster than pandas); floats are
+    formatted by numpy as pandas does (repr, NaN -> empty) and bools as
+    True/False. Values that need quoting, and column types without a
+    pandas-identical Arrow rendering, fall back to pandas' writer.
+    """
+    import numpy as np
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+
+    def pandas_csv():
+        return table.to_pandas().to_csv(index=False, header=header).encode("utf-8")
+
+    cols = []
+    for col in table.columns:
+        t = col.type
+        if pa.types.is_floating(t):
+            v = col.to_numpy()
+            col = pa.array(v.astype(str), mask=np.isnan(v))
+        elif pa.types.is_boolean(t):
+            col = pa.array(np.where(col.to_numpy(zero_copy_only=False), "True", "False"), mask=col.is_null().to_numpy(zero_copy_only=False))
+        elif not (pa.types.is_integer(t) or pa.types.is_string(t) or pa.types.is_large_string(t)):
+            return pandas_csv()
+        cols.append(col)
+    out = io.BytesIO()
+    if header:
+        head = io.StringIO()
+        csv.writer(head, lineterminator="\n").writerow(table.schema.names)
+        out.write(head.getvalue().encode("utf-8"))
+    try:
+        pacsv.write_csv(pa.table(cols, names=table.schema.names), out,
+                        pacsv.WriteOptions(include_header=False, quoting_style="none"))
+    except pa.ArrowInvalid:  # a value with a comma, quote or newline
+        return pandas_csv()
+    return out.getvalue()
+
+def read_rows(path: str) -> List[Dict[str, str]]:
+    """Rows of a small CSV as dicts of strings (stdlib csv; [] when missing)."""
+    if not os.path.exists(path):
+        return []
+    with span("read_csv", path=path) if active() else nullcontext():
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        if active():
+            add_io(rows_in=len(rows), bytes_read=os.path.getsize(path))
+    return rows
+
+def write_rows(rows: Sequence[dict], path: str, columns: Sequence[str]):
+    """Write dict rows as CSV (same layout as DataFrame.to_csv(index=False))."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with span("write_csv", path=path) if active() else nullcontext():
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=list(columns), lineterminator="\n")
+            w.writeheader()
+            w.writerows(rows)
+        if active():
+            add_io(rows_out=len(rows), bytes_written=os.path.getsize(path))
+
+def to_float(v) -> float:
+    """CSV cell -> float, NaN for blanks/unparseable (like pd.to_numeric(errors="coerce"))."""
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return float("nan")
+
+def to_bool(v) -> bool:
+    """CSV cell -> bool; blanks are False (like .fillna(False).astype(bool) on a bool column)."""
+    return str(v).strip().lower() in ("true", "1", "1.0")
+
+def is_fresh(path: str, *sources: str) -> bool:
+    """True when `path` exists and is not older than any existing source file."""
+    if not os.path.exists(path):
+        return False
+    m = os.path.getmtime(path)
+    return all(m >= os.path.getmtime(s) for s in sources if os.path.exists(s))
+
+def file_stamp(path: str) -> Optional[tuple]:
+    """(mtime_ns, size) of a file, or None when it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
 
 def read_text(path: str) -> str:
     if not os.path.exists(path):
@@ -23,3 +277,49 @@ def write_text(text: str, path: str):
     os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
     with open(path, "w", encoding="utf-8") as f:
         f.write(text)
+
+_UMASK = None
+
+def _umask() -> int:
+    """Process umask, read once (/proc on Linux; os.umask round trip elsewhere)."""
+    global _UMASK
+    if _UMASK is None:
+        try:
+            with open("/proc/self/status", "r") as f:
+                _UMASK = next(int(l.split()[1], 8) for l in f if l.startswith("Umask:"))
+        except (OSError, StopIteration, ValueError):
+            _UMASK = os.umask(0o022)
+            os.umask(_UMASK)
+    return _UMASK
+
+@contextmanager
+def atomic_path(path: str, suffix: str = ""):
+    """Temp file next to `path`, renamed over it when the block succeeds.
+
+    Readers see the old or the new file, never a partial one. The result keeps
+    the mode of the file it replaces (a new file gets 0666 minus the umask, as
+    with open()), not mkstemp's owner-only 0600.
+    """
+    d = os.path.dirname(path) or "."
+    os.makedirs(d, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=d, prefix=".tmp-", suffix=suffix)
+    os.close(fd)
+    try:
+        yield tmp
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_umask()
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def write_json_atomic(obj, path: str, **dump_kwargs):
+    """json.dump(obj) to `path` through atomic_path."""
+    import json
+
+    with atomic_path(path) as tmp, open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, **dump_kwargs)
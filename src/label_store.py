@@ -0,0 +1,160 @@
+"""Incremental claim labels: the claims file plus a delta of upserts by claim_id.
+
+- data/claims.csv            : base labels (the `label` column)
+- data/labels_delta.csv      : claim_id,label,seq rows appended per refresh, only
+                               for labels that actually changed (last row wins)
+- data/labels_state.json     : {"seq", "compacted_seq", "feedback"} — seq of the
+                               last committed refresh and the (mtime, size) of the
+                               feedback file it applied
+
+A refresh reads the feedback file and the claim_id/label columns of the
+claims file, appends the changed labels to the delta and replaces the state
+file; the claims file itself is not rewritten. Readers merge the delta on read
+(with_labels), and changes(since) gives the claims relabelled after a given
+refresh. Once the delta reaches COMPACT_ROWS rows it is folded into the
+claims file and truncated.
+
+  python -m src.update_labels
+  python -m src.label_store --compact
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+
+import pandas as pd
+
+from src.config import CFG
+from src.instrument import add_io, span
+from src.io_utils import read_csv, write_csv, write_json_atomic
+
+DELTA_PATH = CFG.data_labels_delta
+STATE_PATH = "data/labels_state.json"
+DELTA_COLUMNS = [CFG.id_col, CFG.label_col, "seq"]
+COMPACT_ROWS = 50_000
+
+
+def _write_state(state: dict, path: str = STATE_PATH):
+    """Atomic replace: the state file is the commit point of a refresh."""
+    write_json_atomic(state, path, indent=2)
+
+
+def load_state() -> dict:
+    if not os.path.exists(STATE_PATH):
+        return {"seq": 0, "compacted_seq": 0, "feedback": None}
+    return json.load(open(STATE_PATH, "r", encoding="utf-8"))
+
+
+def _delta(since: int = 0) -> pd.DataFrame:
+    """Committed delta rows with since < seq, one per claim_id (last wins)."""
+    if not os.path.exists(DELTA_PATH) or os.path.getsize(DELTA_PATH) == 0:
+        return pd.DataFrame(columns=DELTA_COLUMNS)
+    with span("read_label_delta", path=DELTA_PATH):
+        # rows of a refresh that died before replacing the state are ignored (torn lines included)
+        d = pd.read_csv(DELTA_PATH, dtype={CFG.id_col: str}, on_bad_lines="skip")
+        d["seq"] = pd.to_numeric(d["seq"], errors="coerce")
+        d = d[(d["seq"] > since) & (d["seq"] <= load_state()["seq"])]
+        add_io(rows_in=len(d), bytes_read=os.path.getsize(DELTA_PATH))
+    d[CFG.label_col] = pd.to_numeric(d[CFG.label_col], errors="coerce").fillna(0).astype(int)
+    return d.drop_duplicates(CFG.id_col, keep="last")
+
+
+def changes(since: int = 0) -> pd.DataFrame:
+    """claim_id, label, seq of every label changed by refreshes after `since` (state seq)."""
+    return _delta(since).reset_index(drop=True)
+
+
+def with_labels(df: pd.DataFrame) -> pd.DataFrame:
+    """Claims frame with the delta applied to its label column (unchanged when there is none)."""
+    d = _delta()
+    if d.empty or df.empty or CFG.id_col not in df.columns:
+        return df
+    new = df[CFG.id_col].astype(str).map(d.set_index(CFG.id_col)[CFG.label_col])
+    base = df[CFG.label_col] if CFG.label_col in df.columns else 0
+    label = new.where(new.notna(), base)
+    return df.assign(**{CFG.label_col: label.astype(int) if label.notna().all() else label})
+
+
+def _current(ids: pd.Series) -> pd.Series:
+    """Effective label per claim_id in `ids` (NaN for claims without one)."""
+    claims = read_csv(CFG.data_claims, columns=[CFG.id_col, CFG.label_col])
+    cur = pd.Series(dtype=float)
+    if CFG.label_col in claims.columns:
+        cur = pd.to_numeric(claims[CFG.label_col], errors="coerce")
+        cur.index = claims[CFG.id_col].astype(str)
+        cur = cur[~cur.index.duplicated(keep="last")]
+    d = _delta()
+    if not d.empty:
+        cur = d.set_index(CFG.id_col)[CFG.label_col].astype(float).combine_first(cur)
+    return ids.map(cur)
+
+
+def _torn(path: str) -> bool:
+    """True when the file's last line lacks its newline (an interrupted append)."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return False
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) != b"\n"
+
+
+def upsert(fb: pd.DataFrame, feedback=None) -> int:
+    """Append the labels of `fb` (claim_id, label) that differ from the current ones; returns the count.
+
+    `feedback` (the source file's stamp) is recorded in the state even when nothing changed.
+    """
+    state = load_state()
+    fb = fb.assign(**{CFG.id_col: fb[CFG.id_col].astype(str)}).drop_duplicates(CFG.id_col, keep="last")
+    changed = fb[_current(fb[CFG.id_col]).to_numpy() != fb[CFG.label_col].to_numpy()]
+    seq = state["seq"]
+    if not changed.empty:
+        seq += 1
+        rows = changed[[CFG.id_col, CFG.label_col]].assign(seq=seq)
+        exists = os.path.exists(DELTA_PATH) and os.path.getsize(DELTA_PATH) > 0
+        torn = _torn(DELTA_PATH)
+        with span("append_label_delta", path=DELTA_PATH, rows=len(rows)):
+            with open(DELTA_PATH, "a", newline="", encoding="utf-8") as f:
+                if torn:
+                    f.write("\n")  # the torn line stays a (skipped) line of its own
+                rows.to_csv(f, header=not exists, index=False, lineterminator="\n")
+                f.flush()
+                os.fsync(f.fileno())
+            add_io(rows_out=len(rows))
+    _write_state({**state, "seq": seq, "feedback": list(feedback) if feedback else state.get("feedback")})
+    return len(changed)
+
+
+def compact():
+    """Fold the delta into the claims file's label column and start an empty delta."""
+    state = load_state()
+    claims = read_csv(CFG.data_claims)
+    if claims.empty:
+        return
+    write_csv(with_labels(claims), CFG.data_claims)
+    open(DELTA_PATH, "w", encoding="utf-8").close()
+    _write_state({**state, "compacted_seq": state["seq"]})
+
+
+def delta_rows() -> int:
+    return len(_delta())
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Claim label store (claims file + label delta)")
+    ap.add_argument("--compact", action="store_true", help=f"Fold {DELTA_PATH} into {CFG.data_claims}")
+    ap.add_argument("--since", type=int, default=None, help="Print the labels changed after this refresh seq")
+    args = ap.parse_args()
+    if args.compact:
+        compact()
+        print("✅ labels compacted into", CFG.data_claims)
+    elif args.since is not None:
+        print(changes(args.since).to_string(index=False))
+    else:
+        s = load_state()
+        print(f"seq={s['seq']} compacted_seq={s['compacted_seq']} delta_rows={delta_rows()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""In-process SQL over the decision ledger and the claims file (SQLite).
+
+out/ledger.sqlite holds the tables `ledger` and `claims` and the view
+`ledger_claims` (ledger rows plus the claim attributes the ledger lacks, so
+segment questions work on a pipeline ledger without segment columns). It is
+rebuilt atomically, from the column store when fresh, whenever the ledger or
+claims file is newer. exp_group and decision are stored upper-cased, so
+queries compare the raw columns; claim_date, exp_group, decision and
+claim_id are indexed, and date-range and group/decision predicates can be
+answered from the index (SQLite still scans when a predicate keeps most of
+the rows, e.g. both groups). MEDIAN() is available as an aggregate. No
+server, no dependency beyond the standard library.
+
+The dashboard/report aggregations are kept here as queries (EXPERIMENT_DAILY,
+DAILY_GROUP_METRICS, hte_sql) with the same columns as compute_experiment_daily,
+executive_charts._daily_group_metrics and compute_hte.
+
+  python -m src.ledger_sql "SELECT hospital_grade, AVG(decision = 'REVIEW') AS review_rate
+                            FROM ledger_claims WHERE claim_date >= '2026-02-15' GROUP BY 1"
+  python -m src.ledger_sql --tables
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+import statistics
+from typing import Optional, Sequence
+
+import pandas as pd
+
+from src.config import CFG
+from src.instrument import add_io, span
+from src.io_utils import atomic_path, is_fresh, read_csv
+from src.ledger_store import LEDGER_PATH, load_ledger
+
+DB_PATH = os.path.join(CFG.out_dir, "ledger.sqlite")
+INDEXES = {"ledger": ["claim_date", "exp_group", "decision", CFG.id_col], "claims": [CFG.id_col]}
+UPPER_COLS = ("exp_group", "decision")  # stored upper-cased: predicates on them stay indexable
+MMAP_BYTES = 1 << 30
+INSERT_CHUNK = 50_000
+
+# compute_experiment_daily (app_exec_dashboard.py)
+EXPERIMENT_DAILY = f"""
+SELECT date(claim_date) AS date, exp_group,
+       COUNT({CFG.id_col}) AS n,
+       AVG(paid_amount) AS avg_paid,
+       MEDIAN(paid_amount) AS median_paid,
+       AVG(COALESCE(decision = 'REVIEW', 0)) AS review_rate,
+       AVG(score) AS avg_score
+FROM ledger
+WHERE date(claim_date) IS NOT NULL AND exp_group IN ('CONTROL', 'TREATMENT') {{where}}
+GROUP BY 1, 2 ORDER BY 1, 2
+"""
+
+# executive_charts._daily_group_metrics
+DAILY_GROUP_METRICS = """
+SELECT date(claim_date) AS date, exp_group,
+       COUNT(*) AS n,
+       AVG(paid_amount) AS avg_paid,
+       AVG(COALESCE(decision = 'REVIEW', 0)) AS review_rate
+FROM ledger
+WHERE date(claim_date) IS NOT NULL AND paid_amount IS NOT NULL {where}
+GROUP BY 1, 2 ORDER BY 1, 2
+"""
+
+# compute_hte (app_exec_dashboard.py), one segment column
+HTE = """
+SELECT {col} AS segment,
+       SUM(g = 'CONTROL') AS n_control, SUM(g = 'TREATMENT') AS n_treatment,
+       AVG(CASE WHEN g = 'CONTROL' THEN paid_amount END) AS avg_paid_control,
+       AVG(CASE WHEN g = 'TREATMENT' THEN paid_amount END) AS avg_paid_treatment,
+       AVG(CASE WHEN g = 'CONTROL' THEN is_review END) AS review_rate_control,
+       AVG(CASE WHEN g = 'TREATMENT' THEN is_review END) AS review_rate_treatment,
+       AVG(CASE WHEN g = 'CONTROL' THEN score END) AS avg_score_control,
+       AVG(CASE WHEN g = 'TREATMENT' THEN score END) AS avg_score_treatment,
+       COUNT(*) AS n_total
+FROM (SELECT *, exp_group AS g, COALESCE(decision = 'REVIEW', 0) AS is_review
+      FROM ledger_claims WHERE exp_group IN ('CONTROL', 'TREATMENT') {where})
+GROUP BY 1
+HAVING n_total >= :min_n
+"""
+
+
+class _Median:
+    def __init__(self):
+        self.values = []
+
+    def step(self, v):
+        if v is not None:
+            self.values.append(v)
+
+    def finalize(self):
+        return statistics.median(self.values) if self.values else None
+
+
+def _to_table(con: sqlite3.Connection, name: str, df: pd.DataFrame):
+    """Plain Python values (categoricals/Arrow strings as str, nulls as NULL) into a new table."""
+    cols = list(df.columns)
+    con.execute(f"CREATE TABLE {name} ({', '.join(_quote(c) for c in cols)})")
+    sql = f"INSERT INTO {name} VALUES ({', '.join('?' * len(cols))})"
+    for lo in range(0, len(df), INSERT_CHUNK):
+        part = df.iloc[lo:lo + INSERT_CHUNK].astype(object)
+        con.executemany(sql, part.where(part.notna(), None).itertuples(index=False, name=None))
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def build(db_path: str = DB_PATH, ledger_path: str = LEDGER_PATH, claims_path: str = CFG.data_claims) -> str:
+    """(Re)create the database next to the ledger; readers keep the file they opened."""
+    led = load_ledger(path=ledger_path)
+    led = led.assign(**{c: led[c].str.upper() for c in UPPER_COLS if c in led.columns})
+    claims = read_csv(claims_path)
+    with atomic_path(db_path, suffix=".sqlite") as tmp:
+        with span("build_sqlite", path=db_path):
+            con = sqlite3.connect(tmp)
+            _to_table(con, "ledger", led)
+            _to_table(con, "claims", claims)
+            for table, frame in (("ledger", led), ("claims", claims)):
+                for c in INDEXES[table]:
+                    if c in frame.columns:
+                        con.execute(f"CREATE INDEX {table}_{c} ON {table} ({_quote(c)})")
+            extra = [c for c in claims.columns if c not in led.columns]
+            if CFG.id_col in led.columns and CFG.id_col in claims.columns:
+                # one row per ledger row even if a claim_id repeats in the claims file
+                cols = ", ".join(f"c.{_quote(x)}" for x in extra)
+                con.execute(f"CREATE VIEW ledger_claims AS SELECT l.*{', ' + cols if cols else ''} FROM ledger l "
+                            f"LEFT JOIN claims c ON c.rowid = (SELECT MIN(rowid) FROM claims WHERE "
+                            f"{_quote(CFG.id_col)} = l.{_quote(CFG.id_col)})")
+            else:
+                con.execute("CREATE VIEW ledger_claims AS SELECT * FROM ledger")
+            con.execute("ANALYZE")
+            con.commit()
+            con.close()
+            add_io(rows_out=len(led) + len(claims), bytes_written=os.path.getsize(tmp))
+    return db_path
+
+
+def connect(db_path: str = DB_PATH, ledger_path: str = LEDGER_PATH, claims_path: str = CFG.data_claims,
+            rebuild: bool = False) -> sqlite3.Connection:
+    """Read-only connection, rebuilding the database first when the sources are newer."""
+    if rebuild or not is_fresh(db_path, ledger_path, claims_path):
+        build(db_path, ledger_path, claims_path)
+    con = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True, check_same_thread=False)
+    con.execute(f"PRAGMA mmap_size = {MMAP_BYTES}")  # pages shared through the OS cache
+    con.create_aggregate("MEDIAN", 1, _Median)
+    return con
+
+
+def query(sql: str, params=None, con: Optional[sqlite3.Connection] = None) -> pd.DataFrame:
+    """Run `sql` (named :params or ? placeholders) and return the result as a DataFrame."""
+    own = con is None
+    con = con or connect()
+    try:
+        with span("sql_query"):
+            df = pd.read_sql_query(sql, con, params=params)
+            add_io(rows_out=len(df))
+        return df
+    finally:
+        if own:
+            con.close()
+
+
+def _date_range(start: Optional[str], end: Optional[str]):
+    """(' AND ...' clause, params) for claim_date in [start, end); index-friendly comparisons."""
+    where, params = "", {}
+    if start:
+        where += " AND claim_date >= :start"
+        params["start"] = start
+    if end:
+        where += " AND claim_date < :end"
+        params["end"] = end
+    return where, params
+
+
+def experiment_daily(start: str = None, end: str = None, con=None) -> pd.DataFrame:
+    where, params = _date_range(start, end)
+    df = query(EXPERIMENT_DAILY.format(where=where), params, con)
+    df["date"] = pd.to_datetime(df["date"])
+    return df
+
+
+def daily_group_metrics(start: str = None, end: str = None, con=None) -> pd.DataFrame:
+    where, params = _date_range(start, end)
+    df = query(DAILY_GROUP_METRICS.format(where=where), params, con)
+    df["date"] = pd.to_datetime(df["date"])
+    return df
+
+
+def hte_sql(col: str, where: str = "") -> str:
+    return HTE.format(col=_quote(col), where=where)
+
+
+def hte(seg_cols: Sequence[str], min_n: int = 200, start: str = None, end: str = None, con=None) -> pd.DataFrame:
+    """compute_hte's table: per segment value, control/treatment sizes, means and deltas."""
+    own = con is None
+    con = con or connect()
+    try:
+        known = {r[1] for r in con.execute("PRAGMA table_info(ledger_claims)")}
+        where, params = _date_range(start, end)
+        out = []
+        for col in seg_cols:
+            if col not in known:
+                continue
+            df = query(hte_sql(col, where), {**params, "min_n": min_n}, con)
+            if df.empty:
+                continue
+            df["delta_paid_c_minus_t"] = df["avg_paid_control"] - df["avg_paid_treatment"]
+            df["delta_review_rate_t_minus_c"] = df["review_rate_treatment"] - df["review_rate_control"]
+            df["segment_col"] = col
+            out.append(df)
+    finally:
+        if own:
+            con.close()
+    if not out:
+        return pd.DataFrame()
+    res = pd.concat(out, ignore_index=True)
+    return res.sort_values("delta_paid_c_minus_t", key=lambda s: s.abs(), ascending=False)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Query the decision ledger and claims with SQL.")
+    ap.add_argument("sql", nargs="?", help="SQL to run (tables: ledger, claims, view ledger_claims)")
+    ap.add_argument("--rebuild", action="store_true", help=f"Rebuild {DB_PATH} even if it is fresh")
+    ap.add_argument("--tables", action="store_true", help="List tables/views and their columns")
+    ap.add_argument("--out", default="", help="Write the result to this CSV instead of printing it")
+    args = ap.parse_args()
+
+    con = connect(rebuild=args.rebuild)
+    try:
+        if args.tables or not args.sql:
+            for (name,) in con.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view') ORDER BY name"):
+                cols = [r[1] for r in con.execute(f"PRAGMA table_info({_quote(name)})")]
+                print(f"{name}: {', '.join(cols)}")
+            return
+        df = query(args.sql, con=con)
+    finally:
+        con.close()
+    if args.out:
+        df.to_csv(args.out, index=False)
+        print("✅ wrote", args.out, df.shape)
+    else:
+        print(df.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
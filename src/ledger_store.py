@@ -0,0 +1,214 @@
+"""Memory-mapped columnar copy of the decision ledger.
+
+The ledger CSV is converted once (after scoring) into a single binary file of
+fixed-width columns: numbers in their compact dtype (schemas.compact_ledger),
+strings as integer codes plus a dictionary of distinct values (UTF-8 bytes
+with int64 offsets, i.e. an Arrow large_string laid out on disk). Readers map
+the file and get NumPy views of the columns and Arrow views of the
+dictionaries, so opening it costs a header parse, and every process that maps
+it (dashboard sessions, pipeline stages) shares the OS page cache instead of
+holding its own parsed copy. The file is replaced atomically; a reader keeps
+the version it mapped.
+
+Layout: MAGIC, header length (uint64 LE), JSON header, then the column
+buffers, each starting at a multiple of ALIGN bytes from the data start.
+
+  python -m src.ledger_store            # build out/decision_ledger.colstore
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.config import CFG
+from src.instrument import add_io, span, stage
+from src.io_utils import atomic_path, is_fresh, read_csv
+from src.schemas import ID_DTYPE, SCHEMAS, compact_ledger
+
+LEDGER_PATH = os.path.join(CFG.out_dir, "decision_ledger.csv")
+STORE_PATH = os.path.join(CFG.out_dir, "decision_ledger.colstore")
+MAGIC = b"FDSCOL01"
+ALIGN = 64
+# decoded back to Arrow text instead of category (see schemas.compact_ledger)
+TEXT_COLS = SCHEMAS["out/decision_ledger.csv"].dates
+
+
+def _codes_dtype(n: int):
+    for dt in (np.int8, np.int16, np.int32):
+        if n < np.iinfo(dt).max:
+            return np.dtype(dt)
+    return np.dtype(np.int64)
+
+
+def _encode(s: pd.Series):
+    """(codes, sorted distinct values as str) of a string-like column; null -> -1."""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        if not s.cat.categories.is_monotonic_increasing:
+            s = s.cat.reorder_categories(s.cat.categories.sort_values())
+        codes, values = s.cat.codes.to_numpy(), s.cat.categories
+    else:
+        codes, values = pd.factorize(s, sort=True)
+    return codes.astype(_codes_dtype(len(values)), copy=False), [str(v) for v in values]
+
+
+def _dictionary(values: list):
+    data = [v.encode("utf-8") for v in values]
+    offsets = np.zeros(len(data) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in data], out=offsets[1:])
+    return offsets, np.frombuffer(b"".join(data), dtype=np.uint8)
+
+
+def write_store(df: pd.DataFrame, path: str = STORE_PATH, source_size: Optional[int] = None) -> int:
+    """Write `df` (compact dtypes) as a column store; returns bytes written."""
+    buffers, columns = [], []
+
+    def add(arr: np.ndarray) -> dict:
+        arr = np.ascontiguousarray(arr)
+        offset = sum(len(b) for b in buffers)
+        pad = -offset % ALIGN
+        if pad:
+            buffers.append(b"\0" * pad)
+            offset += pad
+        buffers.append(arr.tobytes())
+        return {"dtype": arr.dtype.str, "offset": offset, "length": int(arr.size)}
+
+    for c in df.columns:
+        s = df[c]
+        if s.dtype.kind in "biufM" and not isinstance(s.dtype, pd.api.extensions.ExtensionDtype):
+            columns.append({"name": c, "kind": "array", "values": add(s.to_numpy())})
+            continue
+        codes, values = _encode(s)
+        offsets, data = _dictionary(values)
+        columns.append({"name": c, "kind": "text" if c in TEXT_COLS else "category", "codes": add(codes),
+                        "dict_offsets": add(offsets), "dict_data": add(data)})
+
+    header = json.dumps({"rows": len(df), "source_size": source_size, "columns": columns},
+                        ensure_ascii=False).encode("utf-8")
+    start = len(MAGIC) + 8 + len(header)
+    pad = -start % ALIGN
+    # through atomic_path: readers keep the mapping they have, and the file stays readable by other users
+    with atomic_path(path) as tmp, open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack("<Q", len(header) + pad) + header + b" " * pad)
+        for b in buffers:
+            f.write(b)
+    return os.path.getsize(path)
+
+
+class LedgerStore:
+    """Read-only mapped column store; arrays are views into the shared mapping."""
+
+    def __init__(self, path: str = STORE_PATH):
+        self.path = path
+        self._buf = np.memmap(path, dtype=np.uint8, mode="r")
+        if bytes(self._buf[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path}: not a ledger column store")
+        (n,) = struct.unpack("<Q", bytes(self._buf[len(MAGIC):len(MAGIC) + 8]))
+        start = len(MAGIC) + 8
+        header = json.loads(bytes(self._buf[start:start + n]).decode("utf-8"))
+        self._data = start + n
+        self.rows: int = header["rows"]
+        self.source_size: Optional[int] = header.get("source_size")
+        self._cols: Dict[str, dict] = {c["name"]: c for c in header["columns"]}
+
+    @property
+    def columns(self) -> list:
+        return list(self._cols)
+
+    def _view(self, ref: dict) -> np.ndarray:
+        dt = np.dtype(ref["dtype"])
+        lo = self._data + ref["offset"]
+        return self._buf[lo:lo + ref["length"] * dt.itemsize].view(dt)
+
+    def array(self, name: str) -> np.ndarray:
+        """Values (number columns) or dictionary codes (string columns, -1 = null)."""
+        c = self._cols[name]
+        return self._view(c["values"] if c["kind"] == "array" else c["codes"])
+
+    def dictionary(self, name: str):
+        """Distinct values of a string column as a zero-copy Arrow large_string array."""
+        import pyarrow as pa
+
+        c = self._cols[name]
+        offsets, data = self._view(c["dict_offsets"]), self._view(c["dict_data"])
+        return pa.LargeStringArray.from_buffers(len(offsets) - 1, pa.py_buffer(offsets), pa.py_buffer(data))
+
+    def since(self, name: str, value: str) -> np.ndarray:
+        """Row mask of `name` >= `value` for a string column (compares codes: dictionaries are sorted)."""
+        first = np.searchsorted(self.dictionary(name).to_numpy(zero_copy_only=False), value)
+        return self.array(name) >= first
+
+    def hashes(self, name: str) -> np.ndarray:
+        """uint64 hash per row; string columns hash their dictionary once and index it by code (null -> 0)."""
+        c = self._cols[name]
+        if c["kind"] == "array":
+            return pd.util.hash_array(np.asarray(self.array(name)))
+        values = np.asarray(self.dictionary(name).to_numpy(zero_copy_only=False), dtype=object)
+        return np.append(pd.util.hash_array(values), np.uint64(0))[self.array(name)]
+
+    def series(self, name: str, rows: Optional[np.ndarray] = None) -> pd.Series:
+        """Column `name`; `rows` (a boolean mask) selects rows before anything is decoded."""
+        c = self._cols[name]
+        if c["kind"] == "array":
+            arr = self.array(name)
+            return pd.Series(arr if rows is None else arr[rows], name=name, copy=False)
+        codes, values = self.array(name), self.dictionary(name)
+        if rows is not None:
+            codes = codes[rows]
+        if c["kind"] == "text":
+            import pyarrow as pa
+
+            idx = pa.array(codes, mask=codes < 0)
+            return pd.Series(pd.array(values.take(idx), dtype=ID_DTYPE), name=name)
+        cats = pd.Index(pd.arrays.ArrowStringArray(values), name=None)
+        return pd.Series(pd.Categorical.from_codes(codes, dtype=pd.CategoricalDtype(cats)), name=name, copy=False)
+
+    def frame(self, columns: Sequence[str] = None, rows: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """Ledger as a DataFrame of (read-only) views; `columns` projects like io_utils.read_csv."""
+        names = self.columns if columns is None else [c for c in self.columns if c in set(columns)]
+        return pd.DataFrame({c: self.series(c, rows) for c in names}, copy=False)
+
+
+def open_store(path: str = STORE_PATH, source: str = LEDGER_PATH) -> Optional[LedgerStore]:
+    """The store when it is at least as new as the ledger CSV (and of it), else None."""
+    if not is_fresh(path, source):
+        return None
+    try:
+        store = LedgerStore(path)
+    except (OSError, ValueError):
+        return None
+    if os.path.exists(source) and store.source_size != os.path.getsize(source):
+        return None
+    return store
+
+
+def load_ledger(columns: Sequence[str] = None, path: str = LEDGER_PATH) -> pd.DataFrame:
+    """Compact ledger frame: mapped from the column store when fresh, else parsed from the CSV."""
+    store = open_store(source=path) if path == LEDGER_PATH else None
+    if store is not None:
+        with span("read_colstore", path=store.path):
+            df = store.frame(columns)
+            add_io(rows_in=len(df))
+        return df
+    return compact_ledger(read_csv(path, columns=columns))
+
+
+@stage("ledger_store")
+def main():
+    if not os.path.exists(LEDGER_PATH):
+        print("🟨 ledger_store: missing ledger")
+        return
+    led = compact_ledger(read_csv(LEDGER_PATH))
+    with span("write_colstore", path=STORE_PATH):
+        n = write_store(led, STORE_PATH, source_size=os.path.getsize(LEDGER_PATH))
+        add_io(rows_out=len(led), bytes_written=n)
+    print("✅ wrote", STORE_PATH, f"({len(led)} rows, {n / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
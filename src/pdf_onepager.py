@@ -1,14 +1,10 @@
+import json
 import os
 import re
 from datetime import datetime
 
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import mm
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, KeepInFrame
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
+from src.instrument import stage
+from src.io_utils import read_csv, read_text
 
 
 def _find_korean_font():
@@ -24,15 +20,44 @@ def _find_korean_font():
             return p
     return None
 
+_TEMPLATE = {}
+
+
 def _register_font():
+    """Register the Korean font once per process (TTF parsing is the slow part of a one-pager)."""
+    if "font" in _TEMPLATE:
+        return _TEMPLATE["font"]
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    font_name = "Helvetica"
     font_path = _find_korean_font()
     if font_path:
         try:
             pdfmetrics.registerFont(TTFont("KFont", font_path))
-            return "KFont"
+            font_name = "KFont"
         except Exception:
             pass
-    return "Helvetica"
+    _TEMPLATE["font"] = font_name
+    return font_name
+
+
+def _styles():
+    """(font name, paragraph styles) of the one-pager layout, built once per process."""
+    if "styles" not in _TEMPLATE:
+        from reportlab.lib import colors
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+
+        font_name = _register_font()
+        styles = getSampleStyleSheet()
+        _TEMPLATE["styles"] = {
+            "title": ParagraphStyle("title", parent=styles["Title"], fontName=font_name, fontSize=18, leading=22, textColor=colors.HexColor("#111827")),
+            "h": ParagraphStyle("h", parent=styles["Heading2"], fontName=font_name, fontSize=11, leading=14, textColor=colors.HexColor("#111827"), spaceAfter=4),
+            "p": ParagraphStyle("p", parent=styles["BodyText"], fontName=font_name, fontSize=9.5, leading=12, textColor=colors.HexColor("#111827")),
+            "small": ParagraphStyle("small", parent=styles["BodyText"], fontName=font_name, fontSize=8.5, leading=10, textColor=colors.HexColor("#6b7280")),
+            "kpi": ParagraphStyle("kpi", fontName=font_name, leading=14),
+        }
+    return _TEMPLATE["font"], _TEMPLATE["styles"]
 
 def _pick_highlights(md_text: str, max_lines: int = 10):
     lines = [l.strip() for l in (md_text or "").splitlines()]
@@ -51,15 +76,16 @@ def export_onepager_pdf(
     chart_right: str | None,
     methods_summary: list[dict] | None = None,
 ):
-    os.makedirs(os.path.dirname(output_pdf) or ".", exist_ok=True)
+    # reportlab loads here, not at import: the dashboard imports this module for _pick_highlights
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    from reportlab.lib import colors
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, KeepInFrame
 
-    font_name = _register_font()
-    styles = getSampleStyleSheet()
+    os.makedirs(os.path.dirname(output_pdf) or ".", exist_ok=True)
 
-    title_style = ParagraphStyle("title", parent=styles["Title"], fontName=font_name, fontSize=18, leading=22, textColor=colors.HexColor("#111827"))
-    h_style = ParagraphStyle("h", parent=styles["Heading2"], fontName=font_name, fontSize=11, leading=14, textColor=colors.HexColor("#111827"), spaceAfter=4)
-    p_style = ParagraphStyle("p", parent=styles["BodyText"], fontName=font_name, fontSize=9.5, leading=12, textColor=colors.HexColor("#111827"))
-    small_style = ParagraphStyle("small", parent=styles["BodyText"], fontName=font_name, fontSize=8.5, leading=10, textColor=colors.HexColor("#6b7280"))
+    font_name, st = _styles()
+    title_style, h_style, p_style, small_style = st["title"], st["h"], st["p"], st["small"]
 
     doc = SimpleDocTemplate(output_pdf, pagesize=A4, leftMargin=14*mm, rightMargin=14*mm, topMargin=12*mm, bottomMargin=12*mm,
                             title=ci.get("report_title","Executive Report"))
@@ -110,7 +136,7 @@ def export_onepager_pdf(
         cells = []
         for title, value in row:
             cells.append(Paragraph(f'<font color="#6b7280" size="8">{title}</font><br/><font size="12"><b>{value}</b></font>',
-                                   ParagraphStyle("kpi", fontName=font_name, leading=14)))
+                                   st["kpi"]))
         kpi_table_data.append(cells)
     kpi_tbl = Table(kpi_table_data, colWidths=[58*mm,58*mm,58*mm])
     kpi_tbl.setStyle(TableStyle([("BOX",(0,0),(-1,-1),0.7,colors.HexColor("#e5e7eb")),("INNERGRID",(0,0),(-1,-1),0.7,colors.HexColor("#e5e7eb")),
@@ -163,3 +189,31 @@ def export_onepager_pdf(
 
     doc.build(story)
     return output_pdf
+
+
+@stage("pdf_onepager")
+def main(output_pdf: str = "out/executive_onepager.pdf", ci_path: str = "assets/ci.json"):
+    """Batch one-pager from out/ artifacts (KPI cards left as NA; the dashboard fills them)."""
+    ci = json.load(open(ci_path, "r", encoding="utf-8"))
+    md = read_text("out/executive_summary.md")
+    hi = _pick_highlights(md, 10)
+    panel = read_csv("out/impact_panel.csv")
+    ms = []
+    if not panel.empty:
+        if "p_value" not in panel.columns:
+            panel["p_value"] = ""
+        for _, r in panel.head(3).iterrows():
+            ms.append({
+                "method": str(r.get("method", "NA")),
+                "effect_per_claim": f"{int(round(float(r.get('effect_per_claim', 0)))):,}원",
+                "p_value": str(r.get("p_value", "—")),
+            })
+    kpis = {"policy_ver": "NA", "policy_mode": "NA", "control_rate": "NA", "effect_per_claim": "NA",
+            "saving_today": "NA", "saving_mtd": "NA", "saving_qtd": "NA", "p_value": "NA",
+            "guardrails_badge": "NA", "red_flag": False}
+    export_onepager_pdf(output_pdf, ci, kpis, hi, "out/chart_impact_delta.png", None, ms)
+    print("✅ built", output_pdf)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+"""In-process pipeline runner.
+
+Stages are declared once with the module/function they run and the files they
+read and write. A run imports every stage into one interpreter (pandas,
+sklearn and scipy are imported once) and enables the io_utils frame memo, so a
+CSV written by one stage is handed to the next as an in-memory DataFrame; the
+files are still written as the durable artifacts.
+
+Optional stages keep the `|| true` semantics of the shell scripts: a failure
+is reported and the run continues. A failing required stage stops the run
+with exit code 1, like `set -e` / make.
+
+Stages whose code, config and input file contents are unchanged since an
+earlier run restore their outputs from the stage cache (src/stage_cache.py)
+instead of running; --no-cache runs everything. Stages that act on mutable
+state (champion promotion, policy rollout, label merge) are never cached.
+
+Stages run sequentially by default. With --workers > 1 (opt-in: each worker
+process holds its own ledger/claims frames, so peak memory grows with the
+worker count) the declared inputs/outputs become a DAG: a stage waits
+for the earlier stages that write what it reads or touch what it writes, and
+everything else (e.g. score_cc, impact_causal, stats_impact_scipy and
+segment_alerts after scoring) runs concurrently in a process pool. A stage
+that raises is contained in its worker; a crashed worker fails only the
+stages it had in flight.
+
+  python -m src.pipeline full
+  python -m src.pipeline full --workers 4
+  python -m src.pipeline self_healing
+  python -m src.pipeline full --only score_batch_prod,segment_alerts
+  python -m src.pipeline full --list
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import ExitStack
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.config import CFG
+from src.io_utils import frame_memo
+from src.stage_cache import StageCache
+
+CLAIMS = CFG.data_claims
+FEEDBACK = CFG.data_labels_feedback
+LABEL_DELTA = CFG.data_labels_delta
+LABEL_STATE = "data/labels_state.json"
+POLICY = "models/policy_current.json"
+POLICY_LOG = "models/policy_events.jsonl"
+POLICY_SNAPSHOT = "models/policy_registry.json"
+FRAUD_LR = "models/fraud_lr.joblib"
+META = "models/meta.json"
+CALIBRATOR = "models/calibrator.joblib"
+CHAMPION = "models/champion.joblib"
+META_CHAMP = "models/meta_champion.json"
+CHALLENGER = "models/challenger.joblib"
+META_CHALL = "models/meta_challenger.json"
+LEDGER = "out/decision_ledger.csv"
+LEDGER_STORE = "out/decision_ledger.colstore"
+REVIEW_QUEUE = "out/review_queue.csv"
+CC_METRICS = "out/cc_metrics.csv"
+CAUSAL = "out/impact_causal.csv"
+SIG = "out/impact_significance_scipy.csv"
+PANEL = "out/impact_panel.csv"
+ALERTS = "out/segment_alerts.csv"
+ENRICHED = "out/decision_ledger_enriched.parquet"
+CUBE = "out/segment_cube.csv"
+TIMESERIES = "out/impact_monthly_timeseries.csv"
+ROLLUP = "out/saving_daily_rollup.csv"
+GUARDRAILS = "out/guardrails_decision.csv"
+SUMMARY = "out/executive_summary.md"
+DAILY_DELTA = "out/impact_daily_delta.csv"
+DELTA_PNG = "out/chart_impact_delta.png"
+DELTA_STATE = "out/impact_daily_delta.state.json"
+ONEPAGER = "out/executive_onepager.pdf"
+SEGMENT_REPORTS = "out/segment_reports/manifest.json"
+CI = "assets/ci.json"
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    module: str
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    optional: bool = False
+    func: str = "main"
+    args: Tuple = ()
+    when: Optional[str] = None  # run only if this path exists
+    cache: bool = True  # False: side effects beyond the declared outputs, always run
+
+    def target(self):
+        return getattr(importlib.import_module(self.module), self.func)
+
+
+S = {s.name: s for s in [
+    Stage("validate", "src.validate", (CLAIMS,)),
+    Stage("update_labels", "src.update_labels", (CLAIMS, FEEDBACK, LABEL_STATE), (CLAIMS, LABEL_DELTA, LABEL_STATE),
+          optional=True, when=FEEDBACK,
+          cache=False),
+    Stage("train", "src.train", (CLAIMS, LABEL_DELTA, LABEL_STATE), (FRAUD_LR, META)),
+    Stage("calibrate", "src.calibrate", (CLAIMS, LABEL_DELTA, LABEL_STATE, FRAUD_LR, META), (CALIBRATOR, META)),
+    Stage("init_champion", "src.registry", (FRAUD_LR, META), (CHAMPION, META_CHAMP),
+          func="init_champion_if_missing", cache=False),
+    Stage("set_challenger", "src.registry", (FRAUD_LR, META), (CHALLENGER, META_CHALL),
+          func="set_challenger", args=(FRAUD_LR, META)),
+    Stage("score_cc", "src.score_cc", (CLAIMS, LABEL_DELTA, LABEL_STATE, CHAMPION, CHALLENGER, META_CHAMP, META_CHALL),
+          (CC_METRICS,), optional=True),
+    Stage("promote_if_better", "src.promote_if_better", (CC_METRICS, CHALLENGER, META_CHALL),
+          (CHAMPION, META_CHAMP), optional=True, cache=False),
+    Stage("score_batch_prod", "src.score_batch_prod", (CLAIMS, CHAMPION, META_CHAMP, FRAUD_LR, META, CALIBRATOR, POLICY),
+          (REVIEW_QUEUE, LEDGER, POLICY)),
+    Stage("ledger_store", "src.ledger_store", (LEDGER,), (LEDGER_STORE,), optional=True),
+    Stage("impact_causal", "src.impact_causal", (LEDGER,), (CAUSAL,), optional=True),
+    Stage("stats_impact_scipy", "src.stats_impact_scipy", (LEDGER,), (SIG,)),
+    Stage("impact_panel", "src.impact_panel", (CAUSAL, SIG), (PANEL,)),
+    Stage("segment_alerts", "src.segment_alerts", (LEDGER, LEDGER_STORE), (ALERTS,)),
+    Stage("enriched_ledger", "src.enriched_ledger", (LEDGER, CLAIMS), (ENRICHED,), optional=True),
+    Stage("segment_cube", "src.segment_cube", (ENRICHED, LEDGER, CLAIMS), (CUBE,), optional=True),
+    Stage("impact_timeseries", "src.impact_timeseries", (LEDGER, LEDGER_STORE, CLAIMS, PANEL, SIG), (TIMESERIES,),
+          optional=True),
+    Stage("telemetry", "src.telemetry", (TIMESERIES, LEDGER, LEDGER_STORE), (ROLLUP,), optional=True),
+    Stage("guardrails", "src.guardrails", (PANEL, SIG, ALERTS), (GUARDRAILS,)),
+    Stage("rollout_controller", "src.rollout_controller", (GUARDRAILS, POLICY), (POLICY, POLICY_LOG, POLICY_SNAPSHOT),
+          optional=True, cache=False),
+    Stage("executive_report", "src.executive_report", (PANEL, GUARDRAILS, ALERTS, SIG), (SUMMARY,)),
+    Stage("executive_charts", "src.executive_charts", (LEDGER, LEDGER_STORE), (DAILY_DELTA, DELTA_PNG, DELTA_STATE)),
+    Stage("pdf_onepager", "src.pdf_onepager", (SUMMARY, PANEL, DELTA_PNG, CI), (ONEPAGER,)),
+    # renders many PDFs outside the declared outputs; its manifest skips unchanged ones instead
+    Stage("segment_reports", "src.segment_reports", (LEDGER, LEDGER_STORE, CLAIMS, ALERTS, CI), (SEGMENT_REPORTS,),
+          optional=True, cache=False),
+]}
+
+
+def _optional(name: str) -> Stage:
+    return replace(S[name], optional=True)
+
+
+# `make full` / scripts/run_all.sh full (stats now runs before the panel that reads it)
+FULL = [S[n] for n in [
+    "train", "validate", "calibrate", "score_batch_prod", "ledger_store", "score_cc", "impact_causal",
+    "stats_impact_scipy", "impact_panel", "segment_alerts", "enriched_ledger", "segment_cube",
+    "impact_timeseries", "telemetry", "guardrails", "executive_report", "executive_charts", "pdf_onepager",
+    "segment_reports",
+]]
+
+# src/run_self_healing.sh: everything after scoring is best-effort
+SELF_HEALING = [S[n] for n in [
+    "validate", "update_labels", "train", "init_champion", "set_challenger", "score_cc",
+    "promote_if_better", "score_batch_prod",
+]] + [_optional(n) for n in [
+    "ledger_store", "impact_causal", "stats_impact_scipy", "impact_panel", "segment_alerts", "enriched_ledger",
+    "segment_cube", "impact_timeseries", "telemetry", "guardrails", "rollout_controller",
+    "executive_report", "executive_charts",
+]] + [S["pdf_onepager"], S["segment_reports"]]
+
+PIPELINES: Dict[str, List[Stage]] = {"full": FULL, "self_healing": SELF_HEALING}
+
+
+def check_order(stages: List[Stage]) -> List[str]:
+    """Warnings for stages that read an out/ artifact a later stage of the run produces.
+
+    Files under data/ and models/ are state updated in place (labels, champion),
+    so reading them before a later stage rewrites them is intended.
+    """
+    msgs = []
+    for i, s in enumerate(stages):
+        for later in stages[i + 1:]:
+            for p in set(s.inputs) & set(later.outputs):
+                if p not in s.outputs and p.startswith(CFG.out_dir + "/"):
+                    msgs.append(f"{s.name} reads {p} before {later.name} writes it")
+    return msgs
+
+
+def dependencies(stages: List[Stage]) -> Dict[str, Set[str]]:
+    """Stage name -> earlier stages it must wait for.
+
+    Read-after-write, write-after-read and write-after-write on declared files,
+    so running the DAG gives the same files as running the list in order.
+    """
+    deps = {}
+    for i, s in enumerate(stages):
+        ins, outs = set(s.inputs), set(s.outputs)
+        deps[s.name] = {p.name for p in stages[:i]
+                        if ins & set(p.outputs) or outs & (set(p.inputs) | set(p.outputs))}
+    return deps
+
+
+def run_stage(stage: Stage, cache: Optional[StageCache] = None) -> Tuple[str, float, str]:
+    """(status, seconds, error) for one stage called in this process."""
+    if stage.when and not os.path.exists(stage.when):
+        return "skipped", 0.0, ""
+    key = None
+    if cache is not None and stage.cache:
+        t0 = time.perf_counter()
+        key = cache.key(stage)
+        restored = cache.restore(stage, key)
+        cache.save_index()
+        if restored:
+            print(f"✅ {stage.name}: inputs unchanged, outputs restored from cache")
+            return "cached", time.perf_counter() - t0, ""
+    status, sec, err = _call(stage)
+    if key is not None and status == "ok":
+        cache.store(stage, key)
+        cache.save_index()
+    return status, sec, err
+
+
+def _call(stage: Stage) -> Tuple[str, float, str]:
+    argv = sys.argv
+    sys.argv = [stage.module]  # stage mains parse their own (default) CLI args
+    t0 = time.perf_counter()
+    try:
+        stage.target()(*stage.args)
+        status, err = "ok", ""
+    except SystemExit as e:
+        status = "ok" if not e.code else "error"
+        err = "" if status == "ok" else str(e.code)
+    except Exception as e:
+        status, err = "error", f"{type(e).__name__}: {e}"
+        traceback.print_exc()
+    finally:
+        sys.argv = argv
+    return status, time.perf_counter() - t0, err
+
+
+def _report(s: Stage, status: str, err: str, strict: bool) -> bool:
+    """Print a stage failure; True when it should fail the run."""
+    if status != "error":
+        return False
+    if s.optional and not strict:
+        print(f"🟨 {s.name}: failed (optional, continuing): {err}")
+        return False
+    print(f"🛑 {s.name}: failed: {err}")
+    return True
+
+
+# Worker-side frame memo (kept open for the life of the worker process) and stage cache.
+_WORKER = ExitStack()
+_WORKER_CACHE: List[StageCache] = []
+
+
+def _init_worker(memo_mb: int, use_cache: bool):
+    _WORKER.enter_context(frame_memo(memo_mb))
+    if use_cache:
+        _WORKER_CACHE.append(StageCache())
+
+
+def _work(stage: Stage):
+    from src import io_utils
+
+    memo = io_utils._MEMO
+    h, m = memo.hits, memo.misses
+    status, sec, err = run_stage(stage, _WORKER_CACHE[0] if _WORKER_CACHE else None)
+    return status, sec, err, memo.hits - h, memo.misses - m
+
+
+def _run_parallel(stages: List[Stage], workers: int, memo_mb: int, strict: bool, use_cache: bool):
+    """Run the stage DAG on `workers` processes; (results, rc, memo hits, memo misses)."""
+    deps = dependencies(stages)
+    order = {s.name: i for i, s in enumerate(stages)}
+    pending, running, finished, retried = list(stages), {}, set(), set()
+    results, rc, hits, misses = [], 0, 0, 0
+
+    def make_pool():
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=(max(1, memo_mb // workers), use_cache))
+
+    ex = make_pool()
+    try:
+        while pending or running:
+            if not rc:
+                for s in [s for s in pending if deps[s.name] <= finished]:
+                    if len(running) >= workers:
+                        break
+                    running[ex.submit(_work, s)] = s
+                    pending.remove(s)
+            if not running:
+                break  # stopped by a failure
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            broken = False
+            for f in done:
+                s = running.pop(f)
+                try:
+                    status, sec, err, h, m = f.result()
+                    hits, misses = hits + h, misses + m
+                except BrokenProcessPool:
+                    broken = True
+                    if s.name not in retried:
+                        retried.add(s.name)
+                        pending.append(s)
+                        continue
+                    status, sec, err = "error", 0.0, "worker process died"
+                results.append((s, status, sec))
+                finished.add(s.name)
+                if _report(s, status, err, strict):
+                    rc = 1
+            if broken:
+                # A dead worker takes the whole pool down: requeue what was in
+                # flight once (the crashing stage fails on its second try).
+                for s in running.values():
+                    if s.name not in retried:
+                        retried.add(s.name)
+                        pending.append(s)
+                    else:
+                        results.append((s, "error", 0.0))
+                        finished.add(s.name)
+                        if _report(s, "error", "worker process died", strict):
+                            rc = 1
+                running = {}
+                pending.sort(key=lambda s: order[s.name])
+                ex.shutdown(wait=False, cancel_futures=True)
+                ex = make_pool()
+    finally:
+        ex.shutdown(wait=True, cancel_futures=True)
+    results.sort(key=lambda r: order[r[0].name])
+    return results, rc, hits, misses
+
+
+def run(stages: List[Stage], memo_mb: int = CFG.pipeline_memo_mb, strict: bool = False,
+        workers: int = 1, use_cache: bool = True) -> int:
+    """Run stages; 0 when every required stage succeeded.
+
+    workers=1 runs them in order in this process; more runs independent stages
+    concurrently (see dependencies()). strict=True also fails the run on
+    optional stages (used by the benchmark).
+    """
+    for m in check_order(stages):
+        print("🟨 pipeline:", m)
+    t0 = time.perf_counter()
+    workers = max(1, min(workers, len(stages)))
+    cache = StageCache() if use_cache else None
+    if workers > 1:
+        results, rc, hits, misses = _run_parallel(stages, workers, memo_mb, strict, use_cache)
+    else:
+        results, rc = [], 0
+        with frame_memo(memo_mb) as memo:
+            for s in stages:
+                status, sec, err = run_stage(s, cache)
+                results.append((s, status, sec))
+                if _report(s, status, err, strict):
+                    rc = 1
+                    break
+            hits, misses = memo.hits, memo.misses
+
+    if cache is not None:
+        evicted = cache.evict()
+        if evicted:
+            print(f"stage cache: evicted {evicted} entries (limit {CFG.stage_cache_mb} MB)")
+
+    print("\nstage                 status    sec")
+    for s, status, sec in results:
+        print(f"{s.name:<21} {status:<8} {sec:6.2f}")
+    print(f"wall {time.perf_counter() - t0:.2f}s (stage sum {sum(r[2] for r in results):.2f}s, workers={workers})"
+          f" · frame memo hits={hits} misses={misses}")
+    return rc
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run pipeline stages in one process.")
+    ap.add_argument("pipeline", nargs="?", default="full", choices=sorted(PIPELINES))
+    ap.add_argument("--only", default="", help="Comma-separated stage names to run (in pipeline order)")
+    ap.add_argument("--list", action="store_true", help="Print stages with inputs/outputs and exit")
+    ap.add_argument("--strict", action="store_true", help="Treat optional stage failures as failures")
+    ap.add_argument("--no-cache", action="store_true", help="Run every stage; don't restore from or fill the stage cache")
+    ap.add_argument("--workers", type=int, default=CFG.pipeline_workers,
+                    help="Processes for independent stages (default 1 = sequential, 0 = CPU count)")
+    args = ap.parse_args()
+
+    stages = PIPELINES[args.pipeline]
+    if args.only:
+        want = {n.strip() for n in args.only.split(",") if n.strip()}
+        unknown = want - {s.name for s in stages}
+        if unknown:
+            raise SystemExit(f"Unknown stages for {args.pipeline}: {sorted(unknown)}")
+        stages = [s for s in stages if s.name in want]
+
+    if args.list:
+        deps = dependencies(stages)
+        for s in stages:
+            flag = (" (optional)" if s.optional else "") + ("" if s.cache else " (not cached)")
+            after = ", ".join(sorted(deps[s.name])) or "-"
+            print(f"{s.name}{flag}\n  in:  {', '.join(s.inputs) or '-'}\n  out: {', '.join(s.outputs) or '-'}"
+                  f"\n  after: {after}")
+        return
+
+    raise SystemExit(run(stages, strict=args.strict, workers=args.workers or os.cpu_count() or 1,
+                         use_cache=not args.no_cache))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,148 @@
+"""Rollout policy registry.
+
+- models/policy_current.json : current policy + its sequence number (a few hundred bytes)
+- models/policy_events.jsonl : append-only log, one {"seq", "policy"} line per update
+- models/policy_registry.json: compacted snapshot {"seq", "current", "history"} (the
+  original single-file layout, which is migrated on first use)
+
+Reading the current policy parses only the pointer file, and is served from
+an in-process cache until the file's (mtime, size) changes. An update appends
+one line and replaces the pointer; every COMPACT_EVERY events the log is
+folded into the snapshot and truncated, so per-update cost does not grow
+with the history.
+"""
+
 import json, os
 from datetime import datetime
 
+from src.io_utils import file_stamp, write_json_atomic
+
 PATH = "models/policy_registry.json"
+CURRENT_PATH = "models/policy_current.json"
+EVENTS_PATH = "models/policy_events.jsonl"
+COMPACT_EVERY = 500
+
+_CACHE = {}
+
+def _write_json(obj, path: str):
+    """Atomic replace, so readers see the old or the new file, never a partial one."""
+    write_json_atomic(obj, path, ensure_ascii=False, indent=2)
+
+def _read_json(path: str):
+    """Parsed JSON, re-read only when the file's (mtime, size) changed; None when missing."""
+    stamp = file_stamp(path)
+    if stamp is None:
+        return None
+    hit = _CACHE.get(path)
+    if hit is not None and hit[0] == stamp:
+        return hit[1]
+    obj = json.load(open(path, "r", encoding="utf-8"))
+    _CACHE[path] = (stamp, obj)
+    return obj
+
+def _snapshot():
+    snap = _read_json(PATH) or {"current": None, "history": []}
+    seq = snap.get("seq", len(snap.get("history", [])))
+    return seq, snap
+
+def _logged(after: int, upto: float = float("inf")) -> dict:
+    """{seq: policy} of the logged events with after < seq <= upto (last line wins)."""
+    if not os.path.exists(EVENTS_PATH):
+        return {}
+    by_seq = {}
+    with open(EVENTS_PATH, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                e = json.loads(line)
+            except ValueError:
+                continue  # torn last line of an interrupted append
+            if after < e.get("seq", -1) <= upto:
+                by_seq[e["seq"]] = e["policy"]
+    return by_seq
+
+def _events(after: int, upto: int):
+    """Logged policies with after < seq <= upto, by seq.
+
+    The pointer is the commit point: an event appended by an update that died
+    before replacing the pointer is ignored, and its seq is reused (last wins).
+    """
+    by_seq = _logged(after, upto)
+    return [by_seq[k] for k in sorted(by_seq)]
+
+def _rebuilt_pointer() -> dict:
+    """Pointer from the snapshot plus a replay of the log (every logged event counts as committed)."""
+    seq, snap = _snapshot()
+    logged = _logged(seq)
+    if not logged:
+        return {"seq": seq, "compacted_seq": seq, "current": snap["current"]}
+    top = max(logged)
+    return {"seq": top, "compacted_seq": seq, "current": logged[top]}
+
+def _torn(path: str) -> bool:
+    """True when the log's last line lacks its newline (an interrupted append)."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return False
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) != b"\n"
 
 def ensure_policy_registry(default_control_rate: float = 0.10):
     os.makedirs("models", exist_ok=True)
-    if not os.path.exists(PATH):
-        reg = {
-            "current": {"policy_version":"P0","control_rate":float(default_control_rate),"mode":"EXPERIMENT","created_at":"INIT","notes":"auto-created"},
-            "history": []
-        }
-        json.dump(reg, open(PATH,"w",encoding="utf-8"), ensure_ascii=False, indent=2)
+    if os.path.exists(CURRENT_PATH):
+        return
+    if os.path.exists(PATH):
+        # single-file registry, or a lost pointer: snapshot + logged events become the pointer
+        _write_json(_rebuilt_pointer(), CURRENT_PATH)
+        return
+    cur = {"policy_version":"P0","control_rate":float(default_control_rate),"mode":"EXPERIMENT","created_at":"INIT","notes":"auto-created"}
+    _write_json({"seq": 0, "current": cur, "history": []}, PATH)
+    _write_json({"seq": 0, "compacted_seq": 0, "current": cur}, CURRENT_PATH)
+
+def load_current(create: bool = True) -> dict:
+    """Current policy ({} when no registry exists and create=False)."""
+    if create:
+        ensure_policy_registry()
+    elif not os.path.exists(CURRENT_PATH):
+        return _rebuilt_pointer()["current"] or {}
+    return _read_json(CURRENT_PATH)["current"]
 
 def load_policy():
+    """Full registry {"current", "history"}: snapshot + events after it."""
     ensure_policy_registry()
-    return json.load(open(PATH,"r",encoding="utf-8"))
+    seq, snap = _snapshot()
+    versions = list(snap.get("history", [])) + [snap["current"]]
+    versions += _events(seq, _read_json(CURRENT_PATH)["seq"])
+    return {"current": versions[-1], "history": versions[:-1]}
 
-def update_policy(control_rate: float, mode: str, notes: str):
+def compact():
+    """Fold the event log into the snapshot and start an empty log."""
     reg = load_policy()
-    reg["history"].append(reg["current"])
-    reg["current"] = {
-        "policy_version": f"P{len(reg['history'])}",
+    ptr = dict(_read_json(CURRENT_PATH))
+    seq = ptr["seq"]
+    _write_json({"seq": seq, **reg}, PATH)
+    ptr["compacted_seq"] = seq
+    _write_json(ptr, CURRENT_PATH)
+    open(EVENTS_PATH, "w", encoding="utf-8").close()
+
+def update_policy(control_rate: float, mode: str, notes: str):
+    ensure_policy_registry()
+    ptr = _read_json(CURRENT_PATH)
+    seq = ptr["seq"] + 1
+    cur = {
+        "policy_version": f"P{seq}",
         "control_rate": float(control_rate),
         "mode": mode,
         "created_at": datetime.utcnow().isoformat()+"Z",
         "notes": notes
     }
-    json.dump(reg, open(PATH,"w",encoding="utf-8"), ensure_ascii=False, indent=2)
-    return reg["current"]
+    line = json.dumps({"seq": seq, "policy": cur}, ensure_ascii=False) + "\n"
+    if _torn(EVENTS_PATH):
+        line = "\n" + line
+    with open(EVENTS_PATH, "a", encoding="utf-8") as f:
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+    _write_json({"seq": seq, "compacted_seq": ptr.get("compacted_seq", 0), "current": cur}, CURRENT_PATH)
+    if seq - ptr.get("compacted_seq", 0) >= COMPACT_EVERY:
+        compact()
+    return cur
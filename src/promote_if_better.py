@@ -1,17 +1,17 @@
-import os
-import pandas as pd
-from src.io_utils import read_csv
+from src.io_utils import read_rows, to_float
 from src.registry import promote
+from src.instrument import stage
 
+@stage("promote_if_better")
 def main():
-    df = read_csv("out/cc_metrics.csv")
-    if df.empty or df["model"].nunique() < 2:
+    rows = read_rows("out/cc_metrics.csv")
+    if len({r["model"] for r in rows}) < 2:
         print("🟨 promote: no challenger metrics")
         return
-    champ = df[df["model"]=="champion"].iloc[0]
-    chall = df[df["model"]=="challenger"].iloc[0]
+    champ = next(r for r in rows if r["model"]=="champion")
+    chall = next(r for r in rows if r["model"]=="challenger")
     # standard: prioritize avg_precision, then roc_auc
-    if float(chall["avg_precision"]) >= float(champ["avg_precision"]):
+    if to_float(chall["avg_precision"]) >= to_float(champ["avg_precision"]):
         promote()
         print("✅ promoted challenger -> champion")
     else:
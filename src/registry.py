@@ -1,5 +1,4 @@
-import os, json, shutil
-from joblib import load
+import os, shutil
 from src.io_utils import ensure_dirs
 
 CHAMPION = "models/champion.joblib"
@@ -1,5 +1,6 @@
-import pandas as pd
-from src.policy_registry import load_policy, update_policy
+from src.io_utils import read_rows
+from src.policy_registry import load_current, update_policy
+from src.instrument import stage
 
 STAGES = [0.10, 0.05, 0.02, 0.00]
 ROLLBACK_TO = 0.10
@@ -10,12 +11,16 @@ def next_stage(cur_rate: float):
             return r
     return cur_rate
 
+@stage("rollout_controller")
 def main():
-    d = pd.read_csv("out/guardrails_decision.csv").iloc[0]
+    rows = read_rows("out/guardrails_decision.csv")
+    if not rows:
+        raise FileNotFoundError("out/guardrails_decision.csv")
+    d = rows[0]
     decision = str(d["decision"])
     reasons = str(d.get("reasons",""))
 
-    cur = load_policy()["current"]
+    cur = load_current()
     cur_rate = float(cur["control_rate"])
 
     if decision == "GO":
@@ -0,0 +1,183 @@
+"""Column schemas of the claims input and the out/ CSV artifacts.
+
+io_utils.read_csv applies the schema registered for a path: ids load as
+Arrow-backed strings instead of Python objects, low-cardinality labels as
+category, listed date columns as datetime64, and the file is parsed by the
+multi-threaded pyarrow CSV reader. Columns a schema doesn't list keep
+inference, so numbers stay int64/float64 and artifacts written from typed
+frames are byte-for-byte what they were. `texts` are kept verbatim as str:
+Arrow would otherwise turn date-like text into dates where pandas' C parser
+keeps strings (claim_date is a one-hot model feature in the claims file).
+
+A schema lists the columns it knows about; a file may carry a subset (the
+demo simulator writes a different segment_alerts.csv than the stage does).
+
+compact_ledger() goes further for ledger frames that are held in memory
+(the dashboard, the KPI/alert stages): labels as category, repeated ids
+interned, scores as float32 and whole-won amounts as int32. eq_upper()
+compares such label columns without materializing a string per row.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+from src.config import CFG
+
+ID_DTYPE = "string[pyarrow]"
+DATE_FORMAT = "%Y-%m-%d"
+# pandas.read_csv's default na_values (pandas._libs.parsers.STR_NA_VALUES, copied:
+# that module is private), so the Arrow reader nulls exactly what the C parser does
+CSV_NA_VALUES = (
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+)
+
+
+@dataclass(frozen=True)
+class Schema:
+    ids: Tuple[str, ...] = ()
+    categories: Tuple[str, ...] = ()
+    dates: Tuple[str, ...] = ()
+    texts: Tuple[str, ...] = ()
+
+    def dtypes(self, present: Iterable[str]) -> Dict[str, str]:
+        """read_csv dtype= for the columns of this schema that are in `present`."""
+        present = set(present)
+        out = {c: ID_DTYPE for c in self.ids if c in present}
+        out.update({c: "category" for c in self.categories if c in present})
+        return out
+
+    def parse_dates(self, present: Iterable[str]) -> list:
+        present = set(present)
+        return [c for c in self.dates if c in present]
+
+    def strings(self, present: Iterable[str]) -> list:
+        """Columns to read as plain text (dates are parsed from it afterwards)."""
+        present = set(present)
+        return [c for c in self.dates + self.texts if c in present]
+
+
+LEDGER_SEGMENTS = ("channel", "product", "product_line", "region", "hospital_grade")
+LEDGER_LABELS = ("exp_group", "decision", "policy_version", "mode") + LEDGER_SEGMENTS
+LEDGER_INTERNED = (CFG.id_col, "hospital_id")
+LEDGER_FLOAT32 = ("score", "control_rate")
+LEDGER_AMOUNTS = (CFG.paid_col,)
+INTERN_MAX_RATIO = 0.5  # intern when values repeat at least twice on average
+INT32_MAX = 2**31 - 1
+
+SCHEMAS: Dict[str, Schema] = {
+    CFG.data_claims: Schema(
+        ids=(CFG.id_col, "customer_id", "plcy_no", "claim_rcpt_no", "agent_id", "hospital_id"),
+        categories=("product", "product_line", "channel", "region", "gender", "occupation",
+                    "hospital_grade", "visit_type", "diagnosis_icd", "procedure_code"),
+        texts=("claim_date",),
+    ),
+    "out/decision_ledger.csv": Schema(
+        ids=(CFG.id_col, "hospital_id"),
+        categories=LEDGER_LABELS,
+        dates=("claim_date",),
+    ),
+    "out/review_queue.csv": Schema(ids=(CFG.id_col,), categories=("exp_group", "decision"), texts=("claim_date",)),
+    "out/review_cases.csv": Schema(ids=(CFG.id_col,), categories=("status",),
+                                   texts=("received_time_utc", "processed_time_utc")),
+    "out/cc_metrics.csv": Schema(categories=("model",)),
+    "out/impact_causal.csv": Schema(categories=("method",)),
+    "out/impact_significance_scipy.csv": Schema(categories=("test", "paid_col_used")),
+    "out/impact_panel.csv": Schema(categories=("method", "notes")),
+    "out/segment_alerts.csv": Schema(categories=("segment_col", "segment_value", "segment", "metric")),
+    "out/guardrails_decision.csv": Schema(categories=("decision", "reasons")),
+    "out/segment_cube.csv": Schema(categories=("month", "segment_col", "segment", "exp_group")),
+}
+
+
+def schema_for(path: str) -> Optional[Schema]:
+    """Schema registered for `path` (matched on the normalized relative path)."""
+    p = os.path.normpath(path)
+    if os.path.isabs(p):
+        p = os.path.relpath(p)
+    return _NORMALIZED.get(p)
+
+
+_NORMALIZED = {os.path.normpath(k): v for k, v in SCHEMAS.items()}
+
+
+def _interned(s):
+    """Category whose categories are Arrow strings: one copy of each distinct value + int codes."""
+    import pandas as pd
+
+    cats = pd.Index(s.dropna().unique(), dtype=ID_DTYPE).sort_values()
+    return s.astype(pd.CategoricalDtype(cats))
+
+
+def _date_text(s):
+    """Whole-day datetimes as Arrow YYYY-MM-DD text (formatted once per distinct day)."""
+    import pandas as pd
+
+    codes, days = pd.factorize(s, sort=True)
+    text = pd.array(days.strftime(DATE_FORMAT), dtype=ID_DTYPE).take(codes, allow_fill=True)
+    return pd.Series(text, index=s.index, name=s.name)
+
+
+def compact_ledger(df):
+    """Decision ledger with compact dtypes (same values; amounts only if they fit int32).
+
+    Labels -> category; claim_id / hospital_id -> interned category when
+    values repeat, else Arrow strings; claim_date -> Arrow YYYY-MM-DD text
+    (also from parsed whole-day dates); score -> float32; paid
+    amounts -> int32 when whole and within range (float32 would round KRW
+    amounts above 2**24, so anything else keeps its dtype).
+    """
+    import numpy as np
+    import pandas as pd
+
+    out = df.copy()
+    n = max(len(out), 1)
+    for c in LEDGER_LABELS:
+        if c in out.columns and not isinstance(out[c].dtype, pd.CategoricalDtype):
+            out[c] = out[c].astype("category")
+    for c in LEDGER_INTERNED:
+        if c not in out.columns or isinstance(out[c].dtype, pd.CategoricalDtype):
+            continue
+        if out[c].nunique(dropna=True) / n <= INTERN_MAX_RATIO:
+            out[c] = _interned(out[c])
+        elif out[c].dtype == object:
+            out[c] = out[c].astype(ID_DTYPE)
+    for c in SCHEMAS["out/decision_ledger.csv"].dates:
+        # text, as on disk: pd.to_datetime of a categorical comes back categorical
+        if c not in out.columns:
+            continue
+        d = out[c].dropna()
+        if out[c].dtype.kind == "M" and getattr(out[c].dt, "tz", None) is None and (d == d.dt.normalize()).all():
+            out[c] = _date_text(out[c])
+        elif out[c].dtype == object:
+            out[c] = out[c].astype(ID_DTYPE)
+    for c in LEDGER_FLOAT32:
+        if c in out.columns and out[c].dtype.kind in "if":
+            out[c] = out[c].astype(np.float32)
+    for c in LEDGER_AMOUNTS:
+        if c in out.columns and out[c].dtype.kind in "if" and out[c].notna().all():
+            v = out[c].to_numpy()
+            if np.all(v == np.round(v)) and (len(v) == 0 or np.abs(v).max() <= INT32_MAX):
+                out[c] = out[c].astype(np.int32)
+    return out
+
+
+def read_compact_ledger(path: str):
+    """io_utils.read_csv(path) as a compact ledger (an ArtifactCache loader)."""
+    from src.io_utils import read_csv
+
+    return compact_ledger(read_csv(path))
+
+
+def eq_upper(s, value: str):
+    """Boolean Series of `s.astype(str).str.upper() == value`, per category for categoricals."""
+    import numpy as np
+    import pandas as pd
+
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        hit = np.flatnonzero(s.cat.categories.astype(str).str.upper() == value)
+        return pd.Series(np.isin(s.cat.codes.to_numpy(), hit), index=s.index)
+    return s.astype(str).str.upper().eq(value)
@@ -5,8 +5,14 @@ from joblib import load
 
 from src.config import CFG
 from src.io_utils import ensure_dirs, read_csv, write_csv
-from src.policy_registry import ensure_policy_registry, load_policy
+from src.policy_registry import ensure_policy_registry, load_current
 from src.experiment import assign_group
+from src.instrument import span, stage
+from src.explainability import (
+    contribution_matrix, format_contributions, rule_reasons_frame, split_linear_pipeline, top_contributions,
+)
+
+REASON_COLS = ["risk_reasons", "reason_codes", "risk_reason_details", "top_features"]
 
 def _get_X(df, meta_path):
     meta = json.load(open(meta_path,"r",encoding="utf-8")) if os.path.exists(meta_path) else {}
@@ -18,10 +24,38 @@ def _get_X(df, meta_path):
         X = df[[CFG.paid_col]].rename(columns={CFG.paid_col:"paid_fallback"})
     return X
 
+def _split_model(model):
+    """(pre, clf) when the model is exactly preprocess -> linear clf, else None."""
+    steps = getattr(model, "steps", None)
+    parts = split_linear_pipeline(model) if steps and len(steps) == 2 else None
+    if parts is None or parts[0] is not steps[0][1] or parts[1] is not steps[1][1]:
+        return None
+    return parts
+
+def _attach_reasons(out, df, Xt, parts):
+    """Rule reasons (short text, codes, JSON details) + top linear contributions for REVIEW rows (NaN elsewhere)."""
+    for c in REASON_COLS:
+        out[c] = pd.Series(np.nan, index=out.index, dtype=object)
+    rev = out["decision"].eq("REVIEW").to_numpy()
+    if not rev.any():
+        return out
+    rr = rule_reasons_frame(df.loc[rev], topk=3)
+    out.loc[rev, "risk_reasons"] = rr["risk_reasons"].to_numpy()
+    out.loc[rev, "reason_codes"] = rr["reason_codes"].to_numpy()
+    # full detail (weight/magnitude/evidence/score), so the dashboard need not re-run the rules
+    out.loc[rev, "risk_reason_details"] = [json.dumps(d, ensure_ascii=False) for d in rr["risk_reason_details"]]
+    if Xt is not None:
+        pre, clf = parts
+        names = pre.get_feature_names_out() if hasattr(pre, "get_feature_names_out") else [f"f{i}" for i in range(Xt.shape[1])]
+        top = top_contributions(contribution_matrix(Xt[np.flatnonzero(rev)], clf.coef_), names, topk=3)
+        out.loc[rev, "top_features"] = [format_contributions(t) for t in top]
+    return out
+
+@stage("score_batch_prod")
 def main():
     ensure_dirs(CFG.out_dir, CFG.model_dir)
     ensure_policy_registry(CFG.default_control_rate)
-    pol = load_policy()["current"]
+    pol = load_current()
     control_rate = float(pol["control_rate"])
     policy_version = pol.get("policy_version","P?")
     mode = pol.get("mode","EXPERIMENT")
@@ -37,7 +71,15 @@ def main():
     calibrator = load(calibrator_path) if os.path.exists(calibrator_path) else None
 
     X = _get_X(df, meta_path)
-    raw = model.predict_proba(X)[:,1]
+    # transform once: the matrix is reused for the REVIEW explanations below
+    parts = _split_model(model)
+    Xt = None
+    with span("predict_proba", rows=len(X)):
+        if parts is not None:
+            Xt = parts[0].transform(X)
+            raw = parts[1].predict_proba(Xt)[:,1]
+        else:
+            raw = model.predict_proba(X)[:,1]
     if calibrator is not None:
         try:
             score = calibrator.predict(raw)
@@ -46,7 +88,7 @@ def main():
     else:
         score = raw
 
-    out = df[[c for c in [CFG.id_col, CFG.paid_col] if c in df.columns]].copy()
+    out = df[[c for c in [CFG.id_col, "claim_date", CFG.paid_col] if c in df.columns]].copy()
     out["score"] = score
     out["exp_group"] = out[CFG.id_col].astype(str).apply(lambda cid: assign_group(cid, CFG.experiment_salt, control_rate))
 
@@ -56,6 +98,12 @@ def main():
     else:
         out["decision"] = np.where((out["exp_group"]=="TREATMENT") & (out["score"] >= CFG.review_threshold), "REVIEW", "PAY")
 
+    with span("reasons", rows=int((out["decision"]=="REVIEW").sum())):
+        try:
+            out = _attach_reasons(out, df, Xt, parts)
+        except Exception as e:
+            print("🟨 score_batch_prod: reasons skipped:", e)
+
     # review queue (cap)
     rq = out[out["decision"]=="REVIEW"].sort_values("score", ascending=False).head(CFG.max_daily_reviews).copy()
     write_csv(rq, "out/review_queue.csv")
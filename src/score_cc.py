@@ -1,4 +1,5 @@
 import json
+import os
 import numpy as np
 import pandas as pd
 from joblib import load
@@ -6,7 +7,9 @@ from sklearn.metrics import roc_auc_score, average_precision_score
 
 from src.config import CFG
 from src.io_utils import read_csv, write_csv
+from src.label_store import with_labels
 from src.registry import init_champion_if_missing, CHAMPION, CHALLENGER, META_CHAMP, META_CHALL
+from src.instrument import span, stage
 
 def _get_X(df, meta_path):
     meta = json.load(open(meta_path,"r",encoding="utf-8")) if meta_path and os.path.exists(meta_path) else {}
@@ -18,9 +21,10 @@ def _get_X(df, meta_path):
         X = df[[CFG.paid_col]].rename(columns={CFG.paid_col:"paid_fallback"})
     return X
 
+@stage("score_cc")
 def main():
     init_champion_if_missing()
-    df = read_csv(CFG.data_claims)
+    df = with_labels(read_csv(CFG.data_claims))
     if df.empty or CFG.label_col not in df.columns:
         print("🟨 score_cc: missing label, skip")
         return
@@ -31,7 +35,8 @@ def main():
     chall = load(CHALLENGER) if os.path.exists(CHALLENGER) else None
 
     Xc = _get_X(df, META_CHAMP)
-    pc = champ.predict_proba(Xc)[:,1]
+    with span("predict_proba", model="champion", rows=len(Xc)):
+        pc = champ.predict_proba(Xc)[:,1]
 
     out = {"model":"champion", "roc_auc": float("nan"), "avg_precision": float("nan")}
     if len(np.unique(y))>1:
@@ -42,7 +47,8 @@ def main():
 
     if chall is not None and os.path.exists(META_CHALL):
         Xh = _get_X(df, META_CHALL)
-        ph = chall.predict_proba(Xh)[:,1]
+        with span("predict_proba", model="challenger", rows=len(Xh)):
+            ph = chall.predict_proba(Xh)[:,1]
         out2 = {"model":"challenger", "roc_auc": float("nan"), "avg_precision": float("nan")}
         if len(np.unique(y))>1:
             out2["roc_auc"] = roc_auc_score(y, ph)
@@ -54,5 +60,4 @@ def main():
     print("✅ wrote out/cc_metrics.csv")
 
 if __name__ == "__main__":
-    import os
     main()
@@ -1,8 +1,10 @@
 import pandas as pd
 import numpy as np
-from scipy import stats
 from src.config import CFG
-from src.io_utils import read_csv, write_csv
+from src.io_utils import write_csv
+from src.instrument import stage
+from src.ledger_store import load_ledger
+from src.stats_impact_scipy import welch_ttest
 
 def bh_fdr(pvals, alpha=0.1):
     p = np.array(pvals, dtype=float)
@@ -18,18 +20,20 @@ def bh_fdr(pvals, alpha=0.1):
     q[order] = np.minimum.accumulate((ranked*m/np.arange(1, m+1))[::-1])[::-1]
     return q, cutoff
 
+@stage("segment_alerts")
 def main():
-    led = read_csv("out/decision_ledger.csv")
+    led = load_ledger()
     if led.empty:
         print("🟨 segment_alerts: missing ledger")
         return
 
-    # pick some candidate segment cols: low-cardinality object columns
+    # pick some candidate segment cols: low-cardinality label columns
     cand_cols = []
     for c in led.columns:
-        if c in [CFG.id_col, CFG.paid_col, "score", "exp_group", "decision", "policy_version", "mode", "control_rate"]:
+        if c in [CFG.id_col, "claim_date", CFG.paid_col, "score", "exp_group", "decision", "policy_version", "mode", "control_rate",
+                 "risk_reasons", "reason_codes", "risk_reason_details", "top_features"]:
             continue
-        if led[c].dtype == "object":
+        if led[c].dtype == "object" or isinstance(led[c].dtype, pd.CategoricalDtype):
             nun = led[c].nunique(dropna=True)
             if 2 <= nun <= 30:
                 cand_cols.append(c)
@@ -37,15 +41,16 @@ def main():
     rows = []
     paid = pd.to_numeric(led[CFG.paid_col], errors="coerce")
     for col in cand_cols[:8]:  # cap
-        for val, sub in led.groupby(col):
+        for val, sub in led.groupby(col, observed=True):
             if len(sub) < 50:
                 continue
-            c = paid[sub["exp_group"]=="CONTROL"].dropna()
-            t = paid[sub["exp_group"]=="TREATMENT"].dropna()
+            p = paid.loc[sub.index]
+            c = p[sub["exp_group"]=="CONTROL"].dropna()
+            t = p[sub["exp_group"]=="TREATMENT"].dropna()
             if len(c) < 20 or len(t) < 20:
                 continue
             effect = float(c.mean() - t.mean())
-            _, p = stats.ttest_ind(c, t, equal_var=False, nan_policy="omit")
+            _, p = welch_ttest(c, t)
             rows.append({
                 "segment_col": col,
                 "segment_value": str(val),
@@ -0,0 +1,144 @@
+"""Segment cube for the dashboard HTE views.
+
+Materializes additive per-(month, segment_col, segment, exp_group) aggregates
+once per pipeline run, so HTE tables can be derived from a few hundred rows
+instead of re-grouping the full enriched ledger on every dashboard rerun.
+
+Outputs:
+- out/segment_cube.csv
+"""
+
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.config import CFG
+from src.enriched_ledger import load_enriched_ledger
+from src.io_utils import write_csv
+from src.instrument import stage
+
+CUBE_PATH = os.path.join(CFG.out_dir, "segment_cube.csv")
+
+SUM_COLS = ["n", "paid_sum", "paid_n", "review_n", "score_sum", "score_n"]
+
+
+def _ledger_month(ledger: pd.DataFrame) -> pd.Series:
+    """'YYYY-MM' of each ledger row (NaN when the date is missing)."""
+    col = "claim_date" if "claim_date" in ledger.columns else ("date" if "date" in ledger.columns else None)
+    if col is None:
+        return pd.Series(np.nan, index=ledger.index, dtype=object)
+    d = pd.to_datetime(ledger[col], errors="coerce")
+    return d.dt.strftime("%Y-%m").where(d.notna(), np.nan)
+
+
+def build_segment_cube(ledger: pd.DataFrame, seg_cols: list[str]) -> pd.DataFrame:
+    """Aggregate an enriched ledger into additive cells per segment and experiment group."""
+    if ledger is None or ledger.empty:
+        return pd.DataFrame()
+    df = pd.DataFrame(index=ledger.index)
+    df["month"] = _ledger_month(ledger)
+    df["exp_group"] = ledger.get("exp_group", ledger.get("group", pd.Series("", index=ledger.index))).astype(str).str.upper()
+    paid = pd.to_numeric(ledger.get(CFG.paid_col), errors="coerce")
+    score = pd.to_numeric(ledger.get("score"), errors="coerce")
+    df["n"] = 1
+    df["paid_sum"] = paid.fillna(0.0)
+    df["paid_n"] = paid.notna().astype(int)
+    df["review_n"] = ledger.get("decision", pd.Series("", index=ledger.index)).astype(str).str.upper().eq("REVIEW").astype(int)
+    df["score_sum"] = score.fillna(0.0)
+    df["score_n"] = score.notna().astype(int)
+
+    keep = df["exp_group"].isin(["CONTROL", "TREATMENT"])
+    df = df[keep]
+    if df.empty:
+        return pd.DataFrame()
+
+    out = []
+    for col in seg_cols:
+        if col not in ledger.columns:
+            continue
+        d = df.assign(segment=ledger.loc[df.index, col])
+        agg = d.groupby(["month", "segment", "exp_group"], dropna=False, observed=True)[SUM_COLS].sum().reset_index()
+        agg.insert(1, "segment_col", col)
+        out.append(agg)
+    if not out:
+        return pd.DataFrame()
+    return pd.concat(out, ignore_index=True)
+
+
+def read_segment_cube(path: str = CUBE_PATH) -> pd.DataFrame:
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    return pd.read_csv(path, dtype={"month": str, "segment_col": str, "segment": str, "exp_group": str})
+
+
+def cube_dims(cube: pd.DataFrame) -> set:
+    if cube is None or cube.empty or "segment_col" not in cube.columns:
+        return set()
+    return set(cube["segment_col"].dropna().unique().tolist())
+
+
+def hte_from_cube(cube: pd.DataFrame, seg_cols: list[str], min_n: int = 200, month: str | None = None) -> pd.DataFrame:
+    """Same table as the dashboard's compute_hte, derived from cube cells.
+
+    `month` ('YYYY-MM') restricts to a single report month; None uses the whole window.
+    """
+    if cube is None or cube.empty:
+        return pd.DataFrame()
+    c = cube[cube["segment_col"].isin(seg_cols)]
+    if month is not None:
+        c = c[c["month"] == month]
+    if c.empty:
+        return pd.DataFrame()
+
+    out = []
+    for col in seg_cols:
+        cc = c[c["segment_col"] == col]
+        if cc.empty:
+            continue
+        agg = cc.groupby(["segment", "exp_group"], dropna=False)[SUM_COLS].sum().reset_index()
+        agg["avg_paid"] = agg["paid_sum"] / agg["paid_n"].where(agg["paid_n"] > 0)
+        agg["review_rate"] = agg["review_n"] / agg["n"]
+        agg["avg_score"] = agg["score_sum"] / agg["score_n"].where(agg["score_n"] > 0)
+
+        piv = agg.pivot(index="segment", columns="exp_group", values=["n", "avg_paid", "review_rate", "avg_score"])
+        piv.columns = [f"{a}_{b.lower()}" for a, b in piv.columns]
+        piv = piv.reset_index()
+        piv["n_total"] = piv.get("n_control", 0).fillna(0) + piv.get("n_treatment", 0).fillna(0)
+        piv = piv[piv["n_total"] >= min_n].copy()
+        if piv.empty:
+            continue
+        if "avg_paid_control" in piv.columns and "avg_paid_treatment" in piv.columns:
+            piv["delta_paid_c_minus_t"] = piv["avg_paid_control"] - piv["avg_paid_treatment"]
+        if "review_rate_control" in piv.columns and "review_rate_treatment" in piv.columns:
+            piv["delta_review_rate_t_minus_c"] = piv["review_rate_treatment"] - piv["review_rate_control"]
+        piv["segment_col"] = col
+        out.append(piv)
+
+    if not out:
+        return pd.DataFrame()
+    res = pd.concat(out, ignore_index=True)
+    if "delta_paid_c_minus_t" in res.columns:
+        res = res.sort_values("delta_paid_c_minus_t", key=lambda s: s.abs(), ascending=False)
+    return res
+
+
+@stage("segment_cube")
+def main():
+    led = load_enriched_ledger()
+    if led.empty:
+        print("🟨 segment_cube: missing ledger")
+        return
+
+    cube = build_segment_cube(led, list(CFG.segment_dims))
+    if cube.empty:
+        print("🟨 segment_cube: no segment cells")
+        return
+    write_csv(cube, CUBE_PATH)
+    print("✅ wrote", CUBE_PATH, cube.shape)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""Per-segment executive one-pagers for product_line / region / channel owners.
+
+Outputs:
+- out/segment_reports/<segment_col>/<segment>.pdf (+ .png trend chart)
+- out/segment_reports/manifest.json (input hash per report)
+
+KPIs and daily Control−Treatment deltas of every segment come from one
+grouped pass over the ledger. Charts and PDFs are rendered in a process pool;
+each worker registers the Korean font and builds the one-pager styles once
+(pdf_onepager._styles) and reuses them for all its reports. A report whose
+inputs (KPIs, highlights, chart points, CI and the code that renders it) hash
+to the manifest entry of the last run, and whose PDF still exists, is skipped.
+
+  python -m src.segment_reports
+  python -m src.segment_reports --workers 4 --force
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from src.config import CFG
+from src.enriched_ledger import enrich_with_claims
+from src.instrument import add_io, span, stage
+from src.io_utils import read_csv, read_text, write_text
+from src.ledger_store import LEDGER_PATH, load_ledger
+from src.schemas import eq_upper
+
+REPORT_DIR = os.path.join(CFG.out_dir, "segment_reports")
+MANIFEST_JSON = os.path.join(REPORT_DIR, "manifest.json")
+ALERTS_PATH = os.path.join(CFG.out_dir, "segment_alerts.csv")
+CI_PATH = "assets/ci.json"
+REPORT_SEGMENTS = ("product_line", "region", "channel")
+CHART_DAYS = 60
+
+
+def _krw(x) -> str:
+    try:
+        v = float(x)
+        if np.isnan(v):
+            return "NA"
+        return f"{int(round(v)):,}원"
+    except (TypeError, ValueError):
+        return "NA"
+
+
+def _slug(value) -> str:
+    return re.sub(r"[^\w.-]+", "_", str(value)).strip("_") or "_"
+
+
+def _alerts() -> Dict[str, dict]:
+    """'col=value' -> {p_value, is_alert} from out/segment_alerts.csv (stage or demo layout)."""
+    df = read_csv(ALERTS_PATH)
+    if df.empty:
+        return {}
+    if {"segment_col", "segment_value"}.issubset(df.columns):
+        keys = df["segment_col"].astype(str) + "=" + df["segment_value"].astype(str)
+    elif "segment" in df.columns:
+        keys = df["segment"].astype(str)
+    else:
+        return {}
+    p = pd.to_numeric(df.get("p_value", pd.Series(np.nan, index=df.index)), errors="coerce")
+    alert = df.get("is_alert", pd.Series(False, index=df.index)).astype(str).str.lower().isin(["true", "1"])
+    out = {}
+    for k, pv, a in zip(keys, p, alert):
+        cur = out.setdefault(k, {"p_value": None, "is_alert": False})
+        cur["is_alert"] = cur["is_alert"] or bool(a)
+        if not np.isnan(pv) and cur["p_value"] is None:
+            cur["p_value"] = float(pv)
+    return out
+
+
+def segment_cells(ledger: pd.DataFrame, col: str) -> pd.DataFrame:
+    """Additive per-(segment, day) cells: sizes, paid sums per group and review counts."""
+    is_c = eq_upper(ledger["exp_group"], "CONTROL")
+    is_t = eq_upper(ledger["exp_group"], "TREATMENT")
+    paid = pd.to_numeric(ledger[CFG.paid_col], errors="coerce").astype(float)
+    df = pd.DataFrame({
+        "segment": ledger[col],
+        "date": pd.to_datetime(ledger["claim_date"], errors="coerce").dt.normalize(),
+        "n_c": is_c, "n_t": is_t,
+        "paid_c": paid.where(is_c), "paid_t": paid.where(is_t),
+        "review_n": eq_upper(ledger["decision"], "REVIEW") if "decision" in ledger.columns else False,
+    })
+    df = df[(is_c | is_t) & df["date"].notna() & df["segment"].notna()]
+    return df.groupby(["segment", "date"], observed=True).agg(
+        n=("n_c", "size"), n_c=("n_c", "sum"), n_t=("n_t", "sum"),
+        paid_c_sum=("paid_c", "sum"), paid_c_n=("paid_c", "count"),
+        paid_t_sum=("paid_t", "sum"), paid_t_n=("paid_t", "count"),
+        review_n=("review_n", "sum"),
+    ).reset_index()
+
+
+def _report(col: str, value, cells: pd.DataFrame, alert: dict, ci: dict) -> dict:
+    """Payload of one segment report: KPI card strings, highlights and chart points."""
+    tot = cells[["n", "n_c", "n_t", "paid_c_sum", "paid_c_n", "paid_t_sum", "paid_t_n", "review_n"]].sum()
+    avg_c = tot["paid_c_sum"] / tot["paid_c_n"] if tot["paid_c_n"] else np.nan
+    avg_t = tot["paid_t_sum"] / tot["paid_t_n"] if tot["paid_t_n"] else np.nan
+    effect = avg_c - avg_t
+    asof = cells["date"].max()
+    month = cells["date"].dt.to_period("M") == asof.to_period("M")
+    quarter = cells["date"].dt.to_period("Q") == asof.to_period("Q")
+    n_t_today = cells.loc[cells["date"] == asof, "n_t"].sum()
+    saving_today, saving_mtd = effect * n_t_today, effect * cells.loc[month, "n_t"].sum()
+    saving_qtd = effect * cells.loc[quarter, "n_t"].sum()
+    review_rate = tot["review_n"] / tot["n"] if tot["n"] else np.nan
+    p = alert.get("p_value")
+
+    daily = cells[(cells["paid_c_n"] > 0) & (cells["paid_t_n"] > 0)].sort_values("date").tail(CHART_DAYS)
+    delta = daily["paid_c_sum"] / daily["paid_c_n"] - daily["paid_t_sum"] / daily["paid_t_n"]
+    points = [[d.strftime("%Y-%m-%d"), float(v)] for d, v in zip(daily["date"], delta)]
+
+    kpis = {
+        "policy_ver": "NA", "policy_mode": "NA",
+        "control_rate": f"{tot['n_c'] / tot['n']:.1%}" if tot["n"] else "NA",
+        "effect_per_claim": _krw(effect), "saving_today": _krw(saving_today),
+        "saving_mtd": _krw(saving_mtd), "saving_qtd": _krw(saving_qtd),
+        "p_value": f"{p:.4f}" if p is not None else "NA",
+        "guardrails_badge": "ALERT" if alert.get("is_alert") else ("OK" if alert else "NA"),
+        "red_flag": bool(alert.get("is_alert", False)),
+    }
+    highlights = [
+        f"{col} = {value}: 청구 {int(tot['n']):,}건 (통제 {int(tot['n_c']):,} · 처리 {int(tot['n_t']):,}), 기준일 {asof:%Y-%m-%d}",
+        f"건당 효과(통제−처리) {_krw(effect)}, 월 누적 절감(추정) {_krw(saving_mtd)}",
+        f"심사(REVIEW) 비율 {review_rate:.1%}" if not np.isnan(review_rate) else "심사(REVIEW) 비율 NA",
+        "세그먼트 경보: 처리군 지급액이 유의하게 높습니다(FDR ≤ 0.1)." if alert.get("is_alert") else "세그먼트 경보 없음",
+    ]
+    out = os.path.join(REPORT_DIR, _slug(col), _slug(value))
+    return {
+        "key": f"{col}={value}", "col": col, "pdf": out + ".pdf", "png": out + ".png",
+        "ci": {**ci, "report_title": f"{ci.get('report_title', 'Executive Report')} — {col}: {value}"},
+        "kpis": kpis, "highlights": highlights, "points": points,
+    }
+
+
+def build_reports(ledger: pd.DataFrame, ci: dict, segments=REPORT_SEGMENTS) -> List[dict]:
+    alerts = _alerts()
+    reports = []
+    for col in segments:
+        if col not in ledger.columns:
+            continue
+        cells = segment_cells(ledger, col)
+        for value, sub in cells.groupby("segment", observed=True, sort=True):
+            reports.append(_report(col, value, sub, alerts.get(f"{col}={value}", {}), ci))
+    return reports
+
+
+def _digest(report: dict, code: str) -> str:
+    blob = json.dumps({k: v for k, v in report.items() if k != "key"}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256((code + blob).encode("utf-8")).hexdigest()
+
+
+def _init_worker():
+    import matplotlib
+
+    matplotlib.use("Agg")
+    from src.pdf_onepager import _styles
+
+    _styles()
+
+
+def render(report: dict) -> str:
+    """Chart + PDF of one segment (runs in a pool worker)."""
+    from src.executive_charts import _plot_delta
+    from src.pdf_onepager import export_onepager_pdf
+
+    chart = None
+    if report["points"]:
+        m = pd.DataFrame(report["points"], columns=["date", "delta_paid_c_minus_t"])
+        m["date"] = pd.to_datetime(m["date"])
+        _plot_delta(m, report["png"], f"Daily Δ Paid (Control − Treatment) · {report['col']}")
+        chart = report["png"]
+    export_onepager_pdf(report["pdf"], report["ci"], report["kpis"], report["highlights"], chart, None)
+    return report["key"]
+
+
+def _read_manifest() -> dict:
+    try:
+        return json.loads(read_text(MANIFEST_JSON) or "{}")
+    except ValueError:
+        return {}
+
+
+@stage("segment_reports")
+def main():
+    ap = argparse.ArgumentParser(description="Per-segment executive one-pager PDFs")
+    ap.add_argument("--workers", type=int, default=CFG.pipeline_workers, help="Render processes (0 = CPU count)")
+    ap.add_argument("--force", action="store_true", help="Re-render every report")
+    args = ap.parse_args()
+
+    if not os.path.exists(LEDGER_PATH):
+        print("🟨 segment_reports: missing ledger")
+        return
+    ledger = load_ledger(columns=[CFG.id_col, "claim_date", "exp_group", CFG.paid_col, "decision", *REPORT_SEGMENTS])
+    if any(c not in ledger.columns or ledger[c].isna().any() for c in REPORT_SEGMENTS):
+        # the scoring ledger carries no segment columns; take them from the claims (ledger values win)
+        claims = read_csv(CFG.data_claims, columns=[CFG.id_col, *REPORT_SEGMENTS])
+        ledger = enrich_with_claims(ledger, claims)
+    if ledger.empty or not {"claim_date", "exp_group", CFG.paid_col}.issubset(ledger.columns):
+        print("🟨 segment_reports: ledger without claim_date/exp_group/paid columns")
+        return
+    ci = json.load(open(CI_PATH, "r", encoding="utf-8")) if os.path.exists(CI_PATH) else {}
+
+    from src.stage_cache import code_hash
+
+    code = code_hash("src.segment_reports")
+    with span("segment_kpis"):
+        reports = build_reports(ledger, ci)
+    manifest, previous = {}, _read_manifest()
+    todo = []
+    for r in reports:
+        h = _digest(r, code)
+        manifest[r["key"]] = {"hash": h, "pdf": r["pdf"]}
+        if args.force or previous.get(r["key"], {}).get("hash") != h or not os.path.exists(r["pdf"]):
+            todo.append(r)
+
+    workers = max(1, min(args.workers or os.cpu_count() or 1, len(todo)))
+    with span("render_reports", reports=len(todo), workers=workers):
+        if workers == 1:
+            _init_worker()
+            done = [render(r) for r in todo]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as ex:
+                done = list(ex.map(render, todo))
+        add_io(rows_out=len(done))
+    write_text(json.dumps(manifest, indent=2, ensure_ascii=False), MANIFEST_JSON)
+    print(f"✅ segment_reports: {len(done)} rendered, {len(reports) - len(done)} unchanged → {REPORT_DIR}")
+
+
+if __name__ == "__main__":
+    main()
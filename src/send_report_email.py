@@ -1,10 +1,14 @@
+import argparse
+import json
 import os
-import csv
-from datetime import datetime
 from src.render_email import build_email_html
-from src.emailer import send_email
+from src.emailer import MailJob, SendLog, _getenv, _parse_recipients, send_bulk, send_email
+from src.instrument import stage
+from src.io_utils import read_rows
 
 OUT = "out"
+DISTRIBUTION = "data/report_recipients.csv"
+SEGMENT_MANIFEST = os.path.join(OUT, "segment_reports", "manifest.json")
 
 def load_dotenv(path: str = ".env") -> None:
     if not os.path.exists(path):
@@ -20,22 +24,10 @@ def load_dotenv(path: str = ".env") -> None:
             os.environ.setdefault(k, v)
 
 def log_send(status: str, message: str):
-    os.makedirs(OUT, exist_ok=True)
-    path = os.path.join(OUT, "email_send_log.csv")
-    exists = os.path.exists(path)
-    with open(path, "a", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        if not exists:
-            w.writerow(["ts", "status", "message"])
-        w.writerow([datetime.utcnow().isoformat() + "Z", status, message])
+    SendLog().write(status, message)
 
-def main():
-    load_dotenv(".env")
-    subject_prefix = os.getenv("MAIL_SUBJECT_PREFIX", "[Fraud Detection]").strip()
-    subject = f"{subject_prefix} Executive Summary"
-    md_path = os.path.join(OUT, "executive_summary.md")
-    html_body = build_email_html(md_path)
-    attachments = [
+def company_attachments() -> list[str]:
+    return [
         os.path.join(OUT, "executive_onepager.pdf"),
         os.path.join(OUT, "chart_impact_delta.png"),
         os.path.join(OUT, "impact_daily_delta.csv"),
@@ -44,8 +36,63 @@ def main():
         os.path.join(OUT, "segment_alerts.csv"),
         os.path.join(OUT, "impact_significance_scipy.csv"),
     ]
+
+def bulk_jobs(path: str, subject: str, html_body: str) -> list[MailJob]:
+    """One job per distribution row (email[, segment_col, segment]).
+
+    Rows naming a segment get that segment's one-pager (src.segment_reports);
+    the others get the company-wide report attachments.
+    """
+    manifest = json.load(open(SEGMENT_MANIFEST, "r", encoding="utf-8")) if os.path.exists(SEGMENT_MANIFEST) else {}
+    jobs = []
+    for r in read_rows(path):
+        to = _parse_recipients(r.get("email", ""))
+        if not to:
+            continue
+        col, value = (r.get("segment_col") or "").strip(), (r.get("segment") or "").strip()
+        if col:
+            pdf = manifest.get(f"{col}={value}", {}).get("pdf", "")
+            if not pdf or not os.path.exists(pdf):
+                log_send("SKIP", f"no segment report for {col}={value} ({';'.join(to)})")
+                continue
+            jobs.append(MailJob(to=to, subject=f"{subject} — {col}: {value}", html_body=html_body, attachments=[pdf]))
+        else:
+            jobs.append(MailJob(to=to, subject=subject, html_body=html_body, attachments=company_attachments()))
+    return jobs
+
+@stage("send_report_email")
+def main():
+    ap = argparse.ArgumentParser(description="Email the executive report")
+    ap.add_argument("--bulk", action="store_true", help="Send to every row of the distribution list")
+    ap.add_argument("--recipients", default="", help=f"Distribution list CSV (default MAIL_DISTRIBUTION or {DISTRIBUTION})")
+    ap.add_argument("--connections", type=int, default=0, help="Concurrent SMTP sessions (default MAIL_MAX_CONNECTIONS or 4)")
+    args = ap.parse_args()
+
+    load_dotenv(".env")
+    subject_prefix = os.getenv("MAIL_SUBJECT_PREFIX", "[Fraud Detection]").strip()
+    subject = f"{subject_prefix} Executive Summary"
+    md_path = os.path.join(OUT, "executive_summary.md")
+    html_body = build_email_html(md_path)
+
+    if args.bulk:
+        if _getenv("MAIL_ENABLED", "0") != "1":
+            print("MAIL_ENABLED!=1, skip sending email")
+            return
+        path = args.recipients or _getenv("MAIL_DISTRIBUTION", DISTRIBUTION)
+        jobs = bulk_jobs(path, subject, html_body)
+        if not jobs:
+            print("🟨 send_report_email: no recipients in", path)
+            return
+        results = send_bulk(jobs, max_connections=args.connections or int(_getenv("MAIL_MAX_CONNECTIONS", "4")),
+                            retries=int(_getenv("MAIL_RETRIES", "2")))
+        failed = [r for r in results if r["status"] != "OK"]
+        print(f"✅ sent {len(results) - len(failed)}/{len(results)} emails (log: {OUT}/email_send_log.csv)")
+        if failed:
+            raise SystemExit(f"🛑 {len(failed)} emails failed, e.g. {failed[0]['recipients']}: {failed[0]['error']}")
+        return
+
     try:
-        send_email(subject=subject, html_body=html_body, attachments=attachments)
+        send_email(subject=subject, html_body=html_body, attachments=company_attachments())
         log_send("OK", "sent")
     except Exception as e:
         log_send("FAIL", repr(e))
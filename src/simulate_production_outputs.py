@@ -13,12 +13,16 @@
 - guardrails_decision.csv         : GO/HOLD/ROLLBACK
 - segment_alerts.csv              : is_alert 포함
 - decision_ledger.csv             : 운영 원장(옵션, dashboard fallback)
+- decision_ledger_enriched.parquet: 청구 속성 조인 원장(대시보드/프로파일)
+- segment_cube.csv                : 세그먼트×실험군 집계(대시보드 HTE)
+- saving_daily_rollup.csv         : 일별 절감/건수 누적합(대시보드 KPI)
 - executive_summary.md            : 임원 요약(시뮬레이션 문구 포함)
 
 사용 예)
   python -m src.simulate_production_outputs --scenario GO
   python -m src.simulate_production_outputs --scenario HOLD --days 90
   python -m src.simulate_production_outputs --scenario ROLLBACK --seed 13
+  python -m src.simulate_production_outputs --days 365 --daily-claims 300000   # ~1억 행 원장(부하 테스트)
 
 """
 
@@ -32,6 +36,8 @@ import numpy as np
 import pandas as pd
 
 from src.config import CFG
+from src.instrument import add_io, span, stage
+from src.io_utils import csv_bytes
 
 
 OUT_DIR = "out"
@@ -130,7 +136,112 @@ def _write_csv(df: pd.DataFrame, name: str):
     df.to_csv(os.path.join(OUT_DIR, name), index=False, encoding="utf-8")
 
 
-def _simulate_decision_ledger(ts: pd.DataFrame, seed: int, control_rate: float, effect_per_claim: int, review_threshold: float):
+SEGMENT_COLS = ["channel", "product", "product_line", "region", "hospital_id", "hospital_grade"]
+LEDGER_CHUNK_ROWS = 1_000_000
+REVIEW_CASES_MAX = 1500
+
+
+def _claim_risk(claims: pd.DataFrame) -> np.ndarray:
+    """Per-claim monotonic risk from weak signals (missing values contribute 0)."""
+    def col(name, default=0.0):
+        if name not in claims.columns:
+            return np.full(len(claims), default)
+        return pd.to_numeric(claims[name], errors="coerce").to_numpy(dtype=float)
+
+    elapsed = col("elapsed_months", np.nan)
+    claim_amt = np.nan_to_num(col("claim_amount") if "claim_amount" in claims.columns else col("paid_amount"))
+    prem = np.maximum(np.nan_to_num(col("premium_monthly", 1.0), nan=1.0), 1.0)
+    prior_n = np.nan_to_num(col("prior_claim_cnt_12m"))
+    acct = np.nan_to_num(col("bank_account_changed_recently"))
+    dist = np.nan_to_num(col("provider_distance_km"))
+    docs = np.nan_to_num(col("doc_uploaded_cnt"))
+
+    risk = np.where(elapsed < 6, 1.0, np.where(elapsed < 12, 0.2, 0.0))
+    risk += np.clip((claim_amt / prem) / 50.0, 0.0, 2.0)
+    risk += np.minimum(1.5, prior_n / 3.0)
+    risk += 1.0 * acct
+    risk += np.minimum(1.0, dist / 50.0)
+    risk += np.where(docs <= 1, 0.4, 0.0)
+    return risk
+
+
+def _daily_sizes(rng, n_days: int, mean: int, floor: int) -> np.ndarray:
+    return np.maximum(floor, rng.normal(mean, mean / 6.0, size=n_days)).astype(np.int64)
+
+
+def _ledger_chunks(dates, claims: pd.DataFrame, rng, control_rate: float, effect_per_claim: int,
+                   review_threshold: float, daily_claims: int):
+    """Yield ledger frames covering consecutive days, ~LEDGER_CHUNK_ROWS rows each."""
+    real = not claims.empty and "claim_id" in claims.columns
+    if real:
+        sizes = _daily_sizes(rng, len(dates), daily_claims or 240, max(1, (daily_claims or 240) // 3))
+        ids = claims["claim_id"].to_numpy()
+        risk = _claim_risk(claims)
+        paid_src = pd.to_numeric(claims["paid_amount"], errors="coerce").to_numpy(dtype=float) if "paid_amount" in claims.columns else None
+        seg = {c: claims[c].to_numpy() for c in SEGMENT_COLS if c in claims.columns}
+    else:
+        sizes = _daily_sizes(rng, len(dates), daily_claims or 120, max(1, (daily_claims or 120) // 4))
+
+    i = 0
+    while i < len(dates):
+        # group consecutive days into one chunk
+        j, n = i, 0
+        while j < len(dates) and (j == i or n + sizes[j] <= LEDGER_CHUNK_ROWS):
+            n += int(sizes[j])
+            j += 1
+        day_sizes = sizes[i:j]
+        day = np.repeat(np.asarray([d.isoformat() for d in dates[i:j]], dtype=object), day_sizes)
+
+        exp = np.where(rng.random(n) < control_rate, "CONTROL", "TREATMENT")
+        if real:
+            # each day samples distinct claims when the pool is large enough
+            idx = np.concatenate([
+                rng.choice(len(ids), size=int(k), replace=len(ids) < k) for k in day_sizes
+            ])
+            score = 1.0 / (1.0 + np.exp(-(risk[idx] - 1.2)))
+            score = np.clip(score + rng.normal(0, 0.06, size=n), 0, 1)
+            paid_raw = paid_src[idx] if paid_src is not None else np.maximum(0, rng.normal(380_000, 220_000, size=n))
+            claim_id = ids[idx]
+        else:
+            score = np.clip(rng.normal(0.35, 0.18, size=n), 0, 1)
+            paid_raw = np.maximum(0, rng.normal(380_000, 220_000, size=n))
+            seq = np.arange(n) - np.repeat(np.cumsum(day_sizes) - day_sizes, day_sizes)
+            claim_id = ("SIM" + pd.Series(day).str.replace("-", "", regex=False)
+                        + pd.Series(seq).astype(str).str.zfill(4)).to_numpy()
+
+        treat = exp == "TREATMENT"
+        review = treat & (score >= review_threshold)
+        paid = np.where(treat, paid_raw - float(effect_per_claim) + rng.normal(0, 12_000, size=n), paid_raw)
+        paid = np.where(review, paid * rng.uniform(0.55, 0.85, size=n), paid)
+
+        frame = pd.DataFrame({
+            "claim_id": claim_id,
+            "claim_date": day,
+            "exp_group": exp,
+            "score": score,
+            "decision": np.where(review, "REVIEW", "PAY"),
+            "paid_amount": np.maximum(0, np.round(paid)).astype(np.int64),
+        })
+        if real:
+            # Keep key segment columns for HTE
+            for c, v in seg.items():
+                frame[c] = v[idx]
+        yield frame
+        i = j
+
+
+def _append_csv(df: pd.DataFrame, f, header: bool):
+    """Append a chunk to an open binary file (pyarrow writer when available, same bytes as to_csv)."""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        f.write(df.to_csv(index=False, header=header).encode("utf-8"))
+        return
+    f.write(csv_bytes(pa.Table.from_pandas(df, preserve_index=False), header=header))
+
+
+def _simulate_decision_ledger(ts: pd.DataFrame, seed: int, control_rate: float, effect_per_claim: int,
+                              review_threshold: float, daily_claims: int = 0):
     """대시보드 fallback/운영 원장용.
 
     핵심 목표:
@@ -141,9 +252,11 @@ def _simulate_decision_ledger(ts: pd.DataFrame, seed: int, control_rate: float,
     - 기본 paid_amount는 동일 분포에서 샘플
     - TREATMENT는 평균적으로 paid_amount가 (effect_per_claim) 만큼 낮도록 shift
     - REVIEW로 분류된 케이스는 추가 감액(추가 절감) 효과를 부여
+
+    일자 묶음 단위로 배열 연산 후 CSV에 청크 append (1억 행 규모도 메모리 일정).
+    daily_claims=0 이면 기본 규모(실데이터 240건/일, 합성 120건/일).
     """
     rng = np.random.default_rng(seed)
-    rows = []
 
     # Prefer using real-ish claim rows if present.
     # This makes segment HTE, profiling, and explainability much more realistic.
@@ -156,103 +269,35 @@ def _simulate_decision_ledger(ts: pd.DataFrame, seed: int, control_rate: float,
             claims = pd.DataFrame()
 
     dates = pd.to_datetime(ts["date"], errors="coerce").dropna().dt.date.unique()
-    if not claims.empty and "claim_id" in claims.columns:
-        # Ensure claim_date exists and spans the simulation window.
-        if "claim_date" not in claims.columns:
-            claims = claims.copy()
-            claims["claim_date"] = rng.choice(dates, size=len(claims), replace=True)
-        else:
-            claims = claims.copy()
-            claims["claim_date"] = pd.to_datetime(claims["claim_date"], errors="coerce").dt.date
-            mask = claims["claim_date"].isna()
-            if mask.any():
-                claims.loc[mask, "claim_date"] = rng.choice(dates, size=int(mask.sum()), replace=True)
-
-        # Sample claims per day to create a production-like ledger.
-        for d in dates:
-            # sample size
-            n = int(max(80, rng.normal(240, 40)))
-            sample = claims.sample(
-                n=min(n, len(claims)),
-                replace=(len(claims) < n),
-                random_state=int(rng.integers(0, 1_000_000)),
-            )
-
-            for _, r in sample.iterrows():
-                exp = "CONTROL" if rng.random() < control_rate else "TREATMENT"
-
-                # score from weak signals (realistic monotonic relationships)
-                elapsed = float(r.get("elapsed_months", np.nan))
-                claim_amt = float(r.get("claim_amount", r.get("paid_amount", 0)) or 0)
-                prem = float(r.get("premium_monthly", 1) or 1)
-                prior_n = float(r.get("prior_claim_cnt_12m", 0) or 0)
-                acct = float(r.get("bank_account_changed_recently", 0) or 0)
-                dist = float(r.get("provider_distance_km", 0) or 0)
-                docs = float(r.get("doc_uploaded_cnt", 0) or 0)
-
-                risk = 0.0
-                if not np.isnan(elapsed):
-                    risk += (1.0 if elapsed < 6 else 0.2 if elapsed < 12 else 0.0)
-                risk += min(2.0, max(0.0, (claim_amt / max(prem, 1.0)) / 50.0))
-                risk += min(1.5, prior_n / 3.0)
-                risk += 1.0 * acct
-                risk += min(1.0, dist / 50.0)
-                risk += 0.4 if docs <= 1 else 0.0
-
-                # map to 0..1
-                score = float(1.0 / (1.0 + np.exp(-(risk - 1.2))))
-                score = float(np.clip(score + rng.normal(0, 0.06), 0, 1))
-
-                decision = "REVIEW" if (exp == "TREATMENT" and score >= review_threshold) else "PAY"
-
-                paid_raw = float(r.get("paid_amount", max(0, rng.normal(380_000, 220_000))))
-                paid = paid_raw
-                if exp == "TREATMENT":
-                    paid = paid_raw - float(effect_per_claim) + float(rng.normal(0, 12_000))
-                    if decision == "REVIEW":
-                        paid = paid * float(rng.uniform(0.55, 0.85))
-
-                paid = int(max(0, round(paid)))
-
-                row = {
-                    "claim_id": r.get("claim_id"),
-                    "claim_date": d.isoformat(),
-                    "exp_group": exp,
-                    "score": score,
-                    "decision": decision,
-                    "paid_amount": paid,
-                }
-                # Keep key segment columns for HTE
-                for col in ["channel", "product", "product_line", "region", "hospital_id", "hospital_grade"]:
-                    if col in claims.columns:
-                        row[col] = r.get(col)
-                rows.append(row)
-
-    else:
-        # Fallback: purely synthetic ledger
-        for d in dates:
-            n = int(max(30, rng.normal(120, 25)))
-            for i in range(n):
-                exp = "CONTROL" if rng.random() < control_rate else "TREATMENT"
-                score = float(np.clip(rng.normal(0.35, 0.18), 0, 1))
-                decision = "REVIEW" if (exp == "TREATMENT" and score >= review_threshold) else "PAY"
-                paid_raw = float(max(0, rng.normal(380_000, 220_000)))
-                paid = paid_raw
-                if exp == "TREATMENT":
-                    paid = paid_raw - float(effect_per_claim) + float(rng.normal(0, 12_000))
-                    if decision == "REVIEW":
-                        paid = paid * float(rng.uniform(0.55, 0.85))
-                paid = int(max(0, round(paid)))
-                rows.append({
-                    "claim_id": f"SIM{d.strftime('%Y%m%d')}{i:04d}",
-                    "claim_date": d.isoformat(),
-                    "exp_group": exp,
-                    "score": score,
-                    "decision": decision,
-                    "paid_amount": paid,
-                })
-
-    _write_csv(pd.DataFrame(rows), "decision_ledger.csv")
+    path = os.path.join(OUT_DIR, "decision_ledger.csv")
+    n_rows = 0
+    with span("ledger", days=len(dates), daily_claims=int(daily_claims)), open(path, "wb") as f:
+        for k, frame in enumerate(_ledger_chunks(dates, claims, rng, control_rate, effect_per_claim,
+                                                 review_threshold, daily_claims)):
+            _append_csv(frame, f, header=(k == 0))
+            n_rows += len(frame)
+        if n_rows == 0:
+            _write_csv(pd.DataFrame(columns=["claim_id", "claim_date", "exp_group", "score", "decision", "paid_amount"]),
+                       "decision_ledger.csv")
+        add_io(rows_out=n_rows, bytes_written=os.path.getsize(path))
+
+
+def _iter_review_rows(path: str, columns: list):
+    """Stream the REVIEW rows (selected columns, as strings) of a large ledger CSV."""
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pac
+        import pyarrow.csv as pacsv
+    except ImportError:
+        for part in pd.read_csv(path, usecols=columns, dtype=str, chunksize=LEDGER_CHUNK_ROWS):
+            yield part[part["decision"].str.upper() == "REVIEW"]
+        return
+    convert = pacsv.ConvertOptions(include_columns=columns, column_types={c: pa.string() for c in columns})
+    with pacsv.open_csv(path, read_options=pacsv.ReadOptions(block_size=64 << 20),
+                        convert_options=convert) as reader:
+        for batch in reader:
+            mask = pac.equal(pac.utf8_upper(batch.column("decision")), "REVIEW")
+            yield batch.filter(pac.fill_null(mask, False)).to_pandas()
 
 
 def _simulate_review_cases(seed: int, review_sla_hours: int = 72):
@@ -261,17 +306,18 @@ def _simulate_review_cases(seed: int, review_sla_hours: int = 72):
     led_path = os.path.join(OUT_DIR, "decision_ledger.csv")
     if not os.path.exists(led_path):
         return
-    led = pd.read_csv(led_path)
-    if led.empty:
-        return
-    led["decision"] = led["decision"].astype(str).str.upper()
-    q = led[led["decision"] == "REVIEW"].copy()
+    # Only the latest REVIEW rows are needed: stream the ledger with a projection.
+    q = pd.DataFrame()
+    for part in _iter_review_rows(led_path, ["claim_id", "claim_date", "decision"]):
+        q = pd.concat([q, part], ignore_index=True) if not q.empty else part
+        if len(q) > 10 * REVIEW_CASES_MAX:
+            q = q.sort_values("claim_date", ascending=False).head(REVIEW_CASES_MAX)
     if q.empty:
         return
 
     # Keep latest reviews for realism
     q["claim_date"] = pd.to_datetime(q["claim_date"], errors="coerce")
-    q = q.dropna(subset=["claim_date"]).sort_values("claim_date", ascending=False).head(1500)
+    q = q.dropna(subset=["claim_date"]).sort_values("claim_date", ascending=False).head(REVIEW_CASES_MAX)
 
     now = pd.Timestamp.utcnow()
     status = rng.choice(["PENDING", "APPROVED", "DENIED"], size=len(q), p=[0.35, 0.45, 0.20])
@@ -293,7 +339,7 @@ def _simulate_review_cases(seed: int, review_sla_hours: int = 72):
     _write_csv(out, "review_cases.csv")
 
 
-def run(scenario: str, days: int, seed: int, control_rate: float):
+def run(scenario: str, days: int, seed: int, control_rate: float, daily_claims: int = 0):
     _ensure_out()
 
     p = _scenario_params(scenario)
@@ -361,8 +407,28 @@ def run(scenario: str, days: int, seed: int, control_rate: float):
         control_rate=control_rate,
         effect_per_claim=int(p["effect"]),
         review_threshold=float(CFG.review_threshold),
+        daily_claims=int(daily_claims),
     )
 
+    # Enriched ledger + segment cube for dashboard HTE views
+    try:
+        from src.enriched_ledger import main as enriched_main
+        enriched_main()
+    except Exception:
+        pass
+    try:
+        from src.segment_cube import main as cube_main
+        cube_main()
+    except Exception:
+        pass
+
+    # Daily savings rollup for dashboard KPIs
+    try:
+        from src.telemetry import main as rollup_main
+        rollup_main()
+    except Exception:
+        pass
+
     # Review processing telemetry (Ops)
     _simulate_review_cases(seed=seed + 2, review_sla_hours=int(getattr(CFG, "review_sla_hours", 72)))
 
@@ -399,10 +465,13 @@ def build_argparser():
     ap.add_argument("--scenario", default="GO", choices=["GO", "HOLD", "ROLLBACK"], help="Demo scenario")
     ap.add_argument("--days", type=int, default=60, help="Number of days in the timeseries")
     ap.add_argument("--seed", type=int, default=42, help="Random seed")
+    ap.add_argument("--daily-claims", type=int, default=0,
+                    help="Mean ledger rows per day (0 = demo size); large values for load tests")
     ap.add_argument("--control-rate", type=float, default=CFG.default_control_rate, help="Control group rate (0~1)")
     return ap
 
 
+@stage("simulate_production_outputs")
 def main():
     ap = build_argparser()
     args = ap.parse_args()
@@ -412,6 +481,7 @@ def main():
         days=max(7, int(args.days)),
         seed=int(args.seed),
         control_rate=float(args.control_rate),
+        daily_claims=max(0, int(args.daily_claims)),
     )
 
     print("✅ Simulated outputs generated:")
@@ -423,6 +493,9 @@ def main():
         "guardrails_decision.csv",
         "segment_alerts.csv",
         "decision_ledger.csv",
+        "decision_ledger_enriched.parquet",
+        "segment_cube.csv",
+        "saving_daily_rollup.csv",
         "executive_summary.md",
         "chart_impact_delta.png",
     ]:
@@ -0,0 +1,237 @@
+"""Persistent content-hash cache of pipeline stage outputs.
+
+A stage's key hashes its name/function/args, the code it runs (the stage
+module and every src module it imports, transitively), the config, the
+library versions and the content of its declared input files. After a
+successful run the declared outputs are stored as content-addressed blobs
+under CFG.stage_cache_dir; a later run with the same key restores them
+instead of running the stage. Entries are evicted least-recently-used once
+the blobs exceed CFG.stage_cache_mb.
+
+File hashes are remembered per (path, mtime, size) in file_hashes.json, so
+an unchanged multi-GB claims file is not re-read every run.
+"""
+
+from __future__ import annotations
+
+import ast
+import hashlib
+import json
+import os
+import shutil
+import sys
+from dataclasses import fields
+from datetime import datetime
+from importlib import metadata
+from typing import Dict, Optional
+
+from src.config import CFG
+from src.io_utils import atomic_path, file_stamp, write_json_atomic
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HASH_CHUNK = 1 << 20
+LIBS = ("numpy", "pandas", "scikit-learn", "scipy", "pyarrow")
+RUNNER_KEYS = ("artifact_cache_mb", "pipeline_memo_mb", "pipeline_workers", "stage_cache_dir", "stage_cache_mb")
+
+_CODE: Dict[str, str] = {}
+
+
+def _source(module: str) -> Optional[str]:
+    """Source file of a src module (None for names that are attributes, e.g. src.io_utils.read_csv)."""
+    base = os.path.join(ROOT, *module.split("."))
+    for path in (base + ".py", os.path.join(base, "__init__.py")):
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def _src_imports(path: str):
+    tree = ast.parse(open(path, "rb").read(), filename=path)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [a.name for a in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module] + [f"{node.module}.{a.name}" for a in node.names]
+        else:
+            continue
+        for n in names:
+            if n == "src" or n.startswith("src."):
+                yield n
+
+
+def code_hash(module: str) -> str:
+    """sha256 over the source of `module` and the src modules it imports (transitively)."""
+    if module in _CODE:
+        return _CODE[module]
+    seen, stack, files = set(), [module], {}
+    while stack:
+        m = stack.pop()
+        if m in seen:
+            continue
+        seen.add(m)
+        path = _source(m)
+        if path is None:
+            continue
+        files[m] = path
+        stack.extend(_src_imports(path))
+    h = hashlib.sha256()
+    for m in sorted(files):
+        h.update(m.encode())
+        h.update(open(files[m], "rb").read())
+    _CODE[module] = h.hexdigest()
+    return _CODE[module]
+
+
+def _env_hash() -> str:
+    cfg = {f.name: getattr(CFG, f.name) for f in fields(CFG) if f.name not in RUNNER_KEYS}
+    h = hashlib.sha256(json.dumps(cfg, sort_keys=True, default=str).encode())
+    h.update(sys.version.encode())
+    for lib in LIBS:
+        try:
+            h.update(f"{lib}={metadata.version(lib)}".encode())
+        except metadata.PackageNotFoundError:
+            pass
+    return h.hexdigest()
+
+
+def _atomic_copy(src: str, dst: str):
+    with atomic_path(dst) as tmp:
+        shutil.copyfile(src, tmp)
+
+
+class StageCache:
+    """Stage outputs keyed by code + config + input content, bounded by `max_mb`."""
+
+    def __init__(self, root: str = CFG.stage_cache_dir, max_mb: int = CFG.stage_cache_mb):
+        self.root = root
+        self.max_bytes = int(max_mb) * 1024 * 1024
+        self.entries = os.path.join(root, "entries")
+        self.blobs = os.path.join(root, "blobs")
+        self.index_path = os.path.join(root, "file_hashes.json")
+        os.makedirs(self.entries, exist_ok=True)
+        os.makedirs(self.blobs, exist_ok=True)
+        self._env = _env_hash()
+        try:
+            self._index = json.load(open(self.index_path, encoding="utf-8"))
+        except (OSError, ValueError):
+            self._index = {}
+        self._dirty = False
+
+    # -- hashing ---------------------------------------------------------
+    def file_hash(self, path: str) -> Optional[str]:
+        stamp = file_stamp(path)
+        if stamp is None:
+            return None
+        ap = os.path.abspath(path)
+        known = self._index.get(ap)
+        if known and tuple(known[:2]) == stamp:
+            return known[2]
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(HASH_CHUNK), b""):
+                h.update(block)
+        self._index[ap] = [stamp[0], stamp[1], h.hexdigest()]
+        self._dirty = True
+        return h.hexdigest()
+
+    def key(self, stage) -> str:
+        h = hashlib.sha256(self._env.encode())
+        h.update(json.dumps([stage.name, stage.module, stage.func, list(map(str, stage.args))]).encode())
+        h.update(code_hash(stage.module).encode())
+        for p in stage.inputs:
+            h.update(f"{p}={self.file_hash(p) or '-'}".encode())
+        return h.hexdigest()
+
+    def save_index(self):
+        """Merge this process's file hashes into file_hashes.json (workers share it)."""
+        if not self._dirty:
+            return
+        try:
+            disk = json.load(open(self.index_path, encoding="utf-8"))
+        except (OSError, ValueError):
+            disk = {}
+        disk.update(self._index)
+        write_json_atomic(disk, self.index_path, ensure_ascii=False)
+        self._dirty = False
+
+    # -- entries ---------------------------------------------------------
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.entries, f"{key}.json")
+
+    def _blob_path(self, h: str) -> str:
+        return os.path.join(self.blobs, h[:2], h)
+
+    def restore(self, stage, key: str) -> bool:
+        """Put the cached outputs for `key` in place; False on a miss."""
+        path = self._entry_path(key)
+        try:
+            entry = json.load(open(path, encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        outputs = entry.get("outputs", {})
+        if set(outputs) != set(stage.outputs) or not all(os.path.exists(self._blob_path(h)) for h in outputs.values()):
+            return False
+        for p, h in outputs.items():
+            if self.file_hash(p) != h:
+                _atomic_copy(self._blob_path(h), p)
+                self._index[os.path.abspath(p)] = [*file_stamp(p), h]
+                self._dirty = True
+        os.utime(path)  # LRU order
+        return True
+
+    def store(self, stage, key: str) -> bool:
+        """Record the stage's outputs under `key`; False when a declared output is missing."""
+        outputs = {}
+        for p in stage.outputs:
+            h = self.file_hash(p)
+            if h is None:
+                return False
+            blob = self._blob_path(h)
+            if not os.path.exists(blob):
+                _atomic_copy(p, blob)
+            outputs[p] = h
+        write_json_atomic({"stage": stage.name, "outputs": outputs,
+                           "created_at": datetime.now().isoformat(timespec="seconds")},
+                          self._entry_path(key), ensure_ascii=False)
+        return True
+
+    def evict(self) -> int:
+        """Drop least-recently-used entries (and unreferenced blobs) beyond max_bytes."""
+        entries = []
+        for name in os.listdir(self.entries):
+            p = os.path.join(self.entries, name)
+            try:
+                entries.append((os.path.getmtime(p), p, json.load(open(p, encoding="utf-8")).get("outputs", {})))
+            except (OSError, ValueError):
+                continue
+        entries.sort()
+        refs: Dict[str, int] = {}
+        for _, _, outs in entries:
+            for h in outs.values():
+                refs[h] = refs.get(h, 0) + 1
+
+        sizes, total = {}, 0
+        for sub in os.listdir(self.blobs):
+            d = os.path.join(self.blobs, sub)
+            for h in os.listdir(d) if os.path.isdir(d) else []:
+                p = os.path.join(d, h)
+                if h.startswith(".tmp-"):
+                    continue
+                if h not in refs:
+                    os.remove(p)  # orphan from an evicted/overwritten entry
+                    continue
+                sizes[h] = os.path.getsize(p)
+                total += sizes[h]
+
+        removed = 0
+        for _, p, outs in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(p)
+            removed += 1
+            for h in outs.values():
+                refs[h] -= 1
+                if refs[h] == 0 and h in sizes:
+                    os.remove(self._blob_path(h))
+                    total -= sizes.pop(h)
+        return removed
@@ -0,0 +1,168 @@
+"""Cold-start time of the CLI entry points and the dashboard.
+
+Every `python -m src.X` entry point is imported in a fresh interpreter
+(`python -c "import src.X"`): the fixed cost a cron invocation pays before
+main() does any work. The dashboard is measured through streamlit's AppTest:
+`dashboard` is its first paint (the script up to the FIRST_PAINT_MARK line,
+i.e. page setup and the header, which Streamlit sends before the rest runs)
+and `dashboard_full` a complete first render of app_exec_dashboard.py. Medians over --repeat runs
+are appended to out/startup_times.csv together with the heaviest top-level
+imports (from `python -X importtime`); entries slower than --budget seconds
+are flagged.
+
+  python -m src.startup_bench
+  python -m src.startup_bench --only guardrails,rollout_controller,dashboard --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import glob
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from src.benchmark import _git_rev
+from src.config import CFG
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_PATH = os.path.join(ROOT, CFG.out_dir, "startup_times.csv")
+DEFAULT_BUDGET_S = 1.0
+TOP_IMPORTS = 3
+MIN_IMPORT_US = 10_000  # ignore packages under 10 ms (site hooks etc.)
+
+RESULT_COLS = ["run_at", "git_rev", "entry", "median_s", "min_s", "repeat", "top_imports", "over_budget"]
+
+DASHBOARD = "dashboard"
+DASHBOARD_FULL = "dashboard_full"
+FIRST_PAINT_MARK = "# ---- first paint done"
+DASHBOARD_CODE = (
+    "import warnings; warnings.filterwarnings('ignore')\n"
+    "from streamlit.testing.v1 import AppTest\n"
+    "AppTest.from_file('app_exec_dashboard.py', default_timeout=300).run()\n"
+)
+STREAMLIT_FLOOR_CODE = (  # any app pays this: streamlit import plus the AppTest runtime
+    "import warnings; warnings.filterwarnings('ignore')\n"
+    "from streamlit.testing.v1 import AppTest\n"
+    "AppTest.from_string('import streamlit as st', default_timeout=300).run()\n"
+)
+DASHBOARD_PAINT_CODE = (
+    "import warnings; warnings.filterwarnings('ignore')\n"
+    "from streamlit.testing.v1 import AppTest\n"
+    f"src = open('app_exec_dashboard.py', encoding='utf-8').read().split({FIRST_PAINT_MARK!r})[0]\n"
+    "AppTest.from_string(src, default_timeout=300).run()\n"
+)
+IMPORTTIME_RE = re.compile(r"^import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)$")
+
+
+def entry_points() -> list:
+    """src modules runnable with `python -m` (they have a __main__ block)."""
+    names = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "src", "*.py"))):
+        if "__name__ == \"__main__\"" in open(path, encoding="utf-8").read():
+            names.append(os.path.splitext(os.path.basename(path))[0])
+    return names
+
+
+def _code(entry: str) -> str:
+    if entry == DASHBOARD:
+        return DASHBOARD_PAINT_CODE
+    return DASHBOARD_CODE if entry == DASHBOARD_FULL else f"import src.{entry}"
+
+
+def time_code(code: str, repeat: int) -> list:
+    """Wall seconds of `repeat` fresh interpreters running `code`."""
+    walls = []
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+        walls.append(time.perf_counter() - t0)
+        if proc.returncode != 0:
+            raise RuntimeError((proc.stderr.strip().splitlines() or [""])[-1])
+    return walls
+
+
+def _third_party(name: str) -> bool:
+    root = name.split(".")[0]
+    return root != "src" and root not in sys.stdlib_module_names and not root.startswith("_")
+
+
+def top_imports(code: str, n: int = TOP_IMPORTS) -> str:
+    """Heaviest third-party packages pulled in by `code`, e.g. 'pandas 0.62s; scipy 0.18s'.
+
+    Each package is charged the cumulative time of its outermost import, so
+    pandas importing numpy counts once, under pandas.
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                          capture_output=True, text=True)
+    lines = [m for m in map(IMPORTTIME_RE.match, proc.stderr.splitlines()) if m]
+    cost, stack = {}, []  # stack: (indent, third_party) of enclosing imports
+    for m in reversed(lines):  # importtime prints children before their parent
+        us, indent, name = int(m.group(1)), len(m.group(2)), m.group(3)
+        while stack and stack[-1][0] >= indent:
+            stack.pop()
+        tp = _third_party(name)
+        if tp and not any(t for _, t in stack):
+            root = name.split(".")[0]
+            cost[root] = cost.get(root, 0) + us
+        stack.append((indent, tp))
+    heavy = sorted(((k, v) for k, v in cost.items() if v >= MIN_IMPORT_US), key=lambda kv: -kv[1])[:n]
+    return "; ".join(f"{k} {v / 1e6:.2f}s" for k, v in heavy)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Measure cold-start time of the CLI entry points and the dashboard.")
+    ap.add_argument("--only", default="", help=f"Comma-separated entries (module names under src/, '{DASHBOARD}' or '{DASHBOARD_FULL}')")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--budget", type=float, default=DEFAULT_BUDGET_S, help="Flag entries slower than this (seconds)")
+    ap.add_argument("--fail-over-budget", action="store_true", help="Exit 1 when any entry is over budget")
+    args = ap.parse_args()
+
+    entries = entry_points() + [DASHBOARD, DASHBOARD_FULL]
+    if args.only:
+        want = [e.strip() for e in args.only.split(",") if e.strip()]
+        unknown = set(want) - set(entries)
+        if unknown:
+            raise SystemExit(f"Unknown entries: {sorted(unknown)}")
+        entries = want
+
+    run_at, rev = datetime.now().isoformat(timespec="seconds"), _git_rev()
+    base = statistics.median(time_code("pass", args.repeat))
+    print(f"python startup (bare): {base:.2f}s")
+    if DASHBOARD in entries or DASHBOARD_FULL in entries:
+        floor = statistics.median(time_code(STREAMLIT_FLOOR_CODE, args.repeat))
+        print(f"streamlit AppTest (empty app): {floor:.2f}s")
+    rows = []
+    for e in entries:
+        try:
+            walls = time_code(_code(e), args.repeat)
+        except RuntimeError as ex:
+            print(f"🟨 startup_bench: {e}: {ex}")
+            continue
+        med = statistics.median(walls)
+        over = med > args.budget
+        rows.append({"run_at": run_at, "git_rev": rev, "entry": e, "median_s": round(med, 3),
+                     "min_s": round(min(walls), 3), "repeat": len(walls), "top_imports": top_imports(_code(e)),
+                     "over_budget": over})
+        print(f"{'🟨' if over else '✅'} {e:<28} {med:6.2f}s  {rows[-1]['top_imports']}")
+
+    os.makedirs(os.path.dirname(RESULTS_PATH), exist_ok=True)
+    new = not os.path.exists(RESULTS_PATH)
+    with open(RESULTS_PATH, "a", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=RESULT_COLS, lineterminator="\n")
+        if new:
+            w.writeheader()
+        w.writerows(rows)
+    print("✅ appended", RESULTS_PATH, f"({len(rows)} rows)")
+
+    if args.fail_over_budget and any(r["over_budget"] for r in rows):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,26 @@
 import numpy as np
 import pandas as pd
-from scipy import stats
 from src.config import CFG
 from src.io_utils import read_csv, write_csv
+from src.instrument import stage
 
+def welch_ttest(a, b):
+    """(t, two-sided p) as scipy.stats.ttest_ind(a, b, equal_var=False).
+
+    Uses the Student t CDF from scipy.special: importing scipy.stats costs
+    about a second of startup for what is a few lines of arithmetic.
+    """
+    from scipy.special import stdtr
+
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    va, vb = a.var(ddof=1) / len(a), b.var(ddof=1) / len(b)
+    t = (a.mean() - b.mean()) / np.sqrt(va + vb)
+    df = (va + vb) ** 2 / (va ** 2 / (len(a) - 1) + vb ** 2 / (len(b) - 1))
+    return float(t), float(2 * stdtr(df, -abs(t)))
+
+@stage("stats_impact_scipy")
 def main():
-    led = read_csv("out/decision_ledger.csv")
+    led = read_csv("out/decision_ledger.csv", columns=["exp_group", CFG.paid_col])
     if led.empty or "exp_group" not in led.columns:
         print("🟨 stats_impact_scipy: missing ledger")
         return
@@ -18,13 +33,14 @@ def main():
         return
 
     effect = float(c.mean() - t.mean())
-    tstat, p = stats.ttest_ind(c, t, equal_var=False, nan_policy="omit")
+    tstat, p = welch_ttest(c, t)
 
     # CI using t distribution
     se = float(np.sqrt(c.var(ddof=1)/len(c) + t.var(ddof=1)/len(t)))
     df = float((c.var(ddof=1)/len(c) + t.var(ddof=1)/len(t))**2 / ((c.var(ddof=1)/len(c))**2/(len(c)-1) + (t.var(ddof=1)/len(t))**2/(len(t)-1)))
     alpha = 0.05
-    crit = stats.t.ppf(1-alpha/2, df)
+    from scipy.special import stdtrit
+    crit = stdtrit(df, 1-alpha/2)  # stats.t.ppf
     ci_lo, ci_hi = effect - crit*se, effect + crit*se
 
     out = pd.DataFrame([{
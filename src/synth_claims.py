@@ -0,0 +1,249 @@
+"""Seeded synthetic claims generator with the data/claims.csv schema.
+
+The bundled 6,000-row sample is profiled once and then resampled at any size:
+
+- rows are bootstrapped from the sample, so categorical mixes, the label rate
+  and the joint feature/label structure follow the sample;
+- continuous numerics get multiplicative jitter, clipped to the sample range
+  and to the column orderings the sample always satisfies (e.g.
+  paid_amount <= claim_amount);
+- id columns are re-keyed: unique ids (claim_id, claim_rcpt_no) become
+  sequential, per-customer entities (customer_id, plcy_no) keep their
+  distinct-per-row ratio with functional dependencies preserved
+  (plcy_no -> customer_id), reference entities (hospital_id, agent_id) keep
+  the sample's pool;
+- claim_date is spread uniformly over the sample's date range (or --days).
+
+Chunks are generated in parallel worker processes with per-chunk seeds, so the
+output is identical for any --workers. Output is CSV or Parquet by extension.
+
+  python -m src.synth_claims --rows 10000000 --out data/claims_10m.csv
+  python -m src.synth_claims --rows 200000000 --out data/claims_200m.parquet --workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pac
+import pyarrow.parquet as pq
+
+from src.config import CFG
+from src.instrument import add_io, span, stage
+from src.io_utils import csv_bytes
+
+ID_RE = re.compile(r"^([A-Za-z]+)(\d+)$")
+ID_MIN_DISTINCT = 50       # fewer distinct codes (e.g. ICD) are plain categoricals
+ID_SCALE_RATIO = 0.3       # distinct/rows at or above this: entity pool grows with rows
+CONTINUOUS_MIN_DISTINCT = 50
+JITTER_SIGMA = 0.08
+CHUNK_ROWS = 1_000_000
+
+
+def _id_format(s: pd.Series):
+    """(prefix, digits) when every value looks like PREFIX0000123, else None."""
+    m = s.dropna().astype(str).str.extract(ID_RE)
+    if m.isna().any().any() or m[0].nunique() != 1:
+        return None
+    return m[0].iloc[0], int(m[1].str.len().max())
+
+
+def _is_fd(df: pd.DataFrame, a: str, b: str) -> bool:
+    return bool((df.groupby(a)[b].nunique(dropna=False) <= 1).all())
+
+
+def fit_profile(sample: pd.DataFrame) -> dict:
+    """Column roles, id formats/cardinalities and constraints fitted from the sample."""
+    n = len(sample)
+    ids, continuous = {}, {}
+    for c in sample.columns:
+        s = sample[c]
+        if s.dtype == object:
+            fmt = _id_format(s) if s.nunique() >= ID_MIN_DISTINCT else None
+            if fmt is not None:
+                ratio = s.nunique() / max(n, 1)
+                role = "unique" if ratio >= 1.0 else ("scaled" if ratio >= ID_SCALE_RATIO else "pool")
+                ids[c] = {"prefix": fmt[0], "digits": fmt[1], "ratio": ratio, "role": role}
+        elif s.nunique() >= CONTINUOUS_MIN_DISTINCT:
+            v = pd.to_numeric(s, errors="coerce")
+            continuous[c] = {"min": float(v.min()), "max": float(v.max()),
+                             "integer": bool(pd.api.types.is_integer_dtype(s))}
+
+    # scaled ids derived from another scaled id (plcy_no -> customer_id)
+    scaled = [c for c, p in ids.items() if p["role"] == "scaled"]
+    for b in scaled:
+        parents = [a for a in scaled if a != b and ids[a]["ratio"] > ids[b]["ratio"] and _is_fd(sample, a, b)]
+        if parents:
+            ids[b]["parent"] = max(parents, key=lambda a: ids[a]["ratio"])
+
+    cols = list(continuous)
+    le = [(a, b) for a in cols for b in cols if a != b and (sample[a] <= sample[b]).all()]
+
+    dates = pd.to_datetime(sample["claim_date"], errors="coerce") if "claim_date" in sample.columns else pd.Series(dtype="datetime64[ns]")
+    return {
+        "columns": list(sample.columns),
+        "ids": ids,
+        "continuous": continuous,
+        "less_equal": le,
+        "date_min": dates.min().date().isoformat() if dates.notna().any() else None,
+        "date_max": dates.max().date().isoformat() if dates.notna().any() else None,
+    }
+
+
+def _pool_size(distinct: float, draws: int) -> int:
+    """Pool size m whose uniform `draws` hit `distinct` values on average: m(1-e^{-n/m}) = d."""
+    if distinct >= draws:
+        return max(1, int(draws))
+    lo, hi = distinct, distinct * 64.0
+    for _ in range(60):
+        m = (lo + hi) / 2
+        if m * (1 - np.exp(-draws / m)) < distinct:
+            lo = m
+        else:
+            hi = m
+    return max(1, int(round(hi)))
+
+
+def _format_ids(prefix: str, digits: int, values: np.ndarray) -> pa.Array:
+    padded = pac.utf8_lpad(pac.cast(pa.array(values), pa.string()), width=digits, padding="0")
+    return pac.binary_join_element_wise(prefix, padded, "")
+
+
+def generate_chunk(sample: pa.Table, profile: dict, start: int, n: int, total: int,
+                   seed_seq: np.random.SeedSequence, days: int = 0) -> pa.Table:
+    """Rows [start, start+n) of a `total`-row synthetic claims table."""
+    rng = np.random.default_rng(seed_seq)
+    boot = sample.take(rng.integers(0, sample.num_rows, size=n))
+    cols = {c: boot.column(c) for c in boot.column_names}
+
+    cont = {}
+    for c, p in profile["continuous"].items():
+        v = cols[c].to_numpy().astype(float) * np.exp(rng.normal(0, JITTER_SIGMA, size=n))
+        cont[c] = np.clip(v, p["min"], p["max"])
+    for a, b in profile["less_equal"]:
+        cont[a] = np.minimum(cont[a], cont[b])
+    for c, p in profile["continuous"].items():
+        cols[c] = pa.array(np.round(cont[c]).astype(np.int64) if p["integer"] else np.round(cont[c], 1))
+
+    row = np.arange(start, start + n, dtype=np.int64)
+    pools, draws = {}, {}
+    for c, p in profile["ids"].items():
+        if p["role"] == "unique":
+            cols[c] = _format_ids(p["prefix"], p["digits"], row + 1)
+        elif p["role"] == "scaled":
+            pools[c] = _pool_size(p["ratio"] * total, total)
+    for c in pools:
+        if "parent" not in profile["ids"][c]:
+            draws[c] = rng.integers(0, pools[c], size=n)
+    for c in pools:
+        parent = profile["ids"][c].get("parent")
+        if parent is not None:
+            draws[c] = draws[parent] * pools[c] // pools[parent]
+    for c, idx in draws.items():
+        p = profile["ids"][c]
+        cols[c] = _format_ids(p["prefix"], p["digits"], idx + 1)
+
+    if profile["date_min"] and "claim_date" in cols:
+        end = pd.Timestamp(profile["date_max"])
+        first = end - timedelta(days=days - 1) if days > 0 else pd.Timestamp(profile["date_min"])
+        labels = pa.array(pd.date_range(first, end, freq="D").strftime("%Y-%m-%d").tolist())
+        cols["claim_date"] = labels.take(rng.integers(0, len(labels), size=n))
+    return pa.table([cols[c] for c in profile["columns"]], names=profile["columns"])
+
+
+# Worker-side state: the sample/profile are shipped once per process.
+_WORKER = {}
+
+
+def _init_worker(sample: pa.Table, profile: dict, total: int, days: int, fmt: str):
+    _WORKER.update(sample=sample, profile=profile, total=total, days=days, fmt=fmt)
+
+
+def _work(task):
+    """One chunk as CSV bytes (header only on the first) or an Arrow table."""
+    k, start, n, seed_seq = task
+    w = _WORKER
+    table = generate_chunk(w["sample"], w["profile"], start, n, w["total"], seed_seq, w["days"])
+    if w["fmt"] == "parquet":
+        return table
+    return csv_bytes(table, header=(k == 0))
+
+
+def generate(out_path: str, rows: int, seed: int = 42, sample_path: str = CFG.data_claims,
+             chunk_rows: int = CHUNK_ROWS, workers: int = 1, days: int = 0) -> int:
+    """Write `rows` synthetic claims to `out_path` (.csv or .parquet)."""
+    sample = pd.read_csv(sample_path)
+    profile = fit_profile(sample)
+    fmt = "parquet" if out_path.endswith(".parquet") else "csv"
+    n_chunks = max(1, -(-rows // chunk_rows))
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    tasks = [(k, k * chunk_rows, min(chunk_rows, rows - k * chunk_rows), seeds[k]) for k in range(n_chunks)]
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+
+    init = (pa.Table.from_pandas(sample, preserve_index=False), profile, rows, days, fmt)
+    workers = max(1, int(workers))
+    with span("generate", rows=rows, workers=workers, fmt=fmt):
+        if workers == 1:
+            _init_worker(*init)
+            _write_parts(out_path, fmt, map(_work, tasks))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init) as ex:
+                _write_parts(out_path, fmt, _ordered(ex, tasks, window=2 * workers))
+        add_io(rows_out=rows, bytes_written=os.path.getsize(out_path))
+    return rows
+
+
+def _ordered(ex, tasks, window: int):
+    """Results in task order with at most `window` chunks in flight (flat parent memory)."""
+    pending = []
+    for t in tasks:
+        pending.append(ex.submit(_work, t))
+        if len(pending) >= window:
+            yield pending.pop(0).result()
+    while pending:
+        yield pending.pop(0).result()
+
+
+def _write_parts(out_path: str, fmt: str, parts):
+    if fmt == "parquet":
+        writer = None
+        try:
+            for table in parts:
+                if writer is None:
+                    writer = pq.ParquetWriter(out_path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        return
+    with open(out_path, "wb") as f:
+        for blob in parts:
+            f.write(blob)
+
+
+@stage("synth_claims")
+def main():
+    ap = argparse.ArgumentParser(description="Generate synthetic claims with the data/claims.csv schema.")
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--out", default="data/claims_synth.csv", help=".csv or .parquet")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--sample", default=CFG.data_claims, help="Sample the profile is fitted from")
+    ap.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--days", type=int, default=0, help="Spread claim_date over N days (0 = sample range)")
+    args = ap.parse_args()
+
+    n = generate(args.out, rows=max(1, args.rows), seed=args.seed, sample_path=args.sample,
+                 chunk_rows=max(1, args.chunk_rows), workers=args.workers, days=max(0, args.days))
+    print("✅ wrote", args.out, f"({n:,} rows)")
+
+
+if __name__ == "__main__":
+    main()
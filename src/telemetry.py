@@ -11,12 +11,19 @@ Design goals (big-tech style):
 
 from __future__ import annotations
 
+import os
 from dataclasses import dataclass
 from typing import Optional, Tuple
 
 import numpy as np
 import pandas as pd
 
+from src.config import CFG
+from src.io_utils import read_csv, write_csv
+from src.instrument import stage
+from src.ledger_store import load_ledger
+from src.schemas import eq_upper
+
 
 @dataclass(frozen=True)
 class SavingKPI:
@@ -52,44 +59,149 @@ def _safe_float(x) -> Optional[float]:
         return None
 
 
-def compute_savings_from_timeseries(ts: pd.DataFrame) -> Tuple[Optional[pd.Timestamp], Optional[float], Optional[float], Optional[float]]:
-    """Compute Today/MTD/QTD from out/impact_monthly_timeseries.csv.
+ROLLUP_PATH = os.path.join(CFG.out_dir, "saving_daily_rollup.csv")
+TIMESERIES_PATH = os.path.join(CFG.out_dir, "impact_monthly_timeseries.csv")
+LEDGER_PATH = os.path.join(CFG.out_dir, "decision_ledger.csv")
 
-    Expected columns:
-      - date (YYYY-MM-DD)
-      - saving_est_krw (numeric)
+ROLLUP_COLS = ["saving_est_krw", "ts_rows", "ledger_rows", "treatment_n"]
 
-    Returns: (asof_date, today, mtd, qtd)
+
+def build_daily_rollup(ts: Optional[pd.DataFrame] = None, ledger: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """Build a contiguous daily rollup with inclusive prefix sums.
+
+    One row per calendar day between the first and last observed date:
+      - saving_est_krw / ts_rows : timeseries totals and valid row count
+      - ledger_rows / treatment_n : ledger row count and TREATMENT count
+      - <col>_cum                 : inclusive prefix sum of each column
+
+    Any period total is then `cum[hi] - cum[lo - 1]`, so KPI queries never
+    rescan the underlying timeseries or ledger.
     """
-    if ts is None or ts.empty:
-        return (None, None, None, None)
+    parts = []
+
+    if ts is not None and not ts.empty and "date" in ts.columns and "saving_est_krw" in ts.columns:
+        d = pd.to_datetime(ts["date"], errors="coerce").dt.normalize()
+        v = pd.to_numeric(ts["saving_est_krw"], errors="coerce")
+        ok = d.notna() & v.notna()
+        if ok.any():
+            g = pd.DataFrame({"date": d[ok], "saving_est_krw": v[ok].astype(float), "ts_rows": 1})
+            parts.append(g.groupby("date").sum())
+
+    if ledger is not None and not ledger.empty:
+        dcol = "claim_date" if "claim_date" in ledger.columns else ("date" if "date" in ledger.columns else None)
+        gcol = "exp_group" if "exp_group" in ledger.columns else ("group" if "group" in ledger.columns else None)
+        if dcol is not None:
+            d = pd.to_datetime(ledger[dcol], errors="coerce").dt.normalize()
+            ok = d.notna()
+            if ok.any():
+                g = pd.DataFrame({"date": d[ok], "ledger_rows": 1})
+                # NaN marks "no exp_group column" so the ledger fallback can report None.
+                g["treatment_n"] = eq_upper(ledger.loc[ok, gcol], "TREATMENT").astype(float) if gcol else np.nan
+                parts.append(g.groupby("date").sum(min_count=1))
+
+    if not parts:
+        return pd.DataFrame(columns=["date"] + ROLLUP_COLS + [f"{c}_cum" for c in ROLLUP_COLS])
+
+    r = pd.concat(parts, axis=1)
+    days = pd.date_range(r.index.min(), r.index.max(), freq="D")
+    r = r.reindex(days)
+    for c in ROLLUP_COLS:
+        if c not in r.columns:
+            r[c] = 0.0
+    has_treatment = "treatment_n" in r.columns and r["treatment_n"].notna().any()
+    r[ROLLUP_COLS] = r[ROLLUP_COLS].fillna(0.0)
+    if not has_treatment:
+        r["treatment_n"] = np.nan
+    for c in ROLLUP_COLS:
+        r[f"{c}_cum"] = r[c].cumsum()
+    r.index.name = "date"
+    return r.reset_index()
+
+
+def read_daily_rollup(path: str = ROLLUP_PATH) -> pd.DataFrame:
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    r = pd.read_csv(path)
+    r["date"] = pd.to_datetime(r["date"], errors="coerce")
+    return r
+
+
+class _Rollup:
+    """O(1)/O(log n) lookups over a contiguous daily rollup."""
+
+    def __init__(self, rollup: pd.DataFrame):
+        self.n = len(rollup)
+        self.start = pd.Timestamp(rollup["date"].iloc[0]).normalize() if self.n else None
+        self.cols = {c: rollup[c].to_numpy(dtype=float) for c in rollup.columns if c != "date"}
+
+    def pos(self, day: pd.Timestamp) -> int:
+        return int((day - self.start).days)
+
+    def day(self, pos: int) -> pd.Timestamp:
+        return self.start + pd.Timedelta(days=int(pos))
+
+    def clamp(self, start: Optional[pd.Timestamp], end: Optional[pd.Timestamp]) -> Tuple[int, int]:
+        lo = 0 if start is None else max(0, self.pos(pd.Timestamp(start).normalize()))
+        hi = self.n - 1 if end is None else min(self.n - 1, self.pos(pd.Timestamp(end).normalize()))
+        return lo, hi
+
+    def total(self, col: str, lo: int, hi: int) -> float:
+        if hi < lo:
+            return 0.0
+        cum = self.cols[f"{col}_cum"]
+        return float(cum[hi] - (cum[lo - 1] if lo > 0 else 0.0))
+
+    def last_active(self, rows_col: str, lo: int, hi: int) -> Optional[int]:
+        """Last position in [lo, hi] with rows_col > 0 (binary search on the prefix sum)."""
+        if hi < lo or self.total(rows_col, lo, hi) <= 0:
+            return None
+        cum = self.cols[f"{rows_col}_cum"]
+        return int(np.searchsorted(cum, cum[hi], side="left"))
 
-    if "date" not in ts.columns or "saving_est_krw" not in ts.columns:
-        return (None, None, None, None)
 
-    df = ts.copy()
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df["saving_est_krw"] = pd.to_numeric(df["saving_est_krw"], errors="coerce")
-    df = df.dropna(subset=["date", "saving_est_krw"]).sort_values("date")
-    if df.empty:
+def _period_starts(asof: pd.Timestamp) -> Tuple[pd.Timestamp, pd.Timestamp]:
+    q = (asof.month - 1) // 3 + 1
+    q_start_month = 1 + 3 * (q - 1)
+    return asof.replace(day=1), asof.replace(month=q_start_month, day=1)
+
+
+def _savings_from_rollup(r: _Rollup, source: str, effect_per_claim: Optional[float] = None,
+                         start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None):
+    """Today/MTD/QTD from one rollup source ("ts" or "ledger") within [start, end]."""
+    if r.n == 0:
         return (None, None, None, None)
+    lo, hi = r.clamp(start, end)
+    rows_col = "ts_rows" if source == "ts" else "ledger_rows"
+    a = r.last_active(rows_col, lo, hi)
+    if a is None:
+        return (None, None, None, None)
+    asof = r.day(a)
+    m_start, q_start = _period_starts(asof)
+    m_lo = max(lo, r.pos(m_start))
+    q_lo = max(lo, r.pos(q_start))
 
-    asof = df["date"].max().normalize()
+    if source == "ts":
+        return (asof, r.total("saving_est_krw", a, a), r.total("saving_est_krw", m_lo, a), r.total("saving_est_krw", q_lo, a))
 
-    # TODAY
-    today_val = float(df.loc[df["date"].dt.normalize() == asof, "saving_est_krw"].sum())
+    eff = _safe_float(effect_per_claim)
+    if np.isnan(r.cols["treatment_n_cum"][-1]):
+        return (None, None, None, None)
+    n_today = r.total("treatment_n", a, a)
+    n_mtd = r.total("treatment_n", m_lo, a)
+    n_qtd = r.total("treatment_n", q_lo, a)
+    return (asof, eff * n_today, eff * n_mtd, eff * n_qtd)
 
-    # MTD
-    m_start = asof.replace(day=1)
-    mtd_val = float(df.loc[(df["date"] >= m_start) & (df["date"] < asof + pd.Timedelta(days=1)), "saving_est_krw"].sum())
 
-    # QTD
-    q = (asof.month - 1) // 3 + 1
-    q_start_month = 1 + 3 * (q - 1)
-    q_start = asof.replace(month=q_start_month, day=1)
-    qtd_val = float(df.loc[(df["date"] >= q_start) & (df["date"] < asof + pd.Timedelta(days=1)), "saving_est_krw"].sum())
+def compute_savings_from_timeseries(ts: pd.DataFrame) -> Tuple[Optional[pd.Timestamp], Optional[float], Optional[float], Optional[float]]:
+    """Compute Today/MTD/QTD from out/impact_monthly_timeseries.csv.
+
+    Expected columns:
+      - date (YYYY-MM-DD)
+      - saving_est_krw (numeric)
 
-    return (asof, today_val, mtd_val, qtd_val)
+    Returns: (asof_date, today, mtd, qtd)
+    """
+    return _savings_from_rollup(_Rollup(build_daily_rollup(ts=ts)), "ts")
 
 
 def compute_savings_from_ledger(effect_per_claim: float, ledger: pd.DataFrame) -> Tuple[Optional[pd.Timestamp], Optional[float], Optional[float], Optional[float]]:
@@ -104,50 +216,9 @@ def compute_savings_from_ledger(effect_per_claim: float, ledger: pd.DataFrame) -
 
     Returns: (asof_date, today, mtd, qtd)
     """
-    eff = _safe_float(effect_per_claim)
-    if eff is None:
+    if _safe_float(effect_per_claim) is None:
         return (None, None, None, None)
-
-    if ledger is None or ledger.empty:
-        return (None, None, None, None)
-
-    # tolerant aliasing
-    df = ledger.copy()
-    if "claim_date" not in df.columns and "date" in df.columns:
-        df["claim_date"] = df["date"]
-    if "exp_group" not in df.columns and "group" in df.columns:
-        df["exp_group"] = df["group"]
-
-    if "claim_date" not in df.columns or "exp_group" not in df.columns:
-        return (None, None, None, None)
-
-    df["claim_date"] = pd.to_datetime(df["claim_date"], errors="coerce")
-    df = df.dropna(subset=["claim_date"])
-    if df.empty:
-        return (None, None, None, None)
-
-    asof = df["claim_date"].max().normalize()
-    t = df[df["exp_group"].astype(str).str.upper().eq("TREATMENT")]
-    if t.empty:
-        return (asof, 0.0, 0.0, 0.0)
-
-    # TODAY
-    n_today = (t["claim_date"].dt.normalize() == asof).sum()
-    saving_today = eff * float(n_today)
-
-    # MTD
-    m_start = asof.replace(day=1)
-    n_mtd = ((t["claim_date"] >= m_start) & (t["claim_date"] < asof + pd.Timedelta(days=1))).sum()
-    saving_mtd = eff * float(n_mtd)
-
-    # QTD
-    q = (asof.month - 1) // 3 + 1
-    q_start_month = 1 + 3 * (q - 1)
-    q_start = asof.replace(month=q_start_month, day=1)
-    n_qtd = ((t["claim_date"] >= q_start) & (t["claim_date"] < asof + pd.Timedelta(days=1))).sum()
-    saving_qtd = eff * float(n_qtd)
-
-    return (asof, saving_today, saving_mtd, saving_qtd)
+    return _savings_from_rollup(_Rollup(build_daily_rollup(ledger=ledger)), "ledger", effect_per_claim)
 
 
 def compute_saving_kpis(
@@ -156,31 +227,41 @@ def compute_saving_kpis(
     ledger: Optional[pd.DataFrame],
     target_mtd: float,
     target_qtd: float,
+    rollup: Optional[pd.DataFrame] = None,
+    start: Optional[pd.Timestamp] = None,
+    end: Optional[pd.Timestamp] = None,
 ) -> SavingKPI:
-    """Compute a full KPI bundle, preferring timeseries then ledger."""
+    """Compute a full KPI bundle, preferring timeseries then ledger.
 
-    asof, today, mtd, qtd = compute_savings_from_timeseries(ts if ts is not None else pd.DataFrame())
+    `rollup` (see build_daily_rollup) is used as-is when given; otherwise it is
+    built from `ts`/`ledger`. `start`/`end` bound the report window (inclusive
+    days), so any as-of date or month is answered with index lookups.
+    """
+    if rollup is None:
+        rollup = build_daily_rollup(ts=ts, ledger=ledger)
+    r = _Rollup(rollup)
+
+    asof, today, mtd, qtd = _savings_from_rollup(r, "ts", start=start, end=end)
+    from_ts = asof is not None
 
-    if asof is None:
-        asof, today, mtd, qtd = compute_savings_from_ledger(effect_per_claim or np.nan, ledger if ledger is not None else pd.DataFrame())
+    eff = effect_per_claim or np.nan
+    if asof is None and _safe_float(eff) is not None:
+        asof, today, mtd, qtd = _savings_from_rollup(r, "ledger", eff, start=start, end=end)
 
     dod_pct = None
     ma7 = None
 
-    if ts is not None and (asof is not None) and (not ts.empty) and ("date" in ts.columns) and ("saving_est_krw" in ts.columns):
-        df = ts.copy()
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
-        df["saving_est_krw"] = pd.to_numeric(df["saving_est_krw"], errors="coerce")
-        df = df.dropna(subset=["date", "saving_est_krw"]).sort_values("date")
-
-        prev = asof - pd.Timedelta(days=1)
-        prev_val = float(df.loc[df["date"].dt.normalize() == prev, "saving_est_krw"].sum())
+    if from_ts:
+        lo, _ = r.clamp(start, end)
+        a = r.pos(asof)
+        prev_val = r.total("saving_est_krw", max(lo, a - 1), a - 1)
         if prev_val > 0 and today is not None:
             dod_pct = (float(today) - prev_val) / prev_val
 
-        last7 = df[df["date"] >= (asof - pd.Timedelta(days=6))]
-        if len(last7):
-            ma7 = float(last7["saving_est_krw"].mean())
+        w_lo = max(lo, a - 6)
+        n7 = r.total("ts_rows", w_lo, a)
+        if n7 > 0:
+            ma7 = r.total("saving_est_krw", w_lo, a) / n7
 
     mtd_progress = None
     qtd_progress = None
@@ -241,23 +322,20 @@ def compute_ops_kpis(ledger: Optional[pd.DataFrame]) -> OpsKPI:
     # observed control rate (full window)
     control_rate = None
     if "exp_group" in df.columns:
-        g = df["exp_group"].astype(str).str.upper()
-        if len(g):
-            control_rate = float((g == "CONTROL").mean())
+        if len(df):
+            control_rate = float(eq_upper(df["exp_group"], "CONTROL").mean())
 
     # today treatment share
     treat_rate = None
     if "exp_group" in d0.columns:
-        g0 = d0["exp_group"].astype(str).str.upper()
-        if len(g0):
-            treat_rate = float((g0 == "TREATMENT").mean())
+        if len(d0):
+            treat_rate = float(eq_upper(d0["exp_group"], "TREATMENT").mean())
 
     # today review rate
     review_rate = None
     if "decision" in d0.columns:
-        dec = d0["decision"].astype(str).str.upper()
-        if len(dec):
-            review_rate = float((dec == "REVIEW").mean())
+        if len(d0):
+            review_rate = float(eq_upper(d0["decision"], "REVIEW").mean())
 
     # today avg score
     avg_score = None
@@ -267,3 +345,20 @@ def compute_ops_kpis(ledger: Optional[pd.DataFrame]) -> OpsKPI:
             avg_score = float(s.mean())
 
     return OpsKPI(asof, n, treat_rate, review_rate, avg_score, control_rate)
+
+
+@stage("telemetry")
+def main():
+    ts = read_csv(TIMESERIES_PATH)
+    ledger = load_ledger(columns=["claim_date", "date", "exp_group", "group"])
+    rollup = build_daily_rollup(ts=ts, ledger=ledger)
+    if rollup.empty:
+        print("🟨 telemetry: no dated timeseries/ledger rows")
+        return
+    rollup["date"] = rollup["date"].dt.strftime("%Y-%m-%d")
+    write_csv(rollup, ROLLUP_PATH)
+    print("✅ wrote", ROLLUP_PATH)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,11 +9,14 @@ from sklearn.pipeline import Pipeline
 
 from src.config import CFG
 from src.io_utils import ensure_dirs, read_csv
+from src.label_store import with_labels
 from src.features import build_preprocessor
+from src.instrument import span, stage
 
+@stage("train")
 def main():
     ensure_dirs(CFG.model_dir, CFG.out_dir)
-    df = read_csv(CFG.data_claims)
+    df = with_labels(read_csv(CFG.data_claims))
     if df.empty:
         raise SystemExit("Missing claims dataset")
 
@@ -37,9 +40,11 @@ def main():
         pipe = Pipeline([("pre", pre2), ("clf", clf)])
 
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y if y.sum()>10 else None)
-    pipe.fit(X_train, y_train)
+    with span("fit", rows=len(X_train)):
+        pipe.fit(X_train, y_train)
 
-    p = pipe.predict_proba(X_test)[:,1]
+    with span("predict_proba", rows=len(X_test)):
+        p = pipe.predict_proba(X_test)[:,1]
     auc = roc_auc_score(y_test, p) if len(np.unique(y_test))>1 else float("nan")
     ap = average_precision_score(y_test, p) if len(np.unique(y_test))>1 else float("nan")
 
@@ -1,11 +1,21 @@
 import pandas as pd
 from src.config import CFG
-from src.io_utils import read_csv, write_csv
+from src.io_utils import file_stamp, read_csv
+from src.instrument import stage
+from src.label_store import COMPACT_ROWS, DELTA_PATH, compact, delta_rows, load_state, upsert
 
+@stage("update_labels")
 def main():
-    claims = read_csv(CFG.data_claims)
+    stamp = file_stamp(CFG.data_labels_feedback)
+    if stamp is None or file_stamp(CFG.data_claims) is None:
+        print("🟨 skip update_labels: missing data")
+        return
+    if load_state().get("feedback") == list(stamp):
+        print("🟨 update_labels: feedback unchanged since the last refresh")
+        return
+
     fb = read_csv(CFG.data_labels_feedback)
-    if claims.empty or fb.empty:
+    if fb.empty:
         print("🟨 skip update_labels: missing data")
         return
 
@@ -14,18 +24,14 @@ def main():
         return
 
     fb = fb[[CFG.id_col, "label"]].dropna()
-    fb["label"] = pd.to_numeric(fb["label"], errors="coerce").fillna(0).astype(int)
-
-    out = claims.merge(fb, on=CFG.id_col, how="left", suffixes=("", "_fb"))
-    if CFG.label_col in out.columns:
-        # prefer feedback if present
-        out[CFG.label_col] = out["label_fb"].where(out["label_fb"].notna(), out[CFG.label_col] if CFG.label_col in claims.columns else 0)
-    else:
-        out[CFG.label_col] = out["label_fb"].fillna(0)
+    fb[CFG.label_col] = pd.to_numeric(fb.pop("label"), errors="coerce").fillna(0).astype(int)
 
-    out = out.drop(columns=[c for c in ["label_fb"] if c in out.columns])
-    write_csv(out, CFG.data_claims)
-    print("✅ labels updated into", CFG.data_claims)
+    # only labels that differ from the current ones are appended; data/claims.csv is left as is
+    n = upsert(fb, feedback=stamp)
+    print(f"✅ {n} labels changed → {DELTA_PATH}")
+    if delta_rows() >= COMPACT_ROWS:
+        compact()
+        print("✅ label delta compacted into", CFG.data_claims)
 
 if __name__ == "__main__":
     main()
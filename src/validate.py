@@ -1,7 +1,9 @@
 import pandas as pd
 from src.config import CFG
 from src.io_utils import read_csv
+from src.instrument import stage
 
+@stage("validate")
 def main():
     df = read_csv(CFG.data_claims)
     if df.empty:
@@ -0,0 +1,108 @@
+import csv
+import socketserver
+import threading
+from email import message_from_bytes
+
+import pytest
+
+from src import emailer
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib: EHLO/MAIL/RCPT/DATA/RSET/NOOP/QUIT, no TLS or AUTH."""
+
+    def reply(self, line: str):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        srv = self.server
+        with srv.lock:
+            srv.connections += 1
+        self.reply("220 localhost test smtp")
+        rcpts = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            cmd = line.decode().strip()
+            verb = cmd.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self.reply("250 localhost")
+            elif verb == "MAIL":
+                rcpts = []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                addr = cmd.split(":", 1)[1].strip().strip("<>")
+                if addr in srv.refuse:
+                    self.reply("550 no such user")
+                else:
+                    rcpts.append(addr)
+                    self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 end with .")
+                data = b""
+                while True:
+                    chunk = self.rfile.readline()
+                    if chunk in (b".\r\n", b""):
+                        break
+                    data += chunk
+                msg = message_from_bytes(data)
+                with srv.lock:
+                    busy = srv.busy.get(msg["Subject"], 0)
+                    if busy:
+                        srv.busy[msg["Subject"]] = busy - 1
+                    else:
+                        srv.messages.append((rcpts, msg))
+                self.reply("451 try again later" if busy else "250 queued")
+            elif verb in ("RSET", "NOOP"):
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("502 not implemented")
+
+
+@pytest.fixture
+def smtp_server():
+    srv = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _Handler)
+    srv.daemon_threads = True
+    srv.lock, srv.connections, srv.messages = threading.Lock(), 0, []
+    srv.busy, srv.refuse = {}, set()
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_bulk_send_pools_retries_and_logs(workdir, smtp_server):
+    smtp_server.busy["report 2"] = 1  # one temporary failure, then accepted
+    smtp_server.refuse.add("nobody@example.com")
+    (workdir / "onepager.pdf").write_bytes(b"%PDF-1.4 test")
+
+    settings = emailer.SMTPSettings(host="127.0.0.1", port=smtp_server.server_address[1], starttls=False,
+                                    timeout=5)
+    jobs = [emailer.MailJob(to=[f"user{i}@example.com"], subject=f"report {i}", html_body="<p>hi</p>",
+                            attachments=["onepager.pdf"] if i == 0 else []) for i in range(6)]
+    jobs.append(emailer.MailJob(to=["nobody@example.com"], subject="report x", html_body="<p>hi</p>"))
+    log = emailer.SendLog(str(workdir / "out" / "email_send_log.csv"))
+
+    results = emailer.send_bulk(jobs, settings, mail_from="fds@example.com", max_connections=2, backoff_s=0,
+                                log=log)
+
+    assert [r["status"] for r in results] == ["OK"] * 6 + ["FAIL"]
+    assert [r["attempts"] for r in results] == [1, 1, 2, 1, 1, 1, 1]  # refusals are not retried
+    assert sorted(m["Subject"] for _, m in smtp_server.messages) == [f"report {i}" for i in range(6)]
+    # two pooled sessions, each replaced once after its failed transaction at most
+    assert smtp_server.connections <= 4
+
+    first = next(m for _, m in smtp_server.messages if m["Subject"] == "report 0")
+    names = [p.get_filename() for p in first.walk() if p.get_filename()]
+    assert names == ["onepager.pdf"]
+
+    with open(log.path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == emailer.LOG_COLUMNS
+    assert sorted(r["status"] for r in rows) == ["FAIL", "OK", "OK", "OK", "OK", "OK", "OK", "RETRY"]
+    retry = next(r for r in rows if r["status"] == "RETRY")
+    assert retry["subject"] == "report 2" and retry["attempt"] == "1" and "451" in retry["message"]
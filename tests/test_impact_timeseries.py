@@ -0,0 +1,37 @@
+import os
+
+import pandas as pd
+
+from src import impact_timeseries as it
+from src import ledger_store
+
+
+def _write_ledger(groups):
+    os.makedirs("out", exist_ok=True)
+    pd.DataFrame({
+        "claim_id": [f"C{i}" for i in range(len(groups))],
+        "claim_date": ["2025-01-01", "2025-01-01", "2025-01-02", "2025-01-02", "2025-01-03", "2025-01-03"],
+        "exp_group": groups,
+    }).to_csv(ledger_store.LEDGER_PATH, index=False)
+    ledger_store.main()
+
+
+def _counts():
+    counts = it.store_daily_counts()
+    assert counts is not None
+    pd.testing.assert_frame_equal(counts, it.daily_counts(it.read_ledger_days()), check_dtype=False)
+    return counts
+
+
+def test_group_swap_on_an_old_day_rebooks_it(workdir):
+    _write_ledger(["CONTROL", "TREATMENT"] * 3)
+    ts, start = it.update_timeseries(pd.DataFrame(), _counts(), 100.0)
+    assert start == "2025-01-01"
+    assert ts["saving_cum_krw"].tolist() == [100, 200, 300]
+
+    # same rows per day, but 2025-01-02 now has no TREATMENT claim
+    _write_ledger(["CONTROL", "TREATMENT", "CONTROL", "CONTROL", "CONTROL", "TREATMENT"])
+    ts, start = it.update_timeseries(ts, _counts(), 100.0)
+    assert start == "2025-01-02"
+    assert ts["n_treatment"].tolist() == [1, 0, 1]
+    assert ts["saving_cum_krw"].tolist() == [100, 100, 200]
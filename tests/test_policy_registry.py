@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+from src import policy_registry as pr
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(workdir):
+    pr._CACHE.clear()
+    yield
+    pr._CACHE.clear()
+
+
+def test_lost_pointer_replays_the_log():
+    pr.ensure_policy_registry(0.1)
+    for rate in (0.2, 0.3, 0.4):
+        pr.update_policy(rate, "EXPERIMENT", f"rate {rate}")
+    before = pr.load_policy()
+
+    os.remove(pr.CURRENT_PATH)
+    pr._CACHE.clear()
+    assert pr.load_current(create=False)["policy_version"] == "P3"
+    assert pr.load_policy() == before
+
+    nxt = pr.update_policy(0.5, "ROLLOUT", "after rebuild")
+    assert nxt["policy_version"] == "P4"
+    reg = pr.load_policy()
+    assert [p["policy_version"] for p in reg["history"]] == ["P0", "P1", "P2", "P3"]
+    assert reg["current"]["control_rate"] == 0.5
+
+
+def test_lost_pointer_after_compaction():
+    pr.ensure_policy_registry(0.1)
+    pr.update_policy(0.2, "EXPERIMENT", "a")
+    pr.compact()
+    pr.update_policy(0.3, "EXPERIMENT", "b")
+
+    os.remove(pr.CURRENT_PATH)
+    pr._CACHE.clear()
+    reg = pr.load_policy()
+    assert reg["current"]["policy_version"] == "P2"
+    assert [p["policy_version"] for p in reg["history"]] == ["P0", "P1"]
+    assert pr.update_policy(0.4, "EXPERIMENT", "c")["policy_version"] == "P3"